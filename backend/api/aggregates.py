@@ -0,0 +1,40 @@
+# api/aggregates.py
+from django.db.models import Count, Q
+
+
+def conditional_counts(queryset, group_by=(), conditions=None):
+    """
+    Compute grouped and conditional counts for a queryset in a single query.
+
+    ``group_by`` is a list of field names with choices; every choice gets a
+    filtered COUNT. ``conditions`` maps a result key to a ``Q`` object.
+
+    Returns a dict with ``total``, one nested dict per grouped field
+    (choice value -> count) and one entry per named condition.
+    """
+    conditions = conditions or {}
+    model = queryset.model
+    aggregates = {'total': Count('pk')}
+    group_keys = {}
+
+    for field_name in group_by:
+        field = model._meta.get_field(field_name)
+        for index, (value, _) in enumerate(field.choices):
+            alias = f'{field_name}_choice_{index}'
+            aggregates[alias] = Count('pk', filter=Q(**{field_name: value}))
+            group_keys[alias] = (field_name, value)
+
+    for index, (name, condition) in enumerate(conditions.items()):
+        aggregates[f'condition_{index}'] = Count('pk', filter=condition)
+
+    row = queryset.aggregate(**aggregates)
+
+    result = {'total': row['total']}
+    for field_name in group_by:
+        result[field_name] = {}
+    for alias, (field_name, value) in group_keys.items():
+        result[field_name][value] = row[alias]
+    for index, name in enumerate(conditions):
+        result[name] = row[f'condition_{index}']
+
+    return result
@@ -0,0 +1,127 @@
+# api/authentication.py
+import copy
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from .caching import LRUCache
+
+DEFAULT_TOKEN_AUTH_CACHE = {
+    'TTL': 300,
+    'MAX_SIZE': 10000,
+    'SHARED_CACHE': 'default',
+    'KEY_PREFIX': 'api:token-auth',
+    # Seconds between checks for tokens revoked by other processes
+    'REVOCATION_CHECK_INTERVAL': 2,
+}
+
+
+def get_token_cache_settings():
+    return {**DEFAULT_TOKEN_AUTH_CACHE, **getattr(settings, 'TOKEN_AUTH_CACHE', {})}
+
+
+_config = get_token_cache_settings()
+_local_cache = LRUCache(max_size=_config['MAX_SIZE'], ttl=_config['TTL'])
+# The last revocation generation this process saw, and when to look again
+_revocations = {'generation': None, 'next_check': 0.0}
+_revocations_lock = threading.Lock()
+
+
+def _shared_cache():
+    alias = get_token_cache_settings()['SHARED_CACHE']
+    return caches[alias] if alias else None
+
+
+def _shared_key(key):
+    return f"{get_token_cache_settings()['KEY_PREFIX']}:{key}"
+
+
+def _generation_key():
+    return _shared_key('revocations')
+
+
+def invalidate_token(key):
+    """Drop a token from the local and shared caches, and tell other processes to drop their copies"""
+    _local_cache.delete(key)
+    shared = _shared_cache()
+    if shared is not None:
+        shared.delete(_shared_key(key))
+        shared.set(_generation_key(), uuid.uuid4().hex, None)
+
+
+def _check_revocations(shared, interval):
+    """
+    Clear the local cache if a token has been revoked anywhere since the
+    last check; the shared cache is read at most once per ``interval``
+    """
+    with _revocations_lock:
+        now = time.monotonic()
+        if now < _revocations['next_check']:
+            return
+        _revocations['next_check'] = now + interval
+    generation = shared.get(_generation_key())
+    with _revocations_lock:
+        if generation != _revocations['generation']:
+            _revocations['generation'] = generation
+            _local_cache.clear()
+
+
+def invalidate_user_tokens(user):
+    """Drop every cached token belonging to a user"""
+    from rest_framework.authtoken.models import Token
+
+    for key in Token.objects.filter(user=user).values_list('key', flat=True):
+        invalidate_token(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that caches token -> (user, organization).
+
+    Lookups go through a process-local LRU cache with a TTL, then the shared
+    Django cache (``TOKEN_AUTH_CACHE['SHARED_CACHE']``, which must be shared
+    by all processes; see api/checks.py), and only then the database. The user is loaded together with its organization, so
+    ``request.user.organization`` does not need another query. Entries are
+    invalidated by signals when a token is deleted (including logout) or the
+    user is changed; other processes drop their local copies within
+    ``REVOCATION_CHECK_INTERVAL`` seconds, so a local hit makes no round
+    trip to the shared cache.
+    """
+
+    def authenticate_credentials(self, key):
+        config = get_token_cache_settings()
+        shared = _shared_cache()
+        if shared is not None:
+            _check_revocations(shared, config['REVOCATION_CHECK_INTERVAL'])
+        cached = _local_cache.get(key)
+
+        if cached is None and shared is not None:
+            cached = shared.get(_shared_key(key))
+            if cached is not None:
+                _local_cache.set(key, cached)
+
+        if cached is None:
+            model = self.get_model()
+            try:
+                token = model.objects.select_related('user', 'user__organization').get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+            cached = (token.user, token)
+            _local_cache.set(key, cached)
+            if shared is not None:
+                shared.set(_shared_key(key), cached, config['TTL'])
+
+        user, token = cached
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        # Hand each request its own copies so per-request mutations never leak into the cache
+        user = copy.copy(user)
+        if 'organization' in user._state.fields_cache:
+            user.organization = copy.copy(user.organization)
+        return (user, copy.copy(token))
@@ -0,0 +1,385 @@
+# api/automation_sandbox.py
+import ast
+import atexit
+import builtins
+import hashlib
+import math
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+from django.conf import settings
+
+try:
+    import pwd
+    import resource
+except ImportError:  # Not on Windows; scripts are then bounded by the parent's timeout only
+    pwd = resource = None
+
+# This module is imported by the sandbox worker processes, which are spawned
+# without Django set up: it must not import models or anything that needs them.
+
+# Recycle a worker process after this many scripts
+MAX_SCRIPTS_PER_WORKER = 1000
+# Compiled scripts kept per worker process
+COMPILED_CACHE_SIZE = 256
+# Longest output kept from a script
+MAX_OUTPUT_CHARS = 10000
+# Seconds the parent waits beyond the time limit before killing a stuck worker
+KILL_GRACE_SECONDS = 1
+# Seconds a new worker process may take to start
+STARTUP_TIMEOUT = 30
+
+SAFE_BUILTINS = {
+    name: getattr(builtins, name) for name in [
+        'abs', 'all', 'any', 'bool', 'dict', 'divmod', 'enumerate', 'filter', 'float', 'int',
+        'isinstance', 'len', 'list', 'map', 'max', 'min', 'range', 'reversed', 'round', 'set',
+        'sorted', 'str', 'sum', 'tuple', 'zip',
+        'Exception', 'KeyError', 'TypeError', 'ValueError',
+    ]
+}
+
+# The only attributes a script may use: methods of the plain dicts, lists,
+# strings and sets it works with. Everything else (frame and code objects
+# reached through generators, functions or tracebacks, str.format's
+# attribute lookups, ...) is out of reach.
+ALLOWED_ATTRIBUTES = frozenset([
+    # dict
+    'get', 'items', 'keys', 'values', 'setdefault', 'update',
+    # list
+    'append', 'extend', 'insert', 'remove', 'index', 'sort', 'reverse',
+    # shared by several of them
+    'copy', 'clear', 'count', 'pop',
+    # set
+    'add', 'discard', 'union', 'intersection', 'difference', 'issubset', 'issuperset',
+    # str
+    'lower', 'upper', 'title', 'capitalize', 'casefold', 'strip', 'lstrip', 'rstrip',
+    'split', 'rsplit', 'splitlines', 'join', 'replace', 'startswith', 'endswith', 'find', 'rfind',
+    'partition', 'rpartition', 'zfill', 'isdigit', 'isalpha', 'isalnum', 'isspace', 'islower', 'isupper',
+])
+
+# Generators and coroutines hand out their frames; scripts have no use for them
+DENIED_NODES = {
+    ast.Import: 'imports', ast.ImportFrom: 'imports',
+    ast.Yield: 'yield', ast.YieldFrom: 'yield', ast.Await: 'await',
+    ast.AsyncFunctionDef: 'async functions', ast.AsyncFor: 'async loops', ast.AsyncWith: 'async with',
+    ast.Global: 'global statements', ast.Nonlocal: 'nonlocal statements',
+}
+
+
+class ScriptError(ValueError):
+    """An automation script that may not be run"""
+
+
+class ScriptLimitExceeded(BaseException):
+    """
+    Raised inside a worker when a script runs out of CPU or wall-clock time
+    (a BaseException, so a script's own ``except Exception`` cannot swallow it)
+    """
+
+
+def check_script(source):
+    """
+    Compile an automation script, rejecting imports, generators, names
+    starting with an underscore and any attribute (read directly or through
+    a ``match`` class pattern) not in ``ALLOWED_ATTRIBUTES`` (the ways out
+    of restricted builtins). Raises ScriptError.
+    """
+    try:
+        tree = ast.parse(source, '<automation>', 'exec')
+    except SyntaxError as e:
+        raise ScriptError(f"Syntax error on line {e.lineno}: {e.msg}")
+    for node in ast.walk(tree):
+        if type(node) in DENIED_NODES:
+            raise ScriptError(f"Line {node.lineno}: {DENIED_NODES[type(node)]} are not allowed")
+        if isinstance(node, ast.Name) and node.id.startswith('_'):
+            raise ScriptError(f"Line {node.lineno}: names starting with an underscore are not allowed")
+        if isinstance(node, ast.Attribute) and node.attr not in ALLOWED_ATTRIBUTES:
+            raise ScriptError(f"Line {node.lineno}: attribute '{node.attr}' is not allowed")
+        if isinstance(node, ast.MatchClass):
+            # ``case Exception(__traceback__=tb)`` reads attributes too
+            for attr in node.kwd_attrs:
+                if attr not in ALLOWED_ATTRIBUTES:
+                    raise ScriptError(f"Line {node.lineno}: attribute '{attr}' is not allowed")
+    return compile(tree, '<automation>', 'exec')
+
+
+def script_context(workflow):
+    """
+    The only data a script sees: plain snapshots of the workflow, its data
+    subject and its request (``subject`` and ``request`` may be None).
+    """
+    subject = workflow.data_subject
+    request = workflow.related_request
+
+    def iso(value):
+        return value.isoformat() if value else None
+
+    return {
+        'workflow': {'id': str(workflow.pk), 'name': workflow.name},
+        'subject': {
+            'id': str(subject.pk),
+            'first_name': subject.first_name,
+            'last_name': subject.last_name,
+            'email': subject.email,
+            'phone': subject.phone,
+            'marketing_consent': subject.marketing_consent,
+            'data_processing_consent': subject.data_processing_consent,
+            'cookie_consent': subject.cookie_consent,
+            'privacy_notice_version': subject.privacy_notice_version,
+            'data_expiry_date': iso(subject.data_expiry_date),
+        } if subject else None,
+        'request': {
+            'id': str(request.pk),
+            'request_type': request.request_type,
+            'status': request.status,
+            'data_subject_name': request.data_subject_name,
+            'data_subject_email': request.data_subject_email,
+            'request_details': request.request_details,
+            'date_received': iso(request.date_received),
+            'due_date': iso(request.due_date),
+        } if request else None,
+    }
+
+
+# Worker process side
+
+_compiled = {}
+
+
+def _compile(source):
+    key = hashlib.sha256(source.encode()).hexdigest()
+    if key not in _compiled:
+        if len(_compiled) >= COMPILED_CACHE_SIZE:
+            _compiled.clear()
+        _compiled[key] = check_script(source)
+    return _compiled[key]
+
+
+def _raise_limit(signum, frame):
+    raise ScriptLimitExceeded('CPU time limit exceeded' if signum == signal.SIGXCPU else 'time limit exceeded')
+
+
+def _set_limits(cpu_limit, time_limit):
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft = math.ceil(usage.ru_utime + usage.ru_stime + cpu_limit)
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    signal.setitimer(signal.ITIMER_REAL, time_limit)
+
+
+def _clear_limits():
+    signal.setitimer(signal.ITIMER_REAL, 0)
+    if resource is not None:
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+
+def _run(source, context, cpu_limit, time_limit):
+    """Run one script; returns (success, output)"""
+    output = []
+
+    def emit(*args, sep=' ', end='\n'):
+        output.append(sep.join(str(arg) for arg in args) + end)
+
+    namespace = {'__builtins__': {**SAFE_BUILTINS, 'print': emit}, 'success': True, **context}
+    try:
+        code = _compile(source)
+        try:
+            _set_limits(cpu_limit, time_limit)
+            exec(code, namespace)
+        finally:
+            _clear_limits()
+        success = bool(namespace.get('success'))
+    except ScriptLimitExceeded as e:
+        success = False
+        emit(f"Script stopped: {e}")
+    except ScriptError as e:
+        success = False
+        emit(f"Script rejected: {e}")
+    except Exception as e:
+        success = False
+        emit(f"Script failed: {type(e).__name__}: {e}")
+    return success, ''.join(output).strip()[:MAX_OUTPUT_CHARS]
+
+
+def _drop_privileges(user):
+    """Switch a worker started as root to ``user``"""
+    if pwd is None or os.getuid() != 0:
+        return
+    entry = pwd.getpwnam(user)
+    os.setgroups([])
+    os.setgid(entry.pw_gid)
+    os.setuid(entry.pw_uid)
+    os.chdir('/')
+
+
+def _worker_main(conn, memory_limit_mb, user=None):
+    # Defence in depth, should a script ever get past check_script: no secrets
+    # from the environment, no root, and no new processes
+    os.environ.clear()
+    if user:
+        _drop_privileges(user)
+    if resource is not None:
+        if memory_limit_mb:
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        if os.getuid() != 0:
+            resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    signal.signal(signal.SIGXCPU, _raise_limit)
+    signal.signal(signal.SIGALRM, _raise_limit)
+    # Interrupts are handled by the parent, which stops the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    conn.send('ready')
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        try:
+            result = _run(*job)
+        except BaseException as e:
+            # A limit can fire while the script is being set up or torn down
+            result = (False, f"Script stopped: {e}")
+        conn.send(result)
+
+
+# Parent side
+
+class SandboxWorker:
+    """One pre-started worker process, talked to over a pipe"""
+
+    def __init__(self, context, memory_limit_mb, user=None):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, memory_limit_mb, user), daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+        self.scripts = 0
+
+    def wait_ready(self):
+        if not self.ready:
+            if not self.conn.poll(STARTUP_TIMEOUT) or self.conn.recv() != 'ready':
+                raise OSError('Sandbox worker did not start')
+            self.ready = True
+
+    def run(self, job, timeout):
+        self.wait_ready()
+        self.scripts += 1
+        self.conn.send(job)
+        if not self.conn.poll(timeout):
+            raise TimeoutError
+        return self.conn.recv()
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class SandboxPool:
+    """
+    A fixed set of pre-started worker processes shared by all threads.
+
+    Workers are spawned (not forked), so they hold no database connections
+    or Django state, and run as ``user`` when started as root. Each runs one
+    script at a time under CPU, memory, process and time limits; a worker that overruns or dies is killed and replaced, and
+    workers are recycled after ``MAX_SCRIPTS_PER_WORKER`` scripts.
+    """
+
+    def __init__(self, workers, memory_limit_mb=None, user=None):
+        self.pid = os.getpid()
+        self._context = multiprocessing.get_context('spawn')
+        self._memory_limit_mb = memory_limit_mb
+        self._user = user
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = set()
+        for _ in range(max(1, workers)):
+            self._idle.put(self._start())
+        for worker in list(self._workers):
+            worker.wait_ready()
+
+    def _start(self):
+        worker = SandboxWorker(self._context, self._memory_limit_mb, self._user)
+        with self._lock:
+            self._workers.add(worker)
+        return worker
+
+    def _stop(self, worker, kill=False):
+        with self._lock:
+            self._workers.discard(worker)
+        worker.stop(kill=kill)
+
+    def run(self, source, context, cpu_limit, time_limit):
+        """Run ``source`` with ``context`` as its globals; returns (success, output)"""
+        worker = self._idle.get()
+        healthy = False
+        try:
+            result = worker.run((source, context, cpu_limit, time_limit), time_limit + KILL_GRACE_SECONDS)
+            healthy = True
+        except TimeoutError:
+            result = (False, 'Script stopped: time limit exceeded')
+        except (EOFError, OSError):
+            result = (False, 'Script stopped: the sandbox worker exited (memory limit exceeded?)')
+        finally:
+            if healthy and worker.scripts < MAX_SCRIPTS_PER_WORKER:
+                self._idle.put(worker)
+            else:
+                # Replace a stuck, dead or worn-out worker; the new one starts in the background
+                self._stop(worker, kill=not healthy)
+                self._idle.put(self._start())
+        return result
+
+    def shutdown(self):
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            self._stop(worker)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """The process-wide sandbox pool, started on first use (and again after a fork)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = SandboxPool(settings.AUTOMATION_SANDBOX_WORKERS, settings.AUTOMATION_SCRIPT_MEMORY_LIMIT_MB,
+                                settings.AUTOMATION_SANDBOX_USER)
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def run_script(source, context, cpu_limit=None, time_limit=None):
+    """
+    Run an automation script in the sandbox pool.
+
+    The script sees only ``context`` (see ``script_context``), a small set
+    of builtins and ``print``, whose output is returned. It succeeds unless
+    it raises, exceeds a limit or sets ``success = False``.
+
+    Returns (success, output).
+    """
+    if cpu_limit is None:
+        cpu_limit = settings.AUTOMATION_SCRIPT_CPU_LIMIT
+    if time_limit is None:
+        time_limit = settings.AUTOMATION_SCRIPT_TIME_LIMIT
+    return get_pool().run(source, context, cpu_limit, time_limit)
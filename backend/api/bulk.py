@@ -0,0 +1,122 @@
+# api/bulk.py
+import uuid
+from django.db import transaction
+from django.utils import timezone
+
+# Maximum number of ids accepted by a single bulk call
+MAX_BULK_IDS = 1000
+
+
+class BulkError(Exception):
+    """Raised when a bulk payload is malformed as a whole"""
+
+
+def parse_ids(raw_ids):
+    """
+    Validate a list of ids from a request payload.
+
+    Returns ``(ids, results)`` where ``ids`` are the distinct, well-formed
+    UUIDs in request order and ``results`` holds an ``invalid_id`` outcome for
+    each entry that could not be parsed.
+    """
+    if not isinstance(raw_ids, list) or not raw_ids:
+        raise BulkError('ids must be a non-empty list')
+    if len(raw_ids) > MAX_BULK_IDS:
+        raise BulkError(f'At most {MAX_BULK_IDS} ids can be processed per request')
+
+    ids = []
+    seen = set()
+    results = {}
+    for raw_id in raw_ids:
+        try:
+            parsed = uuid.UUID(str(raw_id))
+        except ValueError:
+            results[str(raw_id)] = {'id': str(raw_id), 'outcome': 'invalid_id'}
+            continue
+        if parsed not in seen:
+            seen.add(parsed)
+            ids.append(parsed)
+    return ids, results
+
+
+def apply_bulk_update(queryset, raw_ids, updates, fields, check=None):
+    """
+    Apply ``updates`` to every row of ``queryset`` named in ``raw_ids``.
+
+    Rows are locked and read once (only ``fields`` are loaded), checked in a
+    single pass, then written with one set-based UPDATE inside a transaction.
+    ``check(row)`` may return ``'unchanged'`` to skip a row or an error string
+    to reject it; ``None`` means the row is updated.
+
+    Returns a list of per-id outcomes in request order.
+    """
+    ids, results = parse_ids(raw_ids)
+    updates = {'updated_at': timezone.now(), **updates}
+
+    with transaction.atomic():
+        rows = {
+            row['id']: row
+            for row in queryset.select_for_update().filter(id__in=ids).values('id', *fields)
+        }
+
+        to_update = []
+        for row_id in ids:
+            row = rows.get(row_id)
+            if row is None:
+                results[str(row_id)] = {'id': str(row_id), 'outcome': 'not_found'}
+                continue
+
+            error = check(row) if check else None
+            if error == 'unchanged':
+                results[str(row_id)] = {'id': str(row_id), 'outcome': 'unchanged'}
+            elif error:
+                results[str(row_id)] = {'id': str(row_id), 'outcome': 'rejected', 'error': error}
+            else:
+                results[str(row_id)] = {'id': str(row_id), 'outcome': 'updated'}
+                to_update.append(row_id)
+
+        if to_update:
+            queryset.model.objects.filter(id__in=to_update).update(**updates)
+
+    return [results[key] for key in _request_order(raw_ids, results)]
+
+
+def bulk_create_workflows(template, queryset, raw_ids, target):
+    """
+    Instantiate ``template`` once for every row of ``queryset`` named in ``raw_ids``.
+
+    ``target`` is ``'data_subject'`` or ``'request'``, the argument each row
+    is passed as. Rows are read with one query and the workflows and steps
+    written with two bulk inserts. Returns per-id outcomes in request order:
+    ``created`` (with ``workflow_id``), ``not_found`` or ``invalid_id``.
+    """
+    ids, results = parse_ids(raw_ids)
+    rows = queryset.filter(id__in=ids).in_bulk()
+
+    found = [row_id for row_id in ids if row_id in rows]
+    targets = [
+        (rows[row_id], None) if target == 'data_subject' else (None, rows[row_id])
+        for row_id in found
+    ]
+    workflows = template.create_workflow_instances(targets) if targets else []
+
+    for row_id, workflow in zip(found, workflows):
+        results[str(row_id)] = {'id': str(row_id), 'outcome': 'created', 'workflow_id': str(workflow.id)}
+    for row_id in ids:
+        if row_id not in rows:
+            results[str(row_id)] = {'id': str(row_id), 'outcome': 'not_found'}
+
+    return [results[key] for key in _request_order(raw_ids, results)]
+
+
+def _request_order(raw_ids, results):
+    """Yield result keys in request order, once each"""
+    seen = set()
+    for raw_id in raw_ids:
+        try:
+            key = str(uuid.UUID(str(raw_id)))
+        except ValueError:
+            key = str(raw_id)
+        if key not in seen and key in results:
+            seen.add(key)
+            yield key
@@ -0,0 +1,114 @@
+# api/caching.py
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from django.core.cache import cache
+
+
+class LRUCache:
+    """
+    Thread-safe, process-local LRU cache with an optional time-to-live.
+
+    Entries older than ``ttl`` seconds are treated as missing. When the cache
+    holds more than ``max_size`` entries the least recently used one is evicted.
+    """
+    _missing = object()
+
+    def __init__(self, max_size=1024, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, self._missing)
+            if entry is self._missing:
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        return self.get(key, self._missing) is not self._missing
+
+    def __len__(self):
+        return len(self._data)
+
+
+def versioned_key(key):
+    """
+    ``key`` qualified by its current version in the shared cache.
+
+    Entries written under an older version are never read again, so a reader
+    that built a value from data read before an invalidation cannot bring
+    it back. Versions are random, so a lost version key cannot revive one.
+    """
+    version_key = f'{key}:version'
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, uuid.uuid4().hex, None)
+        version = cache.get(version_key)
+    return f'{key}:{version}'
+
+
+def bump_version(key):
+    """Move ``key`` to a new version, dropping whatever was cached under it in every process"""
+    cache.set(f'{key}:version', uuid.uuid4().hex, None)
+
+
+class VersionedCache:
+    """
+    Values built per organization (data maps, risk analytics, template
+    lists), cached in the shared cache under a versioned key.
+
+    ``invalidate`` moves an organization to a new version, so every process
+    stops reading the old value at once, and a value built from data read
+    before a change can never be read after it. Call it once the change
+    commits (a rolled-back change leaves the value alone), and after bulk
+    changes (``update()``, ``bulk_create``) that skip the model signals; the
+    timeout bounds how stale a value gets when a write skips both.
+    """
+
+    def __init__(self, prefix, timeout=60 * 15):
+        self.prefix = prefix
+        self.timeout = timeout
+
+    def _key(self, organization_id):
+        return f'{self.prefix}:{organization_id}'
+
+    def get(self, organization_id, build):
+        """The cached value for an organization, calling ``build(organization_id)`` on a miss"""
+        key = versioned_key(self._key(organization_id))
+        value = cache.get(key)
+        if value is None:
+            value = build(organization_id)
+            cache.set(key, value, self.timeout)
+        return value
+
+    def invalidate(self, organization_id):
+        bump_version(self._key(organization_id))
@@ -0,0 +1,37 @@
+# api/checks.py
+from django.conf import settings
+from django.core.checks import Error, register
+from .authentication import get_token_cache_settings
+
+# Cache backends that keep a separate copy in every process
+PROCESS_LOCAL_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+}
+
+
+@register()
+def check_shared_caches(app_configs, **kwargs):
+    """
+    Token revocations and the cached data maps, risk analytics and template
+    lists are invalidated through the cache, so it must be one that every
+    worker process shares; otherwise other workers keep serving stale data.
+    """
+    errors = []
+    token_cache = get_token_cache_settings()['SHARED_CACHE']
+    if not token_cache:
+        errors.append(Error(
+            "TOKEN_AUTH_CACHE['SHARED_CACHE'] is not set, so revoked tokens stay valid in other processes.",
+            hint="Name a shared cache from CACHES (e.g. 'default').",
+            id='api.E001',
+        ))
+    for alias in sorted({'default', token_cache} - {None, ''}):
+        backend = settings.CACHES.get(alias, {}).get('BACKEND')
+        if backend is None:
+            errors.append(Error(f"The '{alias}' cache is not configured.", id='api.E002'))
+        elif backend in PROCESS_LOCAL_BACKENDS:
+            errors.append(Error(
+                f"The '{alias}' cache ({backend}) is local to each process.",
+                hint="Set REDIS_URL, or use the database cache, so invalidations reach every worker.",
+                id='api.E003',
+            ))
+    return errors
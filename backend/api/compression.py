@@ -0,0 +1,85 @@
+# api/compression.py
+import base64
+import zlib
+from django.db import models
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is optional
+    zstandard = None
+
+# Stored values starting with this (private use) character are encoded as
+# MARKER + codec + payload; anything else is plain text, as written before
+# compression was introduced. A body that itself starts with MARKER is always
+# encoded, so the two can never be confused.
+MARKER = '\ue000'
+ZLIB = 'z'
+ZSTD = 's'
+RAW = 'r'
+
+# Bodies shorter than this are stored as they are
+COMPRESS_MIN_CHARS = 1024
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def is_encoded(stored):
+    return isinstance(stored, str) and stored.startswith(MARKER)
+
+
+def compress_text(text, min_chars=COMPRESS_MIN_CHARS):
+    """
+    The stored form of ``text``: compressed with zstd (when installed) or
+    zlib and base85-encoded if that makes it smaller, otherwise the text
+    itself.
+    """
+    if text is None or not isinstance(text, str):
+        return text
+    if len(text) >= min_chars:
+        data = text.encode('utf-8')
+        if zstandard is not None:
+            codec, packed = ZSTD, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        else:
+            codec, packed = ZLIB, zlib.compress(data, ZLIB_LEVEL)
+        stored = MARKER + codec + base64.b85encode(packed).decode('ascii')
+        if len(stored) < len(text):
+            return stored
+    if text.startswith(MARKER):
+        return MARKER + RAW + text
+    return text
+
+
+def decompress_text(stored):
+    """The text a stored value (compressed or not) holds; raises ValueError for an unknown codec"""
+    if not is_encoded(stored):
+        return stored
+    codec, payload = stored[1:2], stored[2:]
+    if codec == RAW:
+        return payload
+    if codec == ZLIB:
+        return zlib.decompress(base64.b85decode(payload)).decode('utf-8')
+    if codec == ZSTD:
+        if zstandard is None:
+            raise ValueError("Document body is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(base64.b85decode(payload)).decode('utf-8')
+    raise ValueError(f"Unknown compression codec: {codec!r}")
+
+
+class CompressedTextField(models.TextField):
+    """
+    A TextField whose large values are stored compressed.
+
+    Reads and writes deal in plain text; rows written before the field was
+    compressed are read as they are. The column stays a text column, so
+    equality lookups against compressed rows do not match.
+    """
+
+    def from_db_value(self, value, expression, connection):
+        return decompress_text(value)
+
+    def to_python(self, value):
+        return decompress_text(super().to_python(value))
+
+    def get_prep_value(self, value):
+        return compress_text(super().get_prep_value(value))
@@ -0,0 +1,133 @@
+# api/datamap.py
+from .caching import VersionedCache
+from .models import DataCategory, DataStorage, DataMapping
+
+graph_cache = VersionedCache('api:data-map')
+
+
+def _category_node(category):
+    return {
+        'id': str(category['id']),
+        'name': category['name'],
+        'type': 'category',
+        'sensitive': category['is_sensitive']
+    }
+
+
+def _storage_node(storage):
+    return {
+        'id': str(storage['id']),
+        'name': storage['name'],
+        'type': 'storage',
+        'storage_type': storage['storage_type'],
+        'outside_eea': storage['is_outside_eea']
+    }
+
+
+def _link(mapping):
+    return {
+        'source': str(mapping['data_category_id']),
+        'target': str(mapping['storage_id']),
+        'purpose': mapping['purpose']
+    }
+
+
+def build_graph(organization_id):
+    """
+    Build the nodes/links graph for an organization from three flat queries.
+
+    Nodes and links are keyed by id.
+    """
+    nodes = {}
+    for category in DataCategory.objects.filter(organization_id=organization_id).values(
+            'id', 'name', 'is_sensitive'):
+        node = _category_node(category)
+        nodes[node['id']] = node
+
+    for storage in DataStorage.objects.filter(organization_id=organization_id).values(
+            'id', 'name', 'storage_type', 'is_outside_eea'):
+        node = _storage_node(storage)
+        nodes[node['id']] = node
+
+    links = {}
+    for mapping in DataMapping.objects.filter(organization_id=organization_id).values(
+            'id', 'data_category_id', 'storage_id', 'purpose'):
+        links[str(mapping['id'])] = _link(mapping)
+
+    return {'nodes': nodes, 'links': links}
+
+
+def get_graph(organization_id):
+    """Return the cached graph for an organization, building it on a miss"""
+    return graph_cache.get(organization_id, build_graph)
+
+
+def invalidate(organization_id):
+    graph_cache.invalidate(organization_id)
+
+
+def _cluster_id(node, group_by):
+    if node['type'] == 'storage' and 'storage_type' in group_by:
+        return f"storage_type:{node['storage_type']}"
+    if node['type'] == 'category' and 'sensitivity' in group_by:
+        return 'sensitivity:sensitive' if node['sensitive'] else 'sensitivity:non_sensitive'
+    return None
+
+
+def cluster_graph(graph, group_by=(), expand=()):
+    """
+    Collapse nodes into clusters and aggregate the links between them.
+
+    ``group_by`` may contain ``storage_type`` (groups storage nodes) and/or
+    ``sensitivity`` (groups category nodes). Cluster ids listed in ``expand``
+    are drilled into: their members are returned as individual nodes.
+    """
+    storage_labels = dict(DataStorage._meta.get_field('storage_type').choices)
+    nodes = []
+    clusters = {}
+    node_cluster = {}
+
+    for node in graph['nodes'].values():
+        cluster_id = _cluster_id(node, group_by)
+        if cluster_id is None or cluster_id in expand:
+            nodes.append(node)
+            continue
+
+        node_cluster[node['id']] = cluster_id
+        cluster = clusters.get(cluster_id)
+        if cluster is None:
+            group, value = cluster_id.split(':', 1)
+            if group == 'storage_type':
+                name = storage_labels.get(value, value)
+            else:
+                name = 'Sensitive data' if value == 'sensitive' else 'Non-sensitive data'
+            cluster = clusters[cluster_id] = {
+                'id': cluster_id,
+                'name': name,
+                'type': 'cluster',
+                'member_type': node['type'],
+                'size': 0
+            }
+            if node['type'] == 'storage':
+                cluster['outside_eea'] = 0
+            else:
+                cluster['sensitive'] = value == 'sensitive'
+        cluster['size'] += 1
+        if node['type'] == 'storage' and node['outside_eea']:
+            cluster['outside_eea'] += 1
+
+    links = {}
+    for link in graph['links'].values():
+        source = node_cluster.get(link['source'], link['source'])
+        target = node_cluster.get(link['target'], link['target'])
+        aggregated = links.get((source, target))
+        if aggregated is None:
+            links[(source, target)] = {'source': source, 'target': target, 'purpose': link['purpose'], 'count': 1}
+        else:
+            aggregated['count'] += 1
+            aggregated['purpose'] = None
+
+    return {
+        'nodes': nodes + list(clusters.values()),
+        'links': list(links.values())
+    }
@@ -0,0 +1,147 @@
+# api/deadlines.py
+import datetime
+import logging
+from django.db import transaction
+from django.db.models import Min, Q
+from django.dispatch import Signal
+from django.utils import timezone
+from .models import ComplianceAction, DataSubjectRequest, Notification, WorkflowInstance, WorkflowStep
+
+logger = logging.getLogger(__name__)
+
+# Items flipped per transaction
+BATCH_SIZE = 500
+
+# Sent once per batch of items that became overdue, with ``kind`` and ``items``
+# (dicts of id, organization_id, assigned_to_id, title and due date)
+items_overdue = Signal()
+
+
+class DeadlineSource:
+    """
+    One kind of item with a due date.
+
+    ``open_filter`` matches the condition of the partial index on the due
+    date, so finding newly due items (and the next deadline) only touches
+    open items that have not been flagged yet, however large the table is.
+    """
+
+    def __init__(self, kind, model, open_filter, overdue_updates, title_field, message, date_only=False):
+        self.kind = kind
+        self.model = model
+        self.open_filter = open_filter
+        self.overdue_updates = overdue_updates
+        self.title_field = title_field
+        self.message = message
+        self.date_only = date_only
+
+    def describe(self, row):
+        return self.message.format(row[self.title_field])[:255]
+
+    def _cutoff(self, now):
+        # Date-only deadlines fall due once the whole day has passed
+        return timezone.localdate(now) if self.date_only else now
+
+    def due(self, now):
+        return self.model.objects.filter(self.open_filter, due_date__lt=self._cutoff(now))
+
+    def next_deadline(self, now):
+        """
+        The earliest moment an open item of this kind becomes overdue, or
+        None. Items already due are left out: one still unflagged is held
+        locked by another transaction and is retried on the next wake-up.
+        """
+        due_date = self.model.objects.filter(
+            self.open_filter, due_date__gte=self._cutoff(now)
+        ).aggregate(next=Min('due_date'))['next']
+        if due_date is not None and self.date_only:
+            next_day = due_date + datetime.timedelta(days=1)
+            return timezone.make_aware(datetime.datetime.combine(next_day, datetime.time.min))
+        return due_date
+
+
+DEADLINE_SOURCES = [
+    DeadlineSource(
+        'request_overdue', DataSubjectRequest,
+        Q(status__in=['new', 'in_progress'], overdue_at__isnull=True),
+        lambda now: {'overdue_at': now},
+        'data_subject_name', 'Request from {} is overdue',
+    ),
+    DeadlineSource(
+        'workflow_overdue', WorkflowInstance,
+        Q(status__in=['pending', 'in_progress'], overdue_at__isnull=True),
+        lambda now: {'overdue_at': now},
+        'name', 'Workflow {} is overdue',
+    ),
+    DeadlineSource(
+        'step_overdue', WorkflowStep,
+        Q(status__in=['pending', 'in_progress'], overdue_at__isnull=True, due_date__isnull=False),
+        lambda now: {'overdue_at': now},
+        'name', 'Workflow step {} is overdue',
+    ),
+    DeadlineSource(
+        'action_overdue', ComplianceAction,
+        Q(status__in=['pending', 'in_progress'], overdue_at__isnull=True),
+        lambda now: {'overdue_at': now},
+        'title', 'Compliance action {} is overdue',
+        date_only=True,
+    ),
+]
+
+
+def flip_due_batch(source, now, batch_size=BATCH_SIZE):
+    """
+    Flag up to ``batch_size`` newly due items of one source as overdue.
+
+    Items are locked with ``skip_locked``, flipped with one UPDATE, and one
+    notification per item is written with a bulk insert, all in one
+    transaction. Returns the rows that were flipped.
+    """
+    with transaction.atomic():
+        rows = list(
+            source.due(now).select_for_update(skip_locked=True).order_by('due_date').values(
+                'id', 'organization_id', 'assigned_to_id', 'due_date', source.title_field
+            )[:batch_size]
+        )
+        if not rows:
+            return []
+
+        source.model.objects.filter(id__in=[row['id'] for row in rows]).update(
+            updated_at=now, **source.overdue_updates(now)
+        )
+        Notification.objects.bulk_create([
+            Notification(
+                organization_id=row['organization_id'],
+                user_id=row['assigned_to_id'],
+                kind=source.kind,
+                title=source.describe(row),
+                object_id=row['id']
+            )
+            for row in rows
+        ])
+
+    items_overdue.send(sender=source.model, kind=source.kind, items=rows)
+    return rows
+
+
+def process_due_deadlines(now=None, batch_size=BATCH_SIZE):
+    """Flip every item whose deadline has passed; returns the number flipped per kind"""
+    now = now or timezone.now()
+    flipped = {}
+    for source in DEADLINE_SOURCES:
+        flipped[source.kind] = 0
+        while True:
+            rows = flip_due_batch(source, now, batch_size)
+            flipped[source.kind] += len(rows)
+            if len(rows) < batch_size:
+                break
+        if flipped[source.kind]:
+            logger.info(f"Flagged {flipped[source.kind]} items as {source.kind}")
+    return flipped
+
+
+def next_deadline(now=None):
+    """The earliest deadline after ``now`` over all sources, or None if nothing open is upcoming"""
+    now = now or timezone.now()
+    deadlines = [deadline for deadline in (source.next_deadline(now) for source in DEADLINE_SOURCES) if deadline]
+    return min(deadlines) if deadlines else None
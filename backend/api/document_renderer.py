@@ -0,0 +1,153 @@
+# api/document_renderer.py
+import functools
+import re
+import threading
+from collections import OrderedDict
+from django.utils import timezone
+
+# {{name}}, with optional spaces inside the braces
+PLACEHOLDER = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+# Compiled document templates kept per process; the least recently used are dropped first
+MAX_COMPILED = 500
+
+
+def _date(value):
+    return value.strftime('%Y-%m-%d') if value else 'Not set'
+
+
+# Built-in variables, each worked out only when a template uses it
+SUBJECT_VARIABLES = {
+    'subject_first_name': lambda subject: subject.first_name,
+    'subject_last_name': lambda subject: subject.last_name,
+    'subject_email': lambda subject: subject.email,
+    'subject_full_name': lambda subject: f"{subject.first_name} {subject.last_name}",
+    'expiry_date': lambda subject: _date(subject.data_expiry_date),
+}
+ORGANIZATION_VARIABLES = {
+    'organization_name': lambda organization: organization.name,
+    'organization_address': lambda organization: organization.address,
+}
+DATE_VARIABLES = {
+    'current_date': lambda now: now.strftime('%Y-%m-%d'),
+}
+
+
+def declared_variables(spec):
+    """
+    Defaults of the variables a template declares in ``template_variables``:
+    either a list of names, or a dict of name -> default value (or -> a dict
+    with a ``default`` key). Undeclared defaults are empty strings.
+    """
+    if isinstance(spec, dict):
+        return {
+            str(name): str((value.get('default', '') if isinstance(value, dict) else value) or '')
+            for name, value in spec.items()
+        }
+    if isinstance(spec, list):
+        return {str(name): '' for name in spec if isinstance(name, str)}
+    return {}
+
+
+class CompiledDocument:
+    """
+    A template body parsed once into literal text and placeholder slots.
+
+    ``parts`` alternates literal text and the raw placeholder text, so
+    rendering is one list copy, one lookup per placeholder and one join;
+    placeholders without a value are left as written.
+    """
+
+    def __init__(self, text):
+        self.parts = []
+        self.slots = []
+        position = 0
+        for match in PLACEHOLDER.finditer(text):
+            self.parts.append(text[position:match.start()])
+            self.slots.append((len(self.parts), match.group(1)))
+            self.parts.append(match.group(0))
+            position = match.end()
+        self.parts.append(text[position:])
+        self.names = frozenset(name for _, name in self.slots)
+
+    def render(self, values):
+        parts = self.parts.copy()
+        for index, name in self.slots:
+            value = values.get(name)
+            if value is not None:
+                parts[index] = value
+        return ''.join(parts)
+
+    def values(self, subject=None, organization=None, now=None, defaults=None, extra=None):
+        """
+        Values for the placeholders this template uses: declared defaults,
+        then built-in subject, organization and date variables, then ``extra``.
+        """
+        values = {name: value for name, value in (defaults or {}).items() if name in self.names}
+        for name in self.names:
+            if subject is not None and name in SUBJECT_VARIABLES:
+                values[name] = SUBJECT_VARIABLES[name](subject)
+            elif organization is not None and name in ORGANIZATION_VARIABLES:
+                values[name] = ORGANIZATION_VARIABLES[name](organization)
+            elif name in DATE_VARIABLES:
+                values[name] = DATE_VARIABLES[name](now or timezone.now())
+        for name, value in (extra or {}).items():
+            if name in self.names and value is not None:
+                values[name] = str(value)
+        return values
+
+
+@functools.lru_cache(maxsize=64)
+def compile_text(text):
+    """A compiled template for ad hoc text"""
+    return CompiledDocument(text)
+
+
+# Document id -> (updated_at, CompiledDocument, declared defaults)
+_compiled = OrderedDict()
+_lock = threading.Lock()
+
+
+def compiled_document(document):
+    """
+    The compiled body and declared variable defaults of a template document.
+
+    Cached per process by document id and ``updated_at``, so a saved change
+    is compiled afresh on its next render in every process.
+    """
+    key = document.pk
+    if document.updated_at is None:
+        # Unsaved: nothing to key the cache on
+        return CompiledDocument(document.content), declared_variables(document.template_variables)
+    with _lock:
+        entry = _compiled.get(key)
+        if entry is not None and entry[0] == document.updated_at:
+            _compiled.move_to_end(key)
+            return entry[1], entry[2]
+
+    entry = (document.updated_at, CompiledDocument(document.content), declared_variables(document.template_variables))
+    with _lock:
+        _compiled[key] = entry
+        _compiled.move_to_end(key)
+        while len(_compiled) > MAX_COMPILED:
+            _compiled.popitem(last=False)
+    return entry[1], entry[2]
+
+
+def render_document(document, subject=None, organization=None, extra=None, now=None):
+    """
+    Render a template document in one pass over its compiled body. The
+    document's own organization is used (and loaded) only if needed.
+    """
+    compiled, defaults = compiled_document(document)
+    if organization is None and not compiled.names.isdisjoint(ORGANIZATION_VARIABLES):
+        organization = document.organization
+    return compiled.render(compiled.values(
+        subject=subject, organization=organization, now=now, defaults=defaults, extra=extra
+    ))
+
+
+def clear():
+    compile_text.cache_clear()
+    with _lock:
+        _compiled.clear()
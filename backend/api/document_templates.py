@@ -0,0 +1,94 @@
+# api/document_templates.py
+from django.core.exceptions import ValidationError
+from . import document_renderer
+from .caching import VersionedCache
+from .models import DataSubject, Document
+
+template_list_cache = VersionedCache('api:document-templates')
+
+# Listed per template; the body is never read for the list
+TEMPLATE_FIELDS = ['id', 'title', 'document_type', 'version', 'status', 'template_variables', 'updated_at']
+
+
+def build_template_list(organization_id):
+    """The organization's template documents (without their bodies), archived ones last"""
+    document_types = dict(Document._meta.get_field('document_type').choices)
+    templates = []
+    for row in Document.objects.filter(organization_id=organization_id, is_template=True).order_by(
+            'title', '-updated_at').values(*TEMPLATE_FIELDS):
+        templates.append({
+            'id': str(row['id']),
+            'name': row['title'],
+            'description': document_types.get(row['document_type'], row['document_type']),
+            'document_type': row['document_type'],
+            'version': row['version'],
+            'status': row['status'],
+            'variables': sorted(document_renderer.declared_variables(row['template_variables'])),
+            'updated_at': row['updated_at'],
+        })
+    templates.sort(key=lambda template: template['status'] == 'archived')
+    return templates
+
+
+def list_templates(organization_id):
+    """Return the cached template list for an organization, building it on a miss"""
+    return template_list_cache.get(organization_id, build_template_list)
+
+
+def invalidate(organization_id):
+    template_list_cache.invalidate(organization_id)
+
+
+def get_template(organization_id, template_id):
+    """
+    A template document of the organization, loaded without its body: the
+    renderer reads the body only when its compiled copy is missing or stale.
+    Raises Document.DoesNotExist.
+    """
+    return Document.objects.select_related('organization').get(
+        id=template_id, organization_id=organization_id, is_template=True
+    )
+
+
+def generate_document(template, data_subject=None, fields=None, title=None, document_type=None, created_by=None):
+    """
+    Render ``template`` (for ``data_subject``, if given) with the caller's
+    ``fields`` through the compiled renderer and save the new document.
+    Raises ValueError for a ``title`` or ``document_type`` the document
+    cannot hold.
+    """
+    max_title = Document._meta.get_field('title').max_length
+    if title is not None and (not isinstance(title, str) or len(title) > max_title):
+        raise ValueError(f"title must be a string of at most {max_title} characters")
+    document_types = dict(Document._meta.get_field('document_type').choices)
+    if document_type is not None and (not isinstance(document_type, str) or document_type not in document_types):
+        raise ValueError(f"document_type must be one of: {', '.join(document_types)}")
+    content = document_renderer.render_document(
+        template, subject=data_subject, organization=template.organization, extra=fields
+    )
+    if data_subject is not None:
+        document = template.new_document_for_subject(data_subject, content)
+    else:
+        document = Document(
+            organization_id=template.organization_id,
+            title=template.title,
+            document_type=template.document_type,
+            content=content,
+            status='active',
+        )
+    if title:
+        document.title = title
+    if document_type:
+        document.document_type = document_type
+    if created_by is not None:
+        document.created_by = created_by
+    document.save()
+    return document
+
+
+def find_subject(organization_id, data_subject_id):
+    """Raises DataSubject.DoesNotExist (also for malformed ids)"""
+    try:
+        return DataSubject.objects.get(id=data_subject_id, organization_id=organization_id)
+    except (ValidationError, DataSubject.DoesNotExist):
+        raise DataSubject.DoesNotExist
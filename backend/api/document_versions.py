@@ -0,0 +1,184 @@
+# api/document_versions.py
+import hashlib
+import json
+import threading
+import zlib
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+from difflib import SequenceMatcher
+from django.db import transaction
+from .models import Document, DocumentRevision
+
+# Every revision numbered 1, 1 + SNAPSHOT_INTERVAL, 1 + 2 * SNAPSHOT_INTERVAL, ...
+# holds the full body, so rebuilding a revision applies fewer than this many deltas
+SNAPSHOT_INTERVAL = 10
+
+# Rebuilt bodies kept per process; revisions never change, so entries never go stale
+CHECKPOINT_CACHE_SIZE = 128
+
+# Revision fields listed in histories (never the stored body)
+HISTORY_FIELDS = [
+    'number', 'version', 'title', 'is_snapshot', 'size', 'stored_size',
+    'content_hash', 'created_by', 'created_at'
+]
+
+_checkpoints = OrderedDict()
+_lock = threading.Lock()
+
+
+def next_version(version):
+    """The version after ``version``, counting in tenths: 1.0 -> 1.1, 1.9 -> 2.0"""
+    try:
+        current = Decimal(version)
+    except InvalidOperation:
+        raise ValueError(f"Version {version} is not a number")
+    return str((current + Decimal('0.1')).quantize(Decimal('0.1')))
+
+
+def encode_delta(old, new):
+    """
+    A compact line delta turning ``old`` into ``new``: positive numbers copy
+    lines, negative numbers skip lines, strings insert text.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    ops = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, old_lines, new_lines, autojunk=False).get_opcodes():
+        if tag == 'equal':
+            ops.append(i2 - i1)
+            continue
+        if i2 > i1:
+            ops.append(i1 - i2)
+        if j2 > j1:
+            ops.append(''.join(new_lines[j1:j2]))
+    return ops
+
+
+def apply_delta(old, ops):
+    lines = old.splitlines(keepends=True)
+    position = 0
+    parts = []
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        elif op > 0:
+            parts.extend(lines[position:position + op])
+            position += op
+        else:
+            position -= op
+    return ''.join(parts)
+
+
+def _hash(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _remember(document_id, number, content):
+    with _lock:
+        _checkpoints[(document_id, number)] = content
+        _checkpoints.move_to_end((document_id, number))
+        while len(_checkpoints) > CHECKPOINT_CACHE_SIZE:
+            _checkpoints.popitem(last=False)
+
+
+def revision_content(document_id, number):
+    """
+    Rebuild the body of one revision.
+
+    Starts from the nearest cached checkpoint (or the fixed snapshot at or
+    before ``number``) and applies the deltas after it, read in one query.
+    Raises DocumentRevision.DoesNotExist, or ValueError if the rebuilt body
+    does not match its stored hash.
+    """
+    snapshot = ((number - 1) // SNAPSHOT_INTERVAL) * SNAPSHOT_INTERVAL + 1
+    content = None
+    start = snapshot
+    with _lock:
+        for candidate in range(number, snapshot - 1, -1):
+            if (document_id, candidate) in _checkpoints:
+                content = _checkpoints[(document_id, candidate)]
+                start = candidate + 1
+                break
+    if content is not None and start > number:
+        return content
+
+    revisions = list(DocumentRevision.objects.filter(
+        document_id=document_id, number__gte=start, number__lte=number
+    ).order_by('number').values_list('number', 'is_snapshot', 'data', 'content_hash'))
+    if not revisions or revisions[-1][0] != number:
+        raise DocumentRevision.DoesNotExist(f"Document {document_id} has no revision {number}")
+
+    for revision_number, is_snapshot, data, content_hash in revisions:
+        payload = zlib.decompress(bytes(data)).decode('utf-8')
+        content = payload if is_snapshot else apply_delta(content, json.loads(payload))
+    if _hash(content) != content_hash:
+        raise ValueError(f"Revision {number} of document {document_id} could not be rebuilt")
+    _remember(document_id, number, content)
+    return content
+
+
+def _build_revision(document, number, content, previous, version, title, created_by):
+    full = zlib.compress(content.encode('utf-8'))
+    data, is_snapshot = full, True
+    if previous is not None and (number - 1) % SNAPSHOT_INTERVAL:
+        delta = zlib.compress(json.dumps(encode_delta(previous, content), separators=(',', ':')).encode('utf-8'))
+        # A delta bigger than the whole body is not worth rebuilding from
+        if len(delta) < len(full):
+            data, is_snapshot = delta, False
+    return DocumentRevision(
+        organization_id=document.organization_id,
+        document=document,
+        number=number,
+        version=version,
+        title=title,
+        is_snapshot=is_snapshot,
+        data=data,
+        size=len(content),
+        stored_size=len(data),
+        content_hash=_hash(content),
+        created_by=created_by,
+    )
+
+
+def create_version(document, content=None, title=None, created_by=None):
+    """
+    Move ``document`` to its next version (with a new body, if given) and
+    record that version in its revision history. The first call also
+    records the version the document had until then.
+
+    Returns the new revision.
+    """
+    with transaction.atomic():
+        # Lock the document so concurrent versions get distinct numbers
+        document = Document.objects.with_content().select_for_update().get(pk=document.pk)
+        version = next_version(document.version)
+        latest = document.revisions.order_by('-number').values_list('number', flat=True).first()
+
+        revisions = []
+        if latest is None:
+            baseline = _build_revision(document, 1, document.content, None, document.version,
+                                       document.title, document.created_by)
+            revisions.append(baseline)
+            latest, previous = 1, document.content
+        else:
+            previous = revision_content(document.pk, latest)
+
+        new_content = document.content if content is None else content
+        new_title = title or document.title
+        revision = _build_revision(document, latest + 1, new_content, previous, version, new_title, created_by)
+        revisions.append(revision)
+        DocumentRevision.objects.bulk_create(revisions)
+
+        document.content = new_content
+        document.title = new_title
+        document.version = version
+        document.status = 'draft'
+        document.save(update_fields=['content', 'title', 'version', 'status', 'updated_at'])
+        transaction.on_commit(lambda: _remember(document.pk, revision.number, new_content))
+
+    return revision
+
+
+def history(document):
+    """Metadata of every revision of ``document``, oldest first, without loading any body"""
+    return list(document.revisions.order_by('number').values(*HISTORY_FIELDS))
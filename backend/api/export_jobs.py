@@ -0,0 +1,317 @@
+# api/export_jobs.py
+import logging
+import tempfile
+import time
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from . import batch_documents, exports
+from .models import ConsentActivity, DataCategory, DataMapping, DataSubject, Document, ExportJob
+
+logger = logging.getLogger(__name__)
+
+# How often (in rows) progress is written back to the job
+PROGRESS_INTERVAL = exports.CHUNK_SIZE
+# Progress is also written at least this often (in seconds) while rows are
+# being produced, as the heartbeat that tells a live job from a dead one
+HEARTBEAT_SECONDS = 30
+
+
+class ExportCancelled(Exception):
+    """The job was deleted, or requeued as stale, while it was running"""
+
+DATA_SUBJECT_COLUMNS = [
+    ('Subject ID', 'id'),
+    ('First Name', 'first_name'),
+    ('Last Name', 'last_name'),
+    ('Email', 'email'),
+    ('Phone', 'phone'),
+    ('Marketing Consent', 'marketing_consent'),
+    ('Marketing Consent Date', 'marketing_consent_date'),
+    ('Data Processing Consent', 'data_processing_consent'),
+    ('Data Processing Consent Date', 'data_processing_consent_date'),
+    ('Cookie Consent', 'cookie_consent'),
+    ('Cookie Consent Date', 'cookie_consent_date'),
+    ('Expiry Date', 'data_expiry_date'),
+    ('Created Date', 'created_at'),
+]
+
+CONSENT_ACTIVITY_COLUMNS = [
+    ('Activity ID', 'id'),
+    ('Subject ID', 'data_subject_id'),
+    ('Subject Email', 'data_subject__email'),
+    ('Activity Type', 'activity_type'),
+    ('Consent Type', 'consent_type'),
+    ('Timestamp', 'timestamp'),
+    ('IP Address', 'ip_address'),
+    ('Notes', 'notes'),
+]
+
+DOCUMENT_BATCH_COLUMNS = [
+    ('Document ID', 'id'),
+    ('Subject ID', 'data_subject_id'),
+    ('Title', 'title'),
+]
+
+RETENTION_REPORT_COLUMNS = [
+    ('Subject ID', 'id'),
+    ('Name', 'name'),
+    ('Email', 'email'),
+    ('Status', 'retention_status'),
+    ('Expiry Date', 'data_expiry_date'),
+    ('Data Processing Consent', 'data_processing_consent'),
+    ('Marketing Consent', 'marketing_consent'),
+    ('Cookie Consent', 'cookie_consent'),
+    ('Created Date', 'created_at'),
+]
+
+
+def _values(queryset, columns):
+    return queryset.values(*[key for _, key in columns]).iterator(chunk_size=exports.CHUNK_SIZE)
+
+
+def data_subjects_source(organization_id, parameters):
+    queryset = DataSubject.objects.filter(organization_id=organization_id).order_by('created_at')
+    return DATA_SUBJECT_COLUMNS, queryset.count(), _values(queryset, DATA_SUBJECT_COLUMNS)
+
+
+def consent_activities_source(organization_id, parameters):
+    queryset = ConsentActivity.objects.filter(
+        data_subject__organization_id=organization_id
+    ).order_by('timestamp')
+    return CONSENT_ACTIVITY_COLUMNS, queryset.count(), _values(queryset, CONSENT_ACTIVITY_COLUMNS)
+
+
+def data_inventory_source(organization_id, parameters):
+    total = (
+        DataMapping.objects.filter(organization_id=organization_id).count() +
+        DataCategory.objects.filter(organization_id=organization_id, mappings__isnull=True).count()
+    )
+    return exports.INVENTORY_COLUMNS, total, exports.inventory_rows(organization_id)
+
+
+def retention_report_source(organization_id, parameters):
+    now = timezone.now()
+    days_before_expiry = int(parameters.get('days_before_expiry', 30))
+    expiring_cutoff = now + timezone.timedelta(days=days_before_expiry)
+    queryset = DataSubject.objects.filter(
+        Q(data_expiry_date__lt=now) | Q(data_expiry_date__gt=now, data_expiry_date__lte=expiring_cutoff),
+        organization_id=organization_id
+    ).order_by('data_expiry_date')
+
+    def rows():
+        fields = ['id', 'first_name', 'last_name', 'email', 'data_expiry_date', 'data_processing_consent',
+                  'marketing_consent', 'cookie_consent', 'created_at']
+        for subject in queryset.values(*fields).iterator(chunk_size=exports.CHUNK_SIZE):
+            subject['name'] = f"{subject['first_name']} {subject['last_name']}"
+            if subject['data_expiry_date'] < now:
+                subject['retention_status'] = 'EXPIRED'
+            else:
+                subject['retention_status'] = f'EXPIRING IN <{days_before_expiry} DAYS'
+            yield subject
+
+    return RETENTION_REPORT_COLUMNS, queryset.count(), rows()
+
+
+def document_batch_source(organization_id, parameters):
+    """
+    Generate a template for the subjects matching ``filters``, listing the
+    documents generated. A job rerun after its worker died skips subjects
+    already given a document from the template since the job was queued.
+    """
+    try:
+        template = Document.objects.select_related('organization').get(
+            id=parameters.get('template_id'), organization_id=organization_id, is_template=True
+        )
+    except (ValidationError, Document.DoesNotExist):
+        raise ValueError("Template not found")
+    subjects = batch_documents.subject_queryset(organization_id, parameters.get('filters'))
+    queued_at = parse_datetime(parameters.get('queued_at') or '')
+    if queued_at is not None:
+        subjects = subjects.exclude(Exists(Document.objects.filter(
+            data_subject=OuterRef('pk'), is_template=False, title__startswith=f"{template.title} - ",
+            created_at__gte=queued_at
+        )))
+
+    def rows():
+        for documents in batch_documents.generate_documents(template, subjects, extra=parameters.get('fields') or {}):
+            for document in documents:
+                yield {'id': document.id, 'data_subject_id': document.data_subject_id, 'title': document.title}
+
+    return DOCUMENT_BATCH_COLUMNS, subjects.count(), rows()
+
+
+EXPORT_SOURCES = {
+    'data_subjects': data_subjects_source,
+    'consent_activities': consent_activities_source,
+    'data_inventory': data_inventory_source,
+    'retention_report': retention_report_source,
+    'document_batch': document_batch_source,
+}
+
+
+def enqueue_export(organization_id, export_type, export_format='csv', parameters=None, created_by=None):
+    """Queue an export job for the worker; returns the new job"""
+    if export_type not in EXPORT_SOURCES:
+        raise ValueError(f"Unknown export type: {export_type}")
+    return ExportJob.objects.create(
+        organization_id=organization_id,
+        export_type=export_type,
+        format=export_format,
+        parameters=parameters or {},
+        created_by=created_by
+    )
+
+
+def enqueue_document_batch(template, filters=None, fields=None, created_by=None):
+    """Queue generation of ``template`` for the subjects matching ``filters``; returns the new job"""
+    return enqueue_export(
+        template.organization_id, 'document_batch',
+        parameters={
+            'template_id': str(template.pk),
+            'filters': filters or {},
+            'fields': fields or {},
+            'queued_at': timezone.now().isoformat(),
+        },
+        created_by=created_by
+    )
+
+
+def claim_next_job():
+    """
+    Atomically claim the oldest queued job, or return None.
+
+    ``skip_locked`` lets several workers poll the queue without blocking
+    on (or double-processing) each other's jobs.
+    """
+    with transaction.atomic():
+        job = ExportJob.objects.select_for_update(skip_locked=True).filter(
+            status='queued'
+        ).order_by('created_at').first()
+        if job is None:
+            return None
+        job.status = 'running'
+        job.started_at = timezone.now()
+        job.attempts += 1
+        job.save(update_fields=['status', 'started_at', 'attempts', 'updated_at'])
+    return job
+
+
+def _claimed(job):
+    """The job's row, for as long as this worker's claim on it holds"""
+    return ExportJob.objects.filter(pk=job.pk, status='running', attempts=job.attempts)
+
+
+def _track_progress(job, rows):
+    """
+    Pass rows through while periodically recording how many have been
+    written; stops the export if the job is deleted or reclaimed meanwhile
+    """
+    processed = 0
+    last_beat = time.monotonic()
+    for row in rows:
+        yield row
+        processed += 1
+        if processed % PROGRESS_INTERVAL == 0 or time.monotonic() - last_beat >= HEARTBEAT_SECONDS:
+            if not _claimed(job).update(processed_rows=processed, updated_at=timezone.now()):
+                raise ExportCancelled()
+            last_beat = time.monotonic()
+    job.processed_rows = processed
+
+
+def run_export_job(job):
+    """Write a claimed job's rows to a file under MEDIA_ROOT and mark it completed or failed"""
+    try:
+        columns, total, rows = EXPORT_SOURCES[job.export_type](job.organization_id, job.parameters)
+        if not _claimed(job).update(total_rows=total, updated_at=timezone.now()):
+            raise ExportCancelled()
+        job.total_rows = total
+        rows = _track_progress(job, rows)
+
+        with tempfile.TemporaryFile() as spool:
+            if job.format == 'xlsx':
+                exports.write_xlsx(rows, columns, spool, sheet_name=job.get_export_type_display()[:31])
+            elif job.format == 'ndjson':
+                for chunk in exports.stream_ndjson(rows, columns):
+                    spool.write(chunk)
+            else:
+                for line in exports.stream_csv(rows, columns):
+                    spool.write(line.encode('utf-8'))
+
+            spool.seek(0)
+            filename = f"{job.export_type}_{timezone.now().strftime('%Y%m%d_%H%M%S')}.{job.format}"
+            job.file.save(filename, File(spool), save=False)
+
+        job.status = 'completed'
+        job.completed_at = timezone.now()
+        job.expires_at = job.completed_at + timezone.timedelta(hours=settings.EXPORT_JOB_EXPIRY_HOURS)
+    except ExportCancelled:
+        logger.info(f"Export job {job.id} was deleted or reclaimed while running")
+        return job
+    except Exception as e:
+        logger.exception(f"Export job {job.id} failed")
+        job.status = 'failed'
+        job.error = str(e)
+        job.completed_at = timezone.now()
+
+    # Written only while the claim holds, so a job deleted meanwhile is not
+    # re-inserted and one requeued as stale is left to its new worker
+    finished = _claimed(job).update(
+        status=job.status, file=job.file.name, error=job.error, processed_rows=job.processed_rows,
+        completed_at=job.completed_at, expires_at=job.expires_at, updated_at=timezone.now()
+    )
+    if not finished:
+        logger.info(f"Export job {job.id} was deleted or reclaimed while running")
+        if job.file:
+            job.file.delete(save=False)
+    return job
+
+
+def reclaim_stale_jobs(now=None):
+    """
+    Requeue running jobs whose worker has stopped sending heartbeats (it
+    died or was killed), or fail them once they have been tried
+    ``EXPORT_JOB_MAX_ATTEMPTS`` times; returns how many were reclaimed
+    """
+    now = now or timezone.now()
+    stale = ExportJob.objects.filter(
+        status='running', updated_at__lt=now - timezone.timedelta(minutes=settings.EXPORT_JOB_STALE_MINUTES)
+    )
+    failed = stale.filter(attempts__gte=settings.EXPORT_JOB_MAX_ATTEMPTS).update(
+        status='failed', error='The export worker stopped before the export finished',
+        completed_at=now, updated_at=now
+    )
+    requeued = stale.filter(attempts__lt=settings.EXPORT_JOB_MAX_ATTEMPTS).update(
+        status='queued', started_at=None, processed_rows=0, updated_at=now
+    )
+    if failed or requeued:
+        logger.warning(f"Reclaimed stale export jobs: {requeued} requeued, {failed} failed")
+    return failed + requeued
+
+
+def process_queued_jobs(limit=None):
+    """Claim and run queued jobs until the queue is empty (or ``limit`` is reached)"""
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_export_job(job)
+        processed += 1
+    return processed
+
+
+def cleanup_expired_jobs():
+    """Delete artifacts of jobs past their expiry date and mark the jobs expired"""
+    expired = 0
+    for job in ExportJob.objects.filter(status='completed', expires_at__lt=timezone.now()):
+        if job.file:
+            job.file.delete(save=False)
+        job.status = 'expired'
+        job.save(update_fields=['status', 'file', 'updated_at'])
+        expired += 1
+    return expired
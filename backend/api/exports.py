@@ -0,0 +1,150 @@
+# api/exports.py
+import csv
+import json
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from .models import DataCategory
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+try:
+    import xlsxwriter
+except ImportError:  # pragma: no cover - xlsxwriter is optional
+    xlsxwriter = None
+
+# Rows fetched per database round trip when streaming
+CHUNK_SIZE = 2000
+
+# (header, row key) pairs for the flat data inventory export
+INVENTORY_COLUMNS = [
+    ('Category', 'category_name'),
+    ('Sensitive', 'is_sensitive'),
+    ('Legal Basis', 'legal_basis'),
+    ('Retention Period (days)', 'retention_period_days'),
+    ('Storage', 'storage_name'),
+    ('Storage Type', 'storage_type'),
+    ('Outside EEA', 'outside_eea'),
+    ('Purpose', 'purpose'),
+]
+
+
+def inventory_rows(organization_id):
+    """
+    Yield one flat row per category/storage mapping from a single joined query.
+
+    Categories without mappings yield one row with empty storage columns.
+    Rows are ordered by category so they can be regrouped without buffering.
+    """
+    queryset = DataCategory.objects.filter(organization_id=organization_id).values_list(
+        'id', 'name', 'is_sensitive', 'legal_basis', 'retention_period_days',
+        'mappings__storage__name', 'mappings__storage__storage_type',
+        'mappings__storage__is_outside_eea', 'mappings__purpose'
+    ).order_by('name', 'id', 'mappings__storage__name')
+
+    for (category_id, name, is_sensitive, legal_basis, retention, storage_name,
+         storage_type, outside_eea, purpose) in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield {
+            'category_id': category_id,
+            'category_name': name,
+            'is_sensitive': is_sensitive,
+            'legal_basis': legal_basis,
+            'retention_period_days': retention,
+            'storage_name': storage_name,
+            'storage_type': storage_type,
+            'outside_eea': outside_eea,
+            'purpose': purpose,
+        }
+
+
+def nest_inventory(rows):
+    """Regroup flat inventory rows into the nested per-category JSON structure"""
+    data = []
+    current_id = None
+    for row in rows:
+        if row['category_id'] != current_id:
+            current_id = row['category_id']
+            data.append({
+                'category_name': row['category_name'],
+                'is_sensitive': row['is_sensitive'],
+                'legal_basis': row['legal_basis'],
+                'retention_period_days': row['retention_period_days'],
+                'storages': []
+            })
+        if row['storage_name'] is not None:
+            data[-1]['storages'].append({
+                'storage_name': row['storage_name'],
+                'storage_type': row['storage_type'],
+                'outside_eea': row['outside_eea'],
+                'purpose': row['purpose']
+            })
+    return data
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer output"""
+
+    def write(self, value):
+        return value
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _xlsx_cell(value):
+    # Excel has no time zones, so aware datetimes are written as naive UTC
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(dt_timezone.utc).replace(tzinfo=None)
+    return _cell(value)
+
+
+def stream_csv(rows, columns):
+    """Yield CSV text for ``rows`` one line at a time, header first"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow([header for header, _ in columns])
+    for row in rows:
+        yield writer.writerow([_cell(row[key]) for _, key in columns])
+
+
+def _dumps_line(value):
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(value, default=str) + '\n').encode()
+
+
+def stream_ndjson(rows, columns):
+    """Yield one JSON document per row, newline-delimited"""
+    for row in rows:
+        yield _dumps_line({key: row[key] for _, key in columns})
+
+
+def write_xlsx(rows, columns, fileobj, sheet_name='Export'):
+    """
+    Write ``rows`` to ``fileobj`` as an XLSX workbook.
+
+    Uses xlsxwriter's constant-memory mode, which flushes each row to disk
+    as it is written, so memory stays flat regardless of row count.
+    """
+    if xlsxwriter is None:
+        raise RuntimeError('xlsxwriter is required for XLSX exports')
+
+    workbook = xlsxwriter.Workbook(fileobj, {
+        'constant_memory': True,
+        'in_memory': False,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss'
+    })
+    worksheet = workbook.add_worksheet(sheet_name)
+    bold = workbook.add_format({'bold': True})
+
+    worksheet.write_row(0, 0, [header for header, _ in columns], bold)
+    for index, row in enumerate(rows, start=1):
+        worksheet.write_row(index, 0, [_xlsx_cell(row[key]) for _, key in columns])
+
+    workbook.close()
@@ -0,0 +1,261 @@
+# api/file_store.py
+import datetime
+import hashlib
+import mimetypes
+import re
+from django.core.files import File
+from django.core.files.storage import Storage, default_storage
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import transaction
+from django.db.models import F
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+from django.utils.http import content_disposition_header
+
+try:
+    from storages.utils import clean_name
+except ImportError:  # pragma: no cover - django-storages is optional
+    clean_name = None
+
+# models.py imports this module for Document.file's storage, so the StoredFile
+# model is imported inside the functions that use it.
+
+PREFIX = 'cas'
+# Bytes read per chunk when hashing and serving files
+CHUNK_SIZE = 1024 * 1024
+# An unreferenced file stored more recently than this is kept: the document
+# it was uploaded for may not have been saved yet
+GRACE_PERIOD = datetime.timedelta(hours=1)
+
+BYTE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def blob_name(digest):
+    return f"{PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+def file_digest(content):
+    """SHA-256 of a file, as worked out while it was uploaded or else read in chunks"""
+    digest = getattr(content, 'sha256', None)
+    if digest is None:
+        hasher = hashlib.sha256()
+        for chunk in content.chunks(CHUNK_SIZE):
+            hasher.update(chunk)
+        digest = hasher.hexdigest()
+    return digest
+
+
+class HashingFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams each uploaded file to a temporary file on disk, never into
+    memory, hashing the chunks as they arrive; the finished upload carries
+    its digest as ``sha256``.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.hasher.hexdigest()
+        return file
+
+
+@deconstructible
+class ContentAddressedStorage(Storage):
+    """
+    Stores each distinct file once, named by its SHA-256 digest, in the
+    default storage (local disk, or a django-storages backend where one is
+    configured).
+
+    Saving content that is already stored writes nothing and returns the
+    existing name. Files are shared, so ``delete`` removes one only when no
+    document refers to it any more (see ``acquire``/``release``).
+    """
+
+    @property
+    def backend(self):
+        return default_storage
+
+    def save(self, name, content, max_length=None):
+        # Named by content, so the uploaded name is not made unique first
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        return self._save(name, content)
+
+    def _save(self, name, content):
+        from .models import StoredFile
+
+        digest = file_digest(content)
+        with transaction.atomic():
+            # Locked, so the file cannot be collected while it is being reused
+            stored, _ = StoredFile.objects.select_for_update().get_or_create(
+                digest=digest, defaults={'name': blob_name(digest), 'size': content.size}
+            )
+            if not self.backend.exists(stored.name):
+                stored.name = self.backend.save(stored.name, content)
+            stored.last_stored_at = timezone.now()
+            stored.save(update_fields=['name', 'last_stored_at'])
+        return stored.name
+
+    def _open(self, name, mode='rb'):
+        return self.backend.open(name, mode)
+
+    def delete(self, name):
+        collect(name)
+
+    def exists(self, name):
+        return self.backend.exists(name)
+
+    def size(self, name):
+        return self.backend.size(name)
+
+    def url(self, name):
+        return self.backend.url(name)
+
+    def path(self, name):
+        return self.backend.path(name)
+
+    def listdir(self, path):
+        return self.backend.listdir(path)
+
+    def get_modified_time(self, name):
+        return self.backend.get_modified_time(name)
+
+
+document_storage = ContentAddressedStorage()
+
+
+def acquire(name):
+    """Count a new reference to a stored file (files stored before deduplication are not counted)"""
+    from .models import StoredFile
+
+    if name:
+        StoredFile.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+
+def release(name):
+    """Drop a reference to a stored file, deleting it once the transaction commits if it was the last"""
+    from .models import StoredFile
+
+    if name and StoredFile.objects.filter(name=name, ref_count__gt=0).update(ref_count=F('ref_count') - 1):
+        transaction.on_commit(lambda: collect(name))
+
+
+def collect(name, now=None):
+    """
+    Delete a stored file that nothing refers to and that has not been
+    stored within ``GRACE_PERIOD``; returns whether it was deleted
+    """
+    from .models import StoredFile
+
+    cutoff = (now or timezone.now()) - GRACE_PERIOD
+    with transaction.atomic():
+        stored = StoredFile.objects.select_for_update().filter(
+            name=name, ref_count=0, last_stored_at__lt=cutoff
+        ).first()
+        if stored is None:
+            return False
+        document_storage.backend.delete(stored.name)
+        stored.delete()
+    return True
+
+
+def collect_unreferenced(now=None):
+    """Delete every stored file past its grace period that nothing refers to; returns how many"""
+    from .models import StoredFile
+
+    cutoff = (now or timezone.now()) - GRACE_PERIOD
+    names = StoredFile.objects.filter(ref_count=0, last_stored_at__lt=cutoff).values_list('name', flat=True)
+    return sum(collect(name, now=now) for name in list(names))
+
+
+def parse_range(header, size):
+    """
+    The (first, last) byte of a single-range ``Range`` header, or None to
+    send the whole file (no header, several ranges, or one we do not
+    understand). Raises ValueError if the range lies outside the file.
+    """
+    match = BYTE_RANGE.match((header or '').strip())
+    if match is None or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if not start:
+        # The last ``end`` bytes
+        if not int(end) or not size:
+            raise ValueError("Empty range")
+        return max(size - int(end), 0), size - 1
+    first = int(start)
+    if end and int(end) < first:
+        return None
+    if first >= size:
+        raise ValueError("Range starts beyond the end of the file")
+    return first, min(int(end), size - 1) if end else size - 1
+
+
+def read_range(storage, name, first, last):
+    """Yield bytes ``first`` to ``last`` of a stored file in chunks"""
+    backend = getattr(storage, 'backend', storage)
+    if clean_name is not None and hasattr(backend, 'bucket'):
+        # S3 (django-storages): fetch just the range rather than the whole object
+        key = backend._normalize_name(clean_name(name))
+        body = backend.bucket.Object(key).get(Range=f'bytes={first}-{last}')['Body']
+        yield from body.iter_chunks(CHUNK_SIZE)
+        return
+    with storage.open(name, 'rb') as f:
+        f.seek(first)
+        remaining = last - first + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_response(request, field_file, filename):
+    """
+    Serve a stored file, honouring a single byte ``Range`` (206) and
+    revalidation by ETag, which for stored files is their digest
+    """
+    name = field_file.name
+    digest = name.rsplit('/', 1)[-1] if name.startswith(f"{PREFIX}/") else None
+    etag = f'"{digest}"' if digest else None
+    if etag and etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponse(status=304)
+        response['ETag'] = etag
+        return response
+
+    size = field_file.storage.size(name)
+    content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range != etag:
+        # The client's copy is of another file
+        byte_range = None
+
+    if byte_range is None:
+        response = FileResponse(field_file.storage.open(name, 'rb'), as_attachment=True, filename=filename,
+                                content_type=content_type)
+    else:
+        first, last = byte_range
+        response = StreamingHttpResponse(read_range(field_file.storage, name, first, last), status=206,
+                                         content_type=content_type)
+        response['Content-Length'] = last - first + 1
+        response['Content-Range'] = f'bytes {first}-{last}/{size}'
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+    response['Accept-Ranges'] = 'bytes'
+    if etag:
+        response['ETag'] = etag
+    return response
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from api.file_store import collect_unreferenced
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Delete stored document files that no document refers to any more'
+
+    def handle(self, *args, **options):
+        deleted = collect_unreferenced()
+        logger.info(f"Deleted {deleted} unreferenced stored files")
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} unreferenced stored files"))
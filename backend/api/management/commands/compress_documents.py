@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Length
+from api.compression import COMPRESS_MIN_CHARS, MARKER, compress_text
+from api.models import Document
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Compress the bodies of documents written before body compression, a batch at a time'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            dest='organization',
+            default=None,
+            help='Only compress documents of this organization',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            dest='batch_size',
+            default=200,
+            help='Documents loaded per query (default: 200)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            dest='pause',
+            default=0,
+            help='Seconds to sleep between batches, to keep the load on the database down',
+        )
+
+    def handle(self, *args, **options):
+        # Plain-text bodies long enough to be worth compressing
+        documents = Document.objects.annotate(content_length=Length('content')).filter(
+            content_length__gte=COMPRESS_MIN_CHARS
+        ).exclude(content__startswith=MARKER)
+        if options['organization']:
+            documents = documents.filter(organization_id=options['organization'])
+        ids = list(documents.order_by('id').values_list('id', flat=True))
+
+        compressed = 0
+        before = after = 0
+        batch_size = max(1, options['batch_size'])
+        for start in range(0, len(ids), batch_size):
+            batch = Document.objects.filter(id__in=ids[start:start + batch_size]).only('id', 'content', 'updated_at')
+            for document in batch:
+                stored = compress_text(document.content)
+                if stored == document.content:
+                    # Does not get any smaller
+                    continue
+                # Skip documents edited since they were read; their save compressed them already.
+                # updated_at is left alone: the body has not changed.
+                if Document.objects.filter(pk=document.pk, updated_at=document.updated_at).update(
+                        content=document.content):
+                    compressed += 1
+                    before += len(document.content)
+                    after += len(stored)
+            self.stdout.write(f"Compressed {compressed} of {len(ids)} documents")
+            if options['pause'] and start + batch_size < len(ids):
+                time.sleep(options['pause'])
+
+        logger.info(f"Compressed {compressed} document bodies ({before} -> {after} characters)")
+        self.stdout.write(self.style.SUCCESS(
+            f"Compressed {compressed} documents ({before} -> {after} characters stored)"
+        ))
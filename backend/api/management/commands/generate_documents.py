@@ -0,0 +1,76 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from api.batch_documents import CHUNK_SIZE, generate_batch, stream_batch_zip, subject_queryset
+from api.models import Document
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Generate a document template for many data subjects at once'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--template',
+            dest='template',
+            required=True,
+            help='ID of the template document',
+        )
+        parser.add_argument(
+            '--filter',
+            dest='filters',
+            action='append',
+            default=[],
+            metavar='NAME=VALUE',
+            help='Only subjects matching this filter, e.g. marketing_consent=true (repeatable)',
+        )
+        parser.add_argument(
+            '--zip',
+            dest='zip',
+            default=None,
+            help='Also write the generated documents to this ZIP file',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            dest='workers',
+            default=None,
+            help='Render threads (default: DOCUMENT_BATCH_WORKERS)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            dest='chunk_size',
+            default=CHUNK_SIZE,
+            help=f'Subjects rendered and inserted per chunk (default: {CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            template = Document.objects.get(id=options['template'], is_template=True)
+        except (Document.DoesNotExist, ValidationError):
+            raise CommandError(f"Template {options['template']} not found")
+
+        filters = {}
+        for item in options['filters']:
+            name, separator, value = item.partition('=')
+            if not separator:
+                raise CommandError(f"Filters must look like NAME=VALUE, got {item}")
+            filters[name] = value.split(',') if name == 'ids' else value
+        try:
+            subjects = subject_queryset(template.organization_id, filters)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        kwargs = {'max_workers': options['workers'], 'chunk_size': options['chunk_size']}
+        if options['zip']:
+            with open(options['zip'], 'wb') as f:
+                for data in stream_batch_zip(template, subjects, **kwargs):
+                    f.write(data)
+            self.stdout.write(self.style.SUCCESS(f"Wrote generated documents to {options['zip']}"))
+            return
+
+        result = generate_batch(template, subjects, **kwargs)
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {result['generated']} documents in {result['chunks']} chunks ({result['elapsed_ms']} ms)"
+        ))
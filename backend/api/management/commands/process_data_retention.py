@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.db import transaction
 from api.models import DataSubject, ConsentActivity, Document, WorkflowTemplate, Organization
+from api.export_jobs import enqueue_export
 import logging
 import csv
 import os
@@ -25,6 +26,12 @@ class Command(BaseCommand):
             dest='generate_report',
             help='Generate a data retention report',
         )
+        parser.add_argument(
+            '--enqueue-report',
+            action='store_true',
+            dest='enqueue_report',
+            help='Queue the retention report as a background export job per organization',
+        )
         parser.add_argument(
             '--notify-expiring',
             action='store_true',
@@ -43,6 +50,7 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         dry_run = options['dry_run']
         generate_report = options['generate_report']
+        enqueue_report = options['enqueue_report']
         notify_expiring = options['notify_expiring']
         days_before_expiry = options['days_before_expiry']
         
@@ -75,6 +83,10 @@ class Command(BaseCommand):
         # Generate report if requested
         if generate_report:
             self._generate_retention_report(expired_subjects, expiring_soon_subjects, days_before_expiry)
+        
+        # Queue the report for the export worker (stored under MEDIA_ROOT) if requested
+        if enqueue_report:
+            self._enqueue_retention_reports(days_before_expiry)
     
     def _process_expired_subjects(self, expired_subjects):
         """Anonymize expired data subjects"""
@@ -107,7 +119,7 @@ class Command(BaseCommand):
                 subject.save()
                 
                 # Record anonymization in documents
-                for doc in Document.objects.filter(data_subject=subject):
+                for doc in Document.objects.with_content().filter(data_subject=subject):
                     doc.content += f"\n\nNOTE: This document relates to a data subject that has been anonymized on {timezone.now().strftime('%Y-%m-%d')} due to data retention policy."
                     doc.save()
                 
@@ -141,16 +153,15 @@ class Command(BaseCommand):
                     ))
                     continue
                 
-                # Create workflow for each expiring subject in this organization
-                org_subjects = expiring_subjects.filter(organization=org)
+                # Create workflows for all expiring subjects in this organization in one batch
+                org_subjects = list(expiring_subjects.filter(organization=org))
+                workflows = workflow_template.create_workflow_instances(
+                    [(subject, None) for subject in org_subjects]
+                )
                 
-                for subject in org_subjects:
-                    # Create a workflow instance
-                    workflow = workflow_template.create_workflow_instance(data_subject=subject)
-                    
-                    # Start the workflow
+                for subject, workflow in zip(org_subjects, workflows):
+                    # Start the workflow (advance_to_next_step saves the new status)
                     workflow.status = 'in_progress'
-                    workflow.save()
                     workflow.advance_to_next_step()
                     
                     counter += 1
@@ -162,6 +173,15 @@ class Command(BaseCommand):
             logger.error(f"Error creating notification workflows: {str(e)}")
             self.stdout.write(self.style.ERROR(f"Error creating notification workflows: {str(e)}"))
     
+    def _enqueue_retention_reports(self, days_before_expiry):
+        """Queue a retention report export job for every organization"""
+        for org in Organization.objects.all():
+            job = enqueue_export(
+                org.id, 'retention_report',
+                parameters={'days_before_expiry': days_before_expiry}
+            )
+            self.stdout.write(f"Queued retention report export {job.id} for organization {org.name}")
+    
     def _generate_retention_report(self, expired_subjects, expiring_soon_subjects, days_before_expiry):
         """Generate a CSV report of expired and soon-to-expire data subjects"""
         try:
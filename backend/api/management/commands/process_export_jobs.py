@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from api.export_jobs import cleanup_expired_jobs, process_queued_jobs, reclaim_stale_jobs
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Process queued background export jobs, requeue jobs whose worker died and clean up expired export files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            dest='once',
+            help='Drain the queue once and exit instead of running as a long-lived worker',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            dest='interval',
+            default=5,
+            help='Seconds to wait between polls when the queue is empty (default: 5)',
+        )
+        parser.add_argument(
+            '--cleanup',
+            action='store_true',
+            dest='cleanup',
+            help='Only delete expired export files, then exit',
+        )
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            expired = cleanup_expired_jobs()
+            self.stdout.write(self.style.SUCCESS(f"Removed {expired} expired export files"))
+            return
+        
+        if options['once']:
+            reclaim_stale_jobs()
+            processed = process_queued_jobs()
+            cleanup_expired_jobs()
+            self.stdout.write(self.style.SUCCESS(f"Processed {processed} export jobs"))
+            return
+        
+        self.stdout.write(f"Export worker started, polling every {options['interval']} seconds")
+        try:
+            while True:
+                reclaim_stale_jobs()
+                processed = process_queued_jobs()
+                if processed:
+                    self.stdout.write(f"Processed {processed} export jobs")
+                cleanup_expired_jobs()
+                if not processed:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("Export worker stopped"))
@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from api.workflow_processor import process_ready_steps
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Run ready automated workflow steps, once or as a long-lived worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            dest='once',
+            help='Run all ready steps once and exit instead of running as a long-lived worker',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            dest='interval',
+            default=5,
+            help='Seconds to wait between polls when no steps are ready (default: 5)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            dest='workers',
+            default=settings.WORKFLOW_PROCESSOR_WORKERS,
+            help=f'Number of worker threads (default: {settings.WORKFLOW_PROCESSOR_WORKERS})',
+        )
+        parser.add_argument(
+            '--organization',
+            dest='organization',
+            default=None,
+            help='Only process steps of this organization',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            dest='limit',
+            default=None,
+            help='Maximum number of steps to run per pass',
+        )
+
+    def _run(self, options):
+        executions = process_ready_steps(
+            organization_id=options['organization'],
+            max_workers=options['workers'],
+            limit=options['limit']
+        )
+        for execution in executions:
+            outcome = 'succeeded' if execution.success else 'failed'
+            self.stdout.write(f"Step {execution.step_id} of workflow {execution.workflow_id} {outcome}: {execution.result_notes}")
+        return executions
+
+    def handle(self, *args, **options):
+        if options['once']:
+            executions = self._run(options)
+            failed = sum(1 for execution in executions if not execution.success)
+            self.stdout.write(self.style.SUCCESS(f"Ran {len(executions)} automated steps ({failed} failed)"))
+            return
+        
+        self.stdout.write(
+            f"Workflow worker started with {options['workers']} threads, polling every {options['interval']} seconds"
+        )
+        try:
+            while True:
+                if not self._run(options):
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("Workflow worker stopped"))
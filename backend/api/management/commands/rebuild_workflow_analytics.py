@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from api.workflow_analytics import REBUILD_CHUNK_SIZE, rebuild_rollups
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Recompute the workflow analytics rollups from historical steps and workflows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            dest='organization',
+            default=None,
+            help='Only rebuild rollups of this organization',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            dest='chunk_size',
+            default=REBUILD_CHUNK_SIZE,
+            help=f'Steps read per query (default: {REBUILD_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_rollups(options['organization'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} workflow analytics rollups"))
@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, Q
+from api.models import WorkflowInstance
+import logging
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ['total_steps', 'completed_steps', 'failed_steps', 'skipped_steps']
+
+class Command(BaseCommand):
+    help = 'Recount the denormalized step counters on workflow instances and fix any that have drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            dest='dry_run',
+            help='Report drifted workflows without changing them',
+        )
+        parser.add_argument(
+            '--organization',
+            dest='organization',
+            default=None,
+            help='Only check workflows of this organization',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            dest='batch_size',
+            default=1000,
+            help='Workflows written per UPDATE batch (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        workflows = WorkflowInstance.objects.all()
+        if options['organization']:
+            workflows = workflows.filter(organization_id=options['organization'])
+
+        # Recount from the steps and keep only workflows whose counters disagree
+        drifted = workflows.annotate(
+            actual_total_steps=Count('steps'),
+            actual_completed_steps=Count('steps', filter=Q(steps__status='completed')),
+            actual_failed_steps=Count('steps', filter=Q(steps__status='failed')),
+            actual_skipped_steps=Count('steps', filter=Q(steps__status='skipped')),
+        ).exclude(
+            total_steps=F('actual_total_steps'),
+            completed_steps=F('actual_completed_steps'),
+            failed_steps=F('actual_failed_steps'),
+            skipped_steps=F('actual_skipped_steps'),
+        ).only('id', *COUNTER_FIELDS)
+
+        batch = []
+        repaired = 0
+        for workflow in drifted.iterator(chunk_size=options['batch_size']):
+            for field in COUNTER_FIELDS:
+                setattr(workflow, field, getattr(workflow, f'actual_{field}'))
+            self.stdout.write(
+                f"Workflow {workflow.id}: " +
+                ', '.join(f"{field}={getattr(workflow, field)}" for field in COUNTER_FIELDS)
+            )
+            repaired += 1
+            if not options['dry_run']:
+                batch.append(workflow)
+                if len(batch) >= options['batch_size']:
+                    WorkflowInstance.objects.bulk_update(batch, COUNTER_FIELDS)
+                    batch = []
+
+        if batch:
+            WorkflowInstance.objects.bulk_update(batch, COUNTER_FIELDS)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f"DRY RUN: {repaired} workflows have drifted counters"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Repaired counters on {repaired} workflows"))
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from api.deadlines import next_deadline, process_due_deadlines
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Flag data subject requests, workflows, steps and compliance actions as overdue when their deadline passes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            dest='once',
+            help='Flag everything that is currently due and exit instead of running as a long-lived scheduler',
+        )
+        parser.add_argument(
+            '--max-sleep',
+            type=int,
+            dest='max_sleep',
+            default=300,
+            help='Longest wait in seconds before re-checking for new, earlier deadlines (default: 300)',
+        )
+
+    def _run(self):
+        flipped = process_due_deadlines()
+        for kind, count in flipped.items():
+            if count:
+                self.stdout.write(f"{kind}: {count}")
+        return flipped
+
+    def handle(self, *args, **options):
+        if options['once']:
+            flipped = self._run()
+            self.stdout.write(self.style.SUCCESS(f"Flagged {sum(flipped.values())} overdue items"))
+            return
+        
+        self.stdout.write("Deadline scheduler started")
+        try:
+            while True:
+                self._run()
+                # Sleep until the next deadline, but wake periodically for items created since
+                upcoming = next_deadline()
+                delay = options['max_sleep']
+                if upcoming is not None:
+                    delay = min(delay, max((upcoming - timezone.now()).total_seconds(), 0) + 1)
+                time.sleep(delay)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("Deadline scheduler stopped"))
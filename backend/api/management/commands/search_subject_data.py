@@ -0,0 +1,64 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from api.models import Organization
+from api.subject_search import MAX_LIMIT, search_subject_data
+import json
+
+class Command(BaseCommand):
+    help = 'Find everything held about a data subject across all personal-data tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--email',
+            dest='email',
+            required=True,
+            help='Email address of the data subject',
+        )
+        parser.add_argument(
+            '--organization',
+            dest='organization',
+            required=True,
+            help='ID of the organization to search',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            dest='limit',
+            default=MAX_LIMIT,
+            help=f'Maximum number of records to return (default: {MAX_LIMIT})',
+        )
+        parser.add_argument(
+            '--offset',
+            type=int,
+            dest='offset',
+            default=0,
+            help='Number of records to skip (default: 0)',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            dest='json',
+            help='Print the full result as JSON instead of a summary',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(id=options['organization'])
+        except (Organization.DoesNotExist, ValidationError):
+            raise CommandError(f"Organization {options['organization']} not found")
+
+        result = search_subject_data(
+            organization.id, options['email'], limit=options['limit'], offset=options['offset']
+        )
+
+        if options['json']:
+            self.stdout.write(json.dumps(result, cls=DjangoJSONEncoder, indent=2))
+            return
+
+        self.stdout.write(f"Records held about {result['email']} in {organization.name}:")
+        for source, count in result['counts'].items():
+            self.stdout.write(f"  {source}: {count} ({result['timings_ms'][source]} ms)")
+        for record in result['results']:
+            self.stdout.write(f"  {record['timestamp']:%Y-%m-%d %H:%M} {record['source']} {record['id']}")
+        self.stdout.write(self.style.SUCCESS(f"Found {result['count']} records"))
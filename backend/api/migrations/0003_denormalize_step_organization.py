@@ -0,0 +1,40 @@
+# Generated by Django 4.2.8 on 2026-10-19 05:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def populate_step_organization(apps, schema_editor):
+    WorkflowStep = apps.get_model('api', 'WorkflowStep')
+    WorkflowStepTemplate = apps.get_model('api', 'WorkflowStepTemplate')
+    WorkflowInstance = apps.get_model('api', 'WorkflowInstance')
+    WorkflowTemplate = apps.get_model('api', 'WorkflowTemplate')
+
+    WorkflowStep.objects.update(organization_id=Subquery(
+        WorkflowInstance.objects.filter(id=OuterRef('workflow_id')).values('organization_id')[:1]
+    ))
+    WorkflowStepTemplate.objects.update(organization_id=Subquery(
+        WorkflowTemplate.objects.filter(id=OuterRef('workflow_template_id')).values('organization_id')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_document_is_template_document_template_variables_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflowstep',
+            name='organization',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='workflow_steps', to='api.organization'),
+        ),
+        migrations.AddField(
+            model_name='workflowsteptemplate',
+            name='organization',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='workflow_step_templates', to='api.organization'),
+        ),
+        migrations.RunPython(populate_step_organization, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.8 on 2026-10-19 05:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Kept separate from 0003 so the backfill commits before the NOT NULL change on PostgreSQL
+
+    dependencies = [
+        ('api', '0003_denormalize_step_organization'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='workflowstep',
+            name='organization',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workflow_steps', to='api.organization'),
+        ),
+        migrations.AlterField(
+            model_name='workflowsteptemplate',
+            name='organization',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workflow_step_templates', to='api.organization'),
+        ),
+    ]
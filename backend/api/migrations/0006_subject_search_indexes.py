@@ -0,0 +1,26 @@
+# Generated by Django 4.2.8 on 2026-10-19 05:35
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_exportjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='consentactivity',
+            index=models.Index(fields=['data_subject', 'timestamp'], name='api_consent_data_su_b99d32_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='datasubject',
+            index=models.Index(models.F('organization'), django.db.models.functions.text.Lower('email'), name='subject_org_email_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='datasubjectrequest',
+            index=models.Index(models.F('organization'), django.db.models.functions.text.Lower('data_subject_email'), name='dsr_org_email_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.8 on 2026-10-19 05:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_subject_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkflowStepExecution',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('worker', models.CharField(blank=True, max_length=255)),
+                ('success', models.BooleanField(default=False)),
+                ('result_notes', models.TextField(blank=True)),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('duration_ms', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='workflowstep',
+            index=models.Index(fields=['status', 'is_automated'], name='api_workflo_status_df27f8_idx'),
+        ),
+        migrations.AddField(
+            model_name='workflowstepexecution',
+            name='organization',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='step_executions', to='api.organization'),
+        ),
+        migrations.AddField(
+            model_name='workflowstepexecution',
+            name='step',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='executions', to='api.workflowstep'),
+        ),
+        migrations.AddField(
+            model_name='workflowstepexecution',
+            name='workflow',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='step_executions', to='api.workflowinstance'),
+        ),
+    ]
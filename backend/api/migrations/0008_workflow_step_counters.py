@@ -0,0 +1,54 @@
+# Generated by Django 4.2.8 on 2026-10-19 05:44
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_step_counters(apps, schema_editor):
+    WorkflowInstance = apps.get_model('api', 'WorkflowInstance')
+    WorkflowStep = apps.get_model('api', 'WorkflowStep')
+
+    def step_count(**filters):
+        steps = WorkflowStep.objects.filter(workflow_id=OuterRef('pk'), **filters)
+        return Coalesce(Subquery(
+            steps.order_by().values('workflow_id').annotate(n=Count('id')).values('n')[:1]
+        ), 0)
+
+    WorkflowInstance.objects.update(
+        total_steps=step_count(),
+        completed_steps=step_count(status='completed'),
+        failed_steps=step_count(status='failed'),
+        skipped_steps=step_count(status='skipped'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_workflowstepexecution'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflowinstance',
+            name='completed_steps',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='workflowinstance',
+            name='failed_steps',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='workflowinstance',
+            name='skipped_steps',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='workflowinstance',
+            name='total_steps',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(populate_step_counters, migrations.RunPython.noop),
+    ]
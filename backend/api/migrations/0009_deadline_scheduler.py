@@ -0,0 +1,75 @@
+# Generated by Django 4.2.8 on 2026-10-19 05:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_workflow_step_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('request_overdue', 'Data Subject Request Overdue'), ('workflow_overdue', 'Workflow Overdue'), ('step_overdue', 'Workflow Step Overdue'), ('action_overdue', 'Compliance Action Overdue')], max_length=50)),
+                ('title', models.CharField(max_length=255)),
+                ('object_id', models.UUIDField(blank=True, null=True)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='datasubjectrequest',
+            name='overdue_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='workflowinstance',
+            name='overdue_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='workflowstep',
+            name='overdue_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='complianceaction',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'in_progress'])), fields=['due_date'], name='action_open_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='datasubjectrequest',
+            index=models.Index(condition=models.Q(('overdue_at__isnull', True), ('status__in', ['new', 'in_progress'])), fields=['due_date'], name='dsr_open_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workflowinstance',
+            index=models.Index(condition=models.Q(('overdue_at__isnull', True), ('status__in', ['pending', 'in_progress'])), fields=['due_date'], name='workflow_open_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workflowstep',
+            index=models.Index(condition=models.Q(('due_date__isnull', False), ('overdue_at__isnull', True), ('status__in', ['pending', 'in_progress'])), fields=['due_date'], name='step_open_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='organization',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='api.organization'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['organization', 'user', 'read_at'], name='api_notific_organiz_0d1d60_idx'),
+        ),
+    ]
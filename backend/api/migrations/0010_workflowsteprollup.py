@@ -0,0 +1,40 @@
+# Generated by Django 4.2.8 on 2026-10-19 05:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_deadline_scheduler'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkflowStepRollup',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('step_type', models.CharField(blank=True, max_length=100)),
+                ('day', models.DateField()),
+                ('completed', models.IntegerField(default=0)),
+                ('failed', models.IntegerField(default=0)),
+                ('skipped', models.IntegerField(default=0)),
+                ('duration_count', models.IntegerField(default=0)),
+                ('duration_total', models.FloatField(default=0)),
+                ('duration_max', models.FloatField(default=0)),
+                ('duration_histogram', models.JSONField(default=list)),
+                ('queue_count', models.IntegerField(default=0)),
+                ('queue_total', models.FloatField(default=0)),
+                ('queue_max', models.FloatField(default=0)),
+                ('queue_histogram', models.JSONField(default=list)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='workflow_rollups', to='api.organization')),
+                ('template', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='api.workflowtemplate')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organization', 'day'], name='api_workflo_organiz_a2f8b5_idx')],
+                'unique_together': {('template', 'step_type', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-19 05:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_workflowsteprollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflowtemplate',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.8 on 2026-10-19 06:04
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_workflowtemplate_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentRevision',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('number', models.PositiveIntegerField()),
+                ('version', models.CharField(max_length=50)),
+                ('title', models.CharField(max_length=255)),
+                ('is_snapshot', models.BooleanField(default=False)),
+                ('data', models.BinaryField()),
+                ('size', models.IntegerField(default=0)),
+                ('stored_size', models.IntegerField(default=0)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='document_revisions', to=settings.AUTH_USER_MODEL)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='api.document')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='document_revisions', to='api.organization')),
+            ],
+            options={
+                'ordering': ['document', 'number'],
+                'unique_together': {('document', 'number')},
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.8 on 2026-10-19 06:08
+
+import api.compression
+from django.db import migrations
+
+
+# The column stays a text column and existing bodies stay readable as they
+# are: they are compressed in the background by `manage.py compress_documents`
+# (and on their next save).
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_documentrevision'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='document',
+            options={'base_manager_name': 'objects'},
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='content',
+            field=api.compression.CompressedTextField(blank=True),
+        ),
+    ]
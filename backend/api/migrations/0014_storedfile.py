@@ -0,0 +1,47 @@
+# Generated by Django 4.2.8 on 2026-10-19 06:15
+
+import api.file_store
+import os
+from django.db import migrations, models
+import django.utils.timezone
+import uuid
+
+
+def populate_file_names(apps, schema_editor):
+    # Files uploaded before keep their paths under documents/; only their names are recorded
+    Document = apps.get_model('api', 'Document')
+    for document in Document.objects.exclude(file='').only('id', 'file').iterator():
+        Document.objects.filter(pk=document.pk).update(file_name=os.path.basename(document.file.name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_compress_document_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.BigIntegerField(default=0)),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_stored_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='file_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='file',
+            field=models.FileField(blank=True, storage=api.file_store.ContentAddressedStorage(), upload_to='documents/'),
+        ),
+        migrations.RunPython(populate_file_names, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-19 06:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_workflowstep_claimed_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflowstep',
+            name='execution_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
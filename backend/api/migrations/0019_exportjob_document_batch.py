@@ -0,0 +1,18 @@
+# Generated by Django 4.2.8 on 2026-10-19 06:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_workflowstep_execution_started_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='export_type',
+            field=models.CharField(choices=[('data_subjects', 'Data Subjects'), ('consent_activities', 'Consent Activity History'), ('data_inventory', 'Data Inventory'), ('retention_report', 'Data Retention Report'), ('document_batch', 'Batch Document Generation')], max_length=50),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.8 on 2026-10-19 06:52
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def flag_overdue_actions(apps, schema_editor):
+    # Actions the scheduler moved to the overdue status are open actions with
+    # overdue_at set from now on; their earlier status was not kept
+    ComplianceAction = apps.get_model('api', 'ComplianceAction')
+    ComplianceAction.objects.filter(status='overdue').update(status='pending', overdue_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_exportjob_document_batch'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='complianceaction',
+            name='action_open_due_idx',
+        ),
+        migrations.AddField(
+            model_name='complianceaction',
+            name='overdue_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='complianceaction',
+            index=models.Index(condition=models.Q(('overdue_at__isnull', True), ('status__in', ['pending', 'in_progress'])), fields=['due_date'], name='action_open_due_idx'),
+        ),
+        migrations.RunPython(flag_overdue_actions, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,19 @@
 # models.py
 
-from django.db import models
+import bisect
+import os
+from collections import defaultdict
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
+from django.db.models.functions import Lower
 from django.utils import timezone
 import uuid
+
+from . import document_renderer, file_store, template_cache
+from .compression import CompressedTextField
+from .workflow_engine import WorkflowEngine
+
+
 class Organization(models.Model):
     """Organization/company using the system"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -143,9 +153,19 @@ class DataSubjectRequest(models.Model):
     due_date = models.DateTimeField()
     completed_date = models.DateTimeField(null=True, blank=True)
     notes = models.TextField(blank=True)
+    # Set by the deadline scheduler once the due date passes while the request is open
+    overdue_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Allowed status changes for bulk triage
+    STATUS_TRANSITIONS = {
+        'new': ['in_progress', 'completed', 'denied'],
+        'in_progress': ['new', 'completed', 'denied'],
+        'completed': ['in_progress'],
+        'denied': ['in_progress'],
+    }
+    
     def __str__(self):
         return f"{self.request_type} request from {self.data_subject_name}"
     
@@ -153,7 +173,32 @@ class DataSubjectRequest(models.Model):
         # Set due date to 30 days after request if not set
         if not self.due_date:
             self.due_date = self.date_received + timezone.timedelta(days=30)
+        # An extended deadline is no longer overdue
+        if self.overdue_at and self.due_date > timezone.now():
+            self.overdue_at = None
         super().save(*args, **kwargs)
+    
+    class Meta:
+        indexes = [
+            # Case-insensitive lookups by requester email (subject-access search)
+            models.Index(models.F('organization'), Lower('data_subject_email'), name='dsr_org_email_lower_idx'),
+            # Upcoming deadlines of open requests (deadline scheduler)
+            models.Index(fields=['due_date'], name='dsr_open_due_idx',
+                         condition=models.Q(status__in=['new', 'in_progress'], overdue_at__isnull=True)),
+        ]
+
+
+class DocumentQuerySet(models.QuerySet):
+    def with_content(self):
+        """Load the bodies along with the rest of each row"""
+        return self.defer(None)
+
+
+class DocumentManager(models.Manager.from_queryset(DocumentQuerySet)):
+    """Documents without their bodies, which are loaded when first read (or up front with ``with_content()``)"""
+    
+    def get_queryset(self):
+        return super().get_queryset().defer('content')
 
 
 class Document(models.Model):
@@ -174,10 +219,13 @@ class Document(models.Model):
         ('other', 'Other Document')
     ])
     is_template = models.BooleanField(default=False)
-    content = models.TextField(blank=True)
+    # Stored compressed when large; left out of queries unless asked for (see DocumentManager)
+    content = CompressedTextField(blank=True)
     template_variables = models.JSONField(null=True, blank=True, 
                                          help_text="JSON specification of variables used in template")
-    file = models.FileField(upload_to='documents/', blank=True)
+    # Stored once per distinct content and shared (see StoredFile); file_name is the name it was uploaded as
+    file = models.FileField(upload_to='documents/', storage=file_store.document_storage, blank=True)
+    file_name = models.CharField(max_length=255, blank=True)
     version = models.CharField(max_length=50, default='1.0')
     status = models.CharField(max_length=100, choices=[
         ('draft', 'Draft'),
@@ -191,8 +239,44 @@ class Document(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = DocumentManager()
+    
     def __str__(self):
         return f"{self.title} (v{self.version})"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember whether this was a template, so un-templating it is noticed on save
+        if 'is_template' in field_names:
+            instance._loaded_is_template = instance.is_template
+        # And which stored file it referred to, so its reference is dropped when that changes
+        if 'file' in field_names:
+            instance._loaded_file = instance.file.name or None
+        return instance
+    
+    def refresh_from_db(self, using=None, fields=None):
+        # The base manager leaves the body out, so it is read on its own: when first
+        # accessed, or on a full refresh if it was loaded before
+        if fields is None:
+            load_content = 'content' not in self.get_deferred_fields()
+        else:
+            fields = list(fields)
+            load_content = 'content' in fields
+            fields = [field for field in fields if field != 'content']
+        if fields is None or fields:
+            super().refresh_from_db(using=using, fields=fields)
+        if load_content:
+            self.content = Document._base_manager.db_manager(using or self._state.db).filter(
+                pk=self.pk
+            ).values_list('content', flat=True).get()
+    
+    def save(self, *args, **kwargs):
+        if self.file and not self.file._committed:
+            self.file_name = os.path.basename(self.file.name)
+        super().save(*args, **kwargs)
+        self._loaded_is_template = self.is_template
+        self._loaded_file = self.file.name or None
         
     def generate_document_for_subject(self, data_subject):
         """Generate a new document instance for a specific data subject from this template"""
@@ -200,41 +284,79 @@ class Document(models.Model):
             raise ValueError("Cannot generate a document from a non-template")
             
         # Create a new document based on this template
-        new_doc = Document.objects.create(
-            organization=self.organization,
+        new_doc = self.new_document_for_subject(data_subject, self._populate_template_for_subject(data_subject))
+        new_doc.save()
+        
+        return new_doc
+    
+    def new_document_for_subject(self, data_subject, content):
+        """An unsaved document generated from this template for ``data_subject``, with rendered ``content``"""
+        return Document(
+            organization_id=self.organization_id,
             title=f"{self.title} - {data_subject.first_name} {data_subject.last_name}",
             document_type=self.document_type,
             is_template=False,
-            content=self._populate_template_for_subject(data_subject),
+            content=content,
             version='1.0',
             status='active',
-            created_by=self.created_by,
+            created_by_id=self.created_by_id,
             data_subject=data_subject,
         )
-        
-        return new_doc
     
     def _populate_template_for_subject(self, data_subject):
         """Substitute template variables with values from data subject"""
-        content = self.content
-        
-        # Basic replacements
-        replacements = {
-            '{{subject_first_name}}': data_subject.first_name,
-            '{{subject_last_name}}': data_subject.last_name,
-            '{{subject_email}}': data_subject.email,
-            '{{subject_full_name}}': f"{data_subject.first_name} {data_subject.last_name}",
-            '{{organization_name}}': self.organization.name,
-            '{{organization_address}}': self.organization.address,
-            '{{current_date}}': timezone.now().strftime('%Y-%m-%d'),
-            '{{expiry_date}}': data_subject.data_expiry_date.strftime('%Y-%m-%d') if data_subject.data_expiry_date else 'Not set',
-        }
-        
-        # Apply all replacements
-        for key, value in replacements.items():
-            content = content.replace(key, value)
-            
-        return content
+        return document_renderer.render_document(self, subject=data_subject)
+    
+    class Meta:
+        # Related documents (a step's template, a subject's documents) are loaded without bodies too
+        base_manager_name = 'objects'
+
+
+class DocumentRevision(models.Model):
+    """
+    One version of a document's body, stored compressed either in full
+    (a snapshot) or as a delta against the previous revision's body
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='document_revisions')
+    document = models.ForeignKey(Document, on_delete=models.CASCADE, related_name='revisions')
+    number = models.PositiveIntegerField()
+    version = models.CharField(max_length=50)
+    title = models.CharField(max_length=255)
+    is_snapshot = models.BooleanField(default=False)
+    data = models.BinaryField()
+    # Length of the body in characters, and bytes actually stored for it
+    size = models.IntegerField(default=0)
+    stored_size = models.IntegerField(default=0)
+    content_hash = models.CharField(max_length=64)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                                   related_name='document_revisions')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.title} (v{self.version}, revision {self.number})"
+    
+    class Meta:
+        ordering = ['document', 'number']
+        unique_together = ['document', 'number']
+
+
+class StoredFile(models.Model):
+    """
+    One distinct uploaded file, stored under its SHA-256 digest and shared by
+    every document that uploaded the same bytes; deleted once ``ref_count``
+    drops to zero (see api/file_store.py)
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    digest = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.BigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_stored_at = models.DateTimeField(default=timezone.now)
+    
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} references)"
 
 
 class ComplianceAction(models.Model):
@@ -257,11 +379,26 @@ class ComplianceAction(models.Model):
     due_date = models.DateField(null=True, blank=True)
     assigned_to = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_actions')
     completed_date = models.DateField(null=True, blank=True)
+    # Set by the deadline scheduler once the due date passes while the action is open
+    overdue_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return self.title
+    
+    def save(self, *args, **kwargs):
+        # An extended deadline is no longer overdue (the due date itself is not past yet)
+        if self.overdue_at and self.due_date and self.due_date >= timezone.localdate():
+            self.overdue_at = None
+        super().save(*args, **kwargs)
+    
+    class Meta:
+        indexes = [
+            # Upcoming deadlines of open actions (deadline scheduler)
+            models.Index(fields=['due_date'], name='action_open_due_idx',
+                         condition=models.Q(status__in=['pending', 'in_progress'], overdue_at__isnull=True)),
+        ]
 
 class DataSubject(models.Model):
     """Individuals whose data is being processed"""
@@ -299,7 +436,7 @@ class DataSubject(models.Model):
     
     def save(self, *args, **kwargs):
         # Update consent dates if consent status changed
-        if self.pk:
+        if not self._state.adding:
             old_instance = DataSubject.objects.get(pk=self.pk)
             
             if old_instance.marketing_consent != self.marketing_consent and self.marketing_consent:
@@ -336,6 +473,9 @@ class DataSubject(models.Model):
     class Meta:
         verbose_name_plural = 'Data Subjects'
         unique_together = ['organization', 'email']
+        indexes = [
+            models.Index(models.F('organization'), Lower('email'), name='subject_org_email_lower_idx'),
+        ]
 
 
 class ConsentActivity(models.Model):
@@ -367,6 +507,9 @@ class ConsentActivity(models.Model):
     
     class Meta:
         verbose_name_plural = 'Consent Activities'
+        indexes = [
+            models.Index(fields=['data_subject', 'timestamp']),
+        ]
 
 class WorkflowTemplate(models.Model):
     """Templates for GDPR workflows with automated steps"""
@@ -384,42 +527,98 @@ class WorkflowTemplate(models.Model):
     ])
     estimated_completion_days = models.IntegerField(default=30)
     is_active = models.BooleanField(default=True)
+    # Bumped whenever the template, its steps or their document templates change
+    version = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.name} ({self.get_workflow_type_display()})"
     
+    def save(self, *args, **kwargs):
+        bump = not self._state.adding
+        if bump:
+            # Incremented in the database, as bump_versions does, so a save from
+            # a stale instance cannot reuse a version another change already took
+            self.version = models.F('version') + 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        super().save(*args, **kwargs)
+        if bump:
+            self.refresh_from_db(fields=['version'])
+        template_cache.invalidate(self.pk)
+    
+    @classmethod
+    def bump_versions(cls, queryset):
+        """Mark the templates in ``queryset`` as changed, e.g. after one of their steps changed"""
+        template_ids = list(queryset.values_list('pk', flat=True))
+        if template_ids:
+            cls.objects.filter(pk__in=template_ids).update(
+                version=models.F('version') + 1, updated_at=timezone.now()
+            )
+            for template_id in template_ids:
+                template_cache.invalidate(template_id)
+    
+    # Rows per INSERT when instantiating many workflows at once
+    BULK_BATCH_SIZE = 500
+    
+    STEP_FIELDS = [
+        'name', 'description', 'step_type', 'order',
+        'is_automated', 'automation_script', 'document_template_id'
+    ]
+    
+    def get_compiled(self):
+        """This template's steps and document templates, read once per version per process"""
+        return template_cache.compiled_template(self)
+    
+    def get_step_blueprints(self):
+        """Field values for this template's steps, in order"""
+        return self.get_compiled().blueprints
+    
     def create_workflow_instance(self, data_subject=None, request=None):
         """Create a new workflow instance from this template"""
-        workflow = WorkflowInstance.objects.create(
-            organization=self.organization,
-            template=self,
-            name=self.name,
-            data_subject=data_subject,
-            related_request=request,
-            due_date=timezone.now() + timezone.timedelta(days=self.estimated_completion_days)
-        )
+        return self.create_workflow_instances([(data_subject, request)])[0]
+    
+    def create_workflow_instances(self, targets):
+        """
+        Create one workflow instance per ``(data_subject, request)`` pair.
+        
+        All workflows are written with one bulk insert and all of their steps
+        with another, however many steps the template has.
+        """
+        blueprints = self.get_step_blueprints()
+        due_date = timezone.now() + timezone.timedelta(days=self.estimated_completion_days)
         
-        # Create all workflow steps from the template
-        for step_template in self.step_templates.all().order_by('order'):
-            WorkflowStep.objects.create(
-                workflow=workflow,
-                name=step_template.name,
-                description=step_template.description,
-                step_type=step_template.step_type,
-                order=step_template.order,
-                is_automated=step_template.is_automated,
-                automation_script=step_template.automation_script,
-                document_template=step_template.document_template
+        workflows = [
+            WorkflowInstance(
+                organization_id=self.organization_id,
+                template=self,
+                name=self.name,
+                data_subject=data_subject,
+                related_request=request,
+                due_date=due_date,
+                total_steps=len(blueprints)
             )
+            for data_subject, request in targets
+        ]
+        steps = [
+            WorkflowStep(organization_id=self.organization_id, workflow=workflow, **blueprint)
+            for workflow in workflows
+            for blueprint in blueprints
+        ]
         
-        return workflow
+        with transaction.atomic():
+            WorkflowInstance.objects.bulk_create(workflows, batch_size=self.BULK_BATCH_SIZE)
+            WorkflowStep.objects.bulk_create(steps, batch_size=self.BULK_BATCH_SIZE)
+        
+        return workflows
 
 
 class WorkflowStepTemplate(models.Model):
     """Templates for steps within workflow templates"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Denormalized from workflow_template so tenant filtering needs no join
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='workflow_step_templates')
     workflow_template = models.ForeignKey(WorkflowTemplate, on_delete=models.CASCADE, related_name='step_templates')
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
@@ -446,6 +645,11 @@ class WorkflowStepTemplate(models.Model):
     def __str__(self):
         return f"{self.name} - {self.workflow_template.name}"
     
+    def save(self, *args, **kwargs):
+        if not self.organization_id:
+            self.organization_id = self.workflow_template.organization_id
+        super().save(*args, **kwargs)
+    
     class Meta:
         ordering = ['workflow_template', 'order']
 
@@ -473,58 +677,87 @@ class WorkflowInstance(models.Model):
     completed_date = models.DateTimeField(null=True, blank=True)
     current_step = models.ForeignKey('WorkflowStep', on_delete=models.SET_NULL, null=True, blank=True,
                                     related_name='current_for_workflows')
+    # Step counters, kept in step with the steps' statuses (see step_counter_deltas)
+    total_steps = models.IntegerField(default=0)
+    completed_steps = models.IntegerField(default=0)
+    failed_steps = models.IntegerField(default=0)
+    skipped_steps = models.IntegerField(default=0)
+    # Set by the deadline scheduler once the due date passes while the workflow is open
+    overdue_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    # Step status -> counter field
+    STEP_COUNTERS = {
+        'completed': 'completed_steps',
+        'failed': 'failed_steps',
+        'skipped': 'skipped_steps',
+    }
+    
     def __str__(self):
         return f"{self.name} ({self.get_status_display()})"
     
-    def advance_to_next_step(self):
-        """Move to the next step in the workflow"""
-        if self.status != 'in_progress':
-            self.status = 'in_progress'
-            
-        # Mark current step as completed if it exists
-        if self.current_step:
-            self.current_step.status = 'completed'
-            self.current_step.completed_date = timezone.now()
-            self.current_step.save()
-            
-        # Find the next uncompleted step
-        next_step = self.steps.filter(status='pending').order_by('order').first()
+    @classmethod
+    def step_counter_deltas(cls, transitions):
+        """
+        Counter changes for ``(old status, new status)`` pairs of steps.
         
-        if next_step:
-            next_step.status = 'in_progress'
-            next_step.start_date = timezone.now()
-            next_step.save()
-            self.current_step = next_step
-            self.save()
-            
-            # If the step is automated, execute it
-            if next_step.is_automated:
-                next_step.execute_automation()
-        else:
-            # No more steps, workflow is complete
-            self.status = 'completed'
-            self.completed_date = timezone.now()
-            self.current_step = None
-            self.save()
-            
-        return self.current_step
+        An old status of None means the step was added, a new status of None
+        that it was removed.
+        """
+        deltas = defaultdict(int)
+        for old_status, new_status in transitions:
+            if old_status is None:
+                deltas['total_steps'] += 1
+            elif old_status in cls.STEP_COUNTERS:
+                deltas[cls.STEP_COUNTERS[old_status]] -= 1
+            if new_status is None:
+                deltas['total_steps'] -= 1
+            elif new_status in cls.STEP_COUNTERS:
+                deltas[cls.STEP_COUNTERS[new_status]] += 1
+        return {field: delta for field, delta in deltas.items() if delta}
+    
+    @classmethod
+    def apply_step_counter_deltas(cls, workflow_id, deltas, **fields):
+        """Apply counter deltas (plus any other ``fields``) to one workflow in a single UPDATE"""
+        updates = {field: models.F(field) + delta for field, delta in deltas.items()}
+        updates.update(fields)
+        if updates:
+            cls.objects.filter(pk=workflow_id).update(**updates)
+    
+    def save(self, *args, **kwargs):
+        # An extended deadline is no longer overdue
+        if self.overdue_at and self.due_date > timezone.now():
+            self.overdue_at = None
+        super().save(*args, **kwargs)
+    
+    def record_outcomes(self, steps=(), workflow_finished=False):
+        """Add steps that just reached a final status (and the workflow, once finished) to the analytics rollups"""
+        WorkflowStepRollup.record(WorkflowStepRollup.samples(self, steps, workflow_finished))
+    
+    def advance_to_next_step(self):
+        """Move to the next step in the workflow, running any automated steps on the way"""
+        return WorkflowEngine(self).advance()
     
     def get_progress_percentage(self):
         """Calculate workflow completion percentage"""
-        total_steps = self.steps.count()
-        if total_steps == 0:
+        if self.total_steps == 0:
             return 0
-        
-        completed_steps = self.steps.filter(status='completed').count()
-        return int((completed_steps / total_steps) * 100)
+        return int((self.completed_steps / self.total_steps) * 100)
+    
+    class Meta:
+        indexes = [
+            # Upcoming deadlines of open workflows (deadline scheduler)
+            models.Index(fields=['due_date'], name='workflow_open_due_idx',
+                         condition=models.Q(status__in=['pending', 'in_progress'], overdue_at__isnull=True)),
+        ]
 
 
 class WorkflowStep(models.Model):
     """Individual steps within a workflow instance"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Denormalized from workflow so tenant filtering needs no join
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='workflow_steps')
     workflow = models.ForeignKey(WorkflowInstance, on_delete=models.CASCADE, related_name='steps')
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
@@ -558,41 +791,287 @@ class WorkflowStep(models.Model):
     result_notes = models.TextField(blank=True)
     generated_document = models.ForeignKey(Document, on_delete=models.SET_NULL, null=True, blank=True,
                                           related_name='generated_from_steps')
+    # Set by the deadline scheduler once the due date passes while the step is open
+    overdue_at = models.DateTimeField(null=True, blank=True)
+    # When the processor last claimed the step to run its automation
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    # When the step's automation first started running; its queue time runs
+    # from start_date (when it became the current step) to this
+    execution_started_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"{self.name} - {self.workflow.name}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so counter changes can be worked out on save
+        if 'status' in field_names:
+            instance._loaded_status = instance.status
+        return instance
+    
+    def save(self, *args, **kwargs):
+        if not self.organization_id:
+            self.organization_id = self.workflow.organization_id
+        
+        # An extended deadline is no longer overdue
+        if self.overdue_at and self.due_date and self.due_date > timezone.now():
+            self.overdue_at = None
+        
+        old_status = None if self._state.adding else getattr(self, '_loaded_status', self.status)
+        deltas = {}
+        if self._state.adding or old_status != self.status:
+            deltas = WorkflowInstance.step_counter_deltas([(old_status, self.status)])
+        
+        finished = self.status in WorkflowStepRollup.FINAL_STATUSES and old_status != self.status
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            WorkflowInstance.apply_step_counter_deltas(self.workflow_id, deltas)
+            if finished:
+                self.workflow.record_outcomes([self])
+        self._loaded_status = self.status
+    
     def execute_automation(self):
-        """Execute the automation for this step"""
-        try:
-            if self.step_type == 'generate_document' and self.document_template:
-                # Generate document using template
-                if self.document_template.is_template and self.workflow.data_subject:
-                    generated_doc = self.document_template.generate_document_for_subject(self.workflow.data_subject)
-                    self.generated_document = generated_doc
-                    self.result_notes = f"Document generated successfully: {generated_doc.title}"
-                    self.status = 'completed'
-                    self.completed_date = timezone.now()
-                    self.save()
-                    
-                    # Move workflow to next step
-                    self.workflow.advance_to_next_step()
-                    return True
-            
-            # More automation types can be added here
-            
-            self.result_notes = "Automation not implemented for this step type"
-            self.status = 'failed'
-            self.save()
-            return False
-            
-        except Exception as e:
-            self.result_notes = f"Automation failed: {str(e)}"
-            self.status = 'failed'
-            self.save()
-            return False
+        """Execute the automation for this step, advancing the workflow if it completes"""
+        return WorkflowEngine(self.workflow, steps=[self]).execute(self)
+    
+    class Meta:
+        ordering = ['workflow', 'order']
+        indexes = [
+            # Ready automated steps, claimed by the workflow processor
+            models.Index(fields=['status', 'is_automated']),
+            # Upcoming deadlines of open steps (deadline scheduler)
+            models.Index(fields=['due_date'], name='step_open_due_idx',
+                         condition=models.Q(status__in=['pending', 'in_progress'], overdue_at__isnull=True,
+                                            due_date__isnull=False)),
+        ]
+
+
+class WorkflowStepExecution(models.Model):
+    """Result of one run of an automated step by the workflow processor"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='step_executions')
+    workflow = models.ForeignKey(WorkflowInstance, on_delete=models.CASCADE, related_name='step_executions')
+    step = models.ForeignKey(WorkflowStep, on_delete=models.CASCADE, related_name='executions')
+    worker = models.CharField(max_length=255, blank=True)
+    success = models.BooleanField(default=False)
+    result_notes = models.TextField(blank=True)
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    duration_ms = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.step.name} ({'succeeded' if self.success else 'failed'} at {self.finished_at:%Y-%m-%d %H:%M})"
+    
+    class Meta:
+        ordering = ['-started_at']
+
+
+class WorkflowStepRollup(models.Model):
+    """
+    Daily outcome counts and latency histograms per workflow template and step type.
+    
+    Rows are updated as steps reach a final status, so analytics read a few
+    rows per template and day instead of scanning the steps. Rows with a
+    blank step type hold whole workflows.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='workflow_rollups')
+    template = models.ForeignKey(WorkflowTemplate, on_delete=models.CASCADE, related_name='rollups')
+    step_type = models.CharField(max_length=100, blank=True)
+    day = models.DateField()
+    completed = models.IntegerField(default=0)
+    failed = models.IntegerField(default=0)
+    skipped = models.IntegerField(default=0)
+    # Durations (start to completion) of completed steps, in seconds
+    duration_count = models.IntegerField(default=0)
+    duration_total = models.FloatField(default=0)
+    duration_max = models.FloatField(default=0)
+    duration_histogram = models.JSONField(default=list)
+    # Queue times (becoming current to the automation starting) of automated steps, in seconds
+    queue_count = models.IntegerField(default=0)
+    queue_total = models.FloatField(default=0)
+    queue_max = models.FloatField(default=0)
+    queue_histogram = models.JSONField(default=list)
+    
+    # Upper bounds (seconds) of the histogram buckets, from a second to 90
+    # days; one more bucket holds everything above the last bound
+    BUCKET_BOUNDS = [
+        1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200, 14400, 28800,
+        86400, 172800, 345600, 604800, 1209600, 2592000, 7776000
+    ]
+    FINAL_STATUSES = ('completed', 'failed', 'skipped')
+    # step_type of whole-workflow rows
+    WORKFLOW = ''
+    
+    def __str__(self):
+        return f"{self.template_id} {self.step_type or 'workflow'} {self.day}"
+    
+    @classmethod
+    def bucket(cls, seconds):
+        return bisect.bisect_left(cls.BUCKET_BOUNDS, seconds)
+    
+    @classmethod
+    def empty_histogram(cls):
+        return [0] * (len(cls.BUCKET_BOUNDS) + 1)
+    
+    def _observe(self, metric, seconds):
+        histogram = list(getattr(self, f'{metric}_histogram')) or self.empty_histogram()
+        histogram[self.bucket(seconds)] += 1
+        setattr(self, f'{metric}_histogram', histogram)
+        setattr(self, f'{metric}_count', getattr(self, f'{metric}_count') + 1)
+        setattr(self, f'{metric}_total', getattr(self, f'{metric}_total') + seconds)
+        setattr(self, f'{metric}_max', max(getattr(self, f'{metric}_max'), seconds))
+    
+    def add(self, outcome, duration=None, queue_time=None):
+        """Count one finished step (or workflow) in this row"""
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        if duration is not None:
+            self._observe('duration', duration)
+        if queue_time is not None:
+            self._observe('queue', queue_time)
+    
+    @classmethod
+    def samples(cls, workflow, steps=(), workflow_finished=False, now=None):
+        """
+        ``(key, outcome, duration, queue time)`` for finished ``steps`` of
+        ``workflow``, plus the workflow itself if ``workflow_finished``.
+        
+        The key is ``(organization, template, step type, day)``. Workflows
+        whose template was deleted have nowhere to be counted.
+        """
+        if workflow.template_id is None:
+            return []
+        now = now or timezone.now()
+        
+        def seconds(start, end):
+            return max((end - start).total_seconds(), 0) if start and end else None
+        
+        samples = []
+        for step in steps:
+            day = timezone.localdate(step.completed_date or now)
+            samples.append((
+                (workflow.organization_id, workflow.template_id, step.step_type, day),
+                step.status,
+                seconds(step.start_date, step.completed_date) if step.status == 'completed' else None,
+                seconds(step.start_date, step.execution_started_at)
+            ))
+        if workflow_finished:
+            day = timezone.localdate(workflow.completed_date or now)
+            samples.append((
+                (workflow.organization_id, workflow.template_id, cls.WORKFLOW, day),
+                'completed',
+                seconds(workflow.start_date, workflow.completed_date),
+                None
+            ))
+        return samples
+    
+    @classmethod
+    def record(cls, samples):
+        """Add samples to their rows, locking each row while it is updated"""
+        grouped = defaultdict(list)
+        for key, *values in samples:
+            grouped[key].append(values)
+        
+        with transaction.atomic():
+            # Lock rows in a fixed order so concurrent writers cannot deadlock
+            for key in sorted(grouped, key=str):
+                organization_id, template_id, step_type, day = key
+                rollup, _ = cls.objects.select_for_update().get_or_create(
+                    template_id=template_id, step_type=step_type, day=day,
+                    defaults={'organization_id': organization_id}
+                )
+                for values in grouped[key]:
+                    rollup.add(*values)
+                rollup.save()
+    
+    class Meta:
+        unique_together = ['template', 'step_type', 'day']
+        indexes = [
+            models.Index(fields=['organization', 'day']),
+        ]
+
+
+class Notification(models.Model):
+    """In-app notification for a user, or for the whole organization when no user is set"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='notifications')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications')
+    kind = models.CharField(max_length=50, choices=[
+        ('request_overdue', 'Data Subject Request Overdue'),
+        ('workflow_overdue', 'Workflow Overdue'),
+        ('step_overdue', 'Workflow Step Overdue'),
+        ('action_overdue', 'Compliance Action Overdue')
+    ])
+    title = models.CharField(max_length=255)
+    object_id = models.UUIDField(null=True, blank=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return self.title
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['organization', 'user', 'read_at']),
+        ]
+
+
+class ExportJob(models.Model):
+    """Background export of large data sets to a downloadable file"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name='export_jobs')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='export_jobs')
+    export_type = models.CharField(max_length=50, choices=[
+        ('data_subjects', 'Data Subjects'),
+        ('consent_activities', 'Consent Activity History'),
+        ('data_inventory', 'Data Inventory'),
+        ('retention_report', 'Data Retention Report'),
+        ('document_batch', 'Batch Document Generation')
+    ])
+    format = models.CharField(max_length=10, choices=[
+        ('csv', 'CSV'),
+        ('ndjson', 'NDJSON'),
+        ('xlsx', 'Excel (XLSX)')
+    ], default='csv')
+    parameters = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=50, choices=[
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+        ('expired', 'Expired')
+    ], default='queued')
+    total_rows = models.IntegerField(default=0)
+    processed_rows = models.IntegerField(default=0)
+    # Times a worker has claimed the job; a job whose worker died is requeued
+    # until this reaches EXPORT_JOB_MAX_ATTEMPTS
+    attempts = models.IntegerField(default=0)
+    file = models.FileField(upload_to='exports/%Y/%m/%d/', blank=True)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.get_export_type_display()} export ({self.get_status_display()})"
+    
+    def get_progress_percentage(self):
+        """Calculate export completion percentage"""
+        if self.status == 'completed':
+            return 100
+        if self.total_rows == 0:
+            return 0
+        return min(int((self.processed_rows / self.total_rows) * 100), 99)
     
     class Meta:
-        ordering = ['workflow', 'order']
\ No newline at end of file
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
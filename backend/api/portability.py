@@ -0,0 +1,183 @@
+# api/portability.py
+import json
+import os
+import zipfile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from . import exports
+from .models import ConsentActivity, DataSubjectRequest, Document, WorkflowInstance
+
+# Bytes read per chunk from uploaded document files
+FILE_CHUNK_SIZE = 64 * 1024
+
+# Document bodies loaded per query while writing the archive
+DOCUMENT_BATCH_SIZE = 50
+
+CONSENT_ACTIVITY_COLUMNS = [
+    ('Activity ID', 'id'),
+    ('Activity Type', 'activity_type'),
+    ('Consent Type', 'consent_type'),
+    ('Timestamp', 'timestamp'),
+    ('IP Address', 'ip_address'),
+    ('User Agent', 'user_agent'),
+    ('Notes', 'notes'),
+]
+
+DOCUMENT_COLUMNS = [
+    ('Document ID', 'id'),
+    ('Title', 'title'),
+    ('Document Type', 'document_type'),
+    ('Version', 'version'),
+    ('Status', 'status'),
+    ('File', 'file'),
+    ('Created Date', 'created_at'),
+]
+
+REQUEST_COLUMNS = [
+    ('Request ID', 'id'),
+    ('Request Type', 'request_type'),
+    ('Status', 'status'),
+    ('Details', 'request_details'),
+    ('Date Received', 'date_received'),
+    ('Due Date', 'due_date'),
+    ('Completed Date', 'completed_date'),
+    ('Notes', 'notes'),
+]
+
+WORKFLOW_COLUMNS = [
+    ('Workflow ID', 'id'),
+    ('Name', 'name'),
+    ('Status', 'status'),
+    ('Start Date', 'start_date'),
+    ('Due Date', 'due_date'),
+    ('Completed Date', 'completed_date'),
+]
+
+SUBJECT_FIELDS = [
+    'id', 'first_name', 'last_name', 'email', 'phone',
+    'marketing_consent', 'marketing_consent_date',
+    'data_processing_consent', 'data_processing_consent_date',
+    'cookie_consent', 'cookie_consent_date',
+    'data_expiry_date', 'privacy_notice_version',
+    'privacy_notice_accepted_date', 'notes',
+    'created_at', 'updated_at',
+]
+
+
+class _ZipStream:
+    """Unseekable sink for ZipFile that hands written bytes back to the caller"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _csv_member(queryset, columns):
+    # Lines are batched so the compressor sees reasonably sized writes
+    rows = queryset.values(*[key for _, key in columns]).iterator(chunk_size=exports.CHUNK_SIZE)
+    buffer = []
+    size = 0
+    for line in exports.stream_csv(rows, columns):
+        buffer.append(line)
+        size += len(line)
+        if size >= FILE_CHUNK_SIZE:
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+def _json_member(value):
+    yield json.dumps(value, cls=DjangoJSONEncoder, indent=2).encode('utf-8')
+
+
+def _document_bodies(documents):
+    ids = list(documents.values_list('id', flat=True))
+    for start in range(0, len(ids), DOCUMENT_BATCH_SIZE):
+        for document in Document.objects.with_content().filter(id__in=ids[start:start + DOCUMENT_BATCH_SIZE]):
+            if document.content:
+                yield f"documents/{document.id}.txt", [document.content.encode('utf-8')]
+            if document.file:
+                yield (
+                    f"documents/files/{document.id}/{document.file_name or os.path.basename(document.file.name)}",
+                    _file_chunks(document.file)
+                )
+
+
+def _file_chunks(field_file):
+    with field_file.open('rb') as f:
+        for chunk in f.chunks(FILE_CHUNK_SIZE):
+            yield chunk
+
+
+def portability_members(subject):
+    """
+    Yield ``(archive name, chunk iterator)`` pairs for everything held about a subject.
+
+    Each member is produced lazily, so nothing is loaded until it is written.
+    """
+    subject_record = {field: getattr(subject, field) for field in SUBJECT_FIELDS}
+    yield 'subject.json', _json_member({
+        'exported_at': timezone.now(),
+        'subject': subject_record
+    })
+
+    yield 'consent_activities.csv', _csv_member(
+        ConsentActivity.objects.filter(data_subject=subject).order_by('timestamp'),
+        CONSENT_ACTIVITY_COLUMNS
+    )
+
+    documents = Document.objects.filter(data_subject=subject).order_by('created_at')
+    yield 'documents.csv', _csv_member(documents, DOCUMENT_COLUMNS)
+    yield from _document_bodies(documents)
+
+    yield 'requests.csv', _csv_member(
+        DataSubjectRequest.objects.filter(
+            organization_id=subject.organization_id,
+            data_subject_email__iexact=subject.email
+        ).order_by('date_received'),
+        REQUEST_COLUMNS
+    )
+
+    yield 'workflows.csv', _csv_member(
+        WorkflowInstance.objects.filter(data_subject=subject).order_by('start_date'),
+        WORKFLOW_COLUMNS
+    )
+
+
+def stream_zip(members):
+    """
+    Yield a ZIP archive of ``(archive name, chunk iterator)`` members as it is written.
+
+    ZipFile writes to an unseekable sink (using data descriptors), so each
+    member is compressed and emitted chunk by chunk and the archive is
+    never held in memory as a whole.
+    """
+    sink = _ZipStream()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, chunks in members:
+            with archive.open(name, 'w', force_zip64=True) as member:
+                for chunk in chunks:
+                    member.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+    # Remaining member trailers and the central directory
+    yield sink.drain()
+
+
+def stream_portability_package(subject):
+    """Yield a ZIP archive of a subject's data as it is written"""
+    return stream_zip(portability_members(subject))
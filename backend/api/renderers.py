@@ -0,0 +1,56 @@
+# api/renderers.py
+from django.conf import settings
+from rest_framework import renderers, parsers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    JSON renderer backed by orjson when it is installed.
+
+    orjson serializes UUID, datetime, date and time values natively, so
+    view data does not need a pre-conversion pass. Anything orjson does not
+    know about (Decimal, lazy translation strings, querysets...) is handed
+    to DRF's own JSONEncoder. Falls back to the stdlib renderer entirely
+    when orjson is unavailable or disabled with ``USE_ORJSON = False``.
+    """
+    _drf_encoder = encoders.JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or not getattr(settings, 'USE_ORJSON', True):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b''
+
+        options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            options |= orjson.OPT_INDENT_2
+
+        ret = orjson.dumps(data, default=self._drf_encoder.default, option=options)
+
+        # Match the stdlib renderer, which escapes these for safe embedding in JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONParser(parsers.JSONParser):
+    """
+    JSON parser backed by orjson when it is installed, stdlib json otherwise.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None or not getattr(settings, 'USE_ORJSON', True):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,188 @@
+# api/risk_analytics.py
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from .caching import VersionedCache
+from .models import DataCategory, DataMapping, DataStorage
+
+analytics_cache = VersionedCache('api:data-map-risk')
+
+# Relative exposure of each storage type
+STORAGE_TYPE_WEIGHTS = {
+    'internal_db': 1.0,
+    'paper': 1.0,
+    'cloud': 1.5,
+    'saas': 2.0,
+    'other': 2.0,
+}
+
+# Score thresholds for the reported risk level
+RISK_LEVELS = [(0, 'low'), (10, 'medium'), (25, 'high')]
+
+MAPPING_COLUMNS = [
+    'mapping_id', 'purpose',
+    'category_id', 'category_name', 'is_sensitive', 'legal_basis', 'retention_period_days',
+    'storage_id', 'storage_name', 'storage_type', 'location', 'is_outside_eea',
+]
+
+
+def load_mapping_frame(organization_id):
+    """Load every mapping of an organization, joined to its category and storage, in one query"""
+    records = DataMapping.objects.filter(organization_id=organization_id).values_list(
+        'id', 'purpose',
+        'data_category_id', 'data_category__name', 'data_category__is_sensitive',
+        'data_category__legal_basis', 'data_category__retention_period_days',
+        'storage_id', 'storage__name', 'storage__storage_type', 'storage__location',
+        'storage__is_outside_eea'
+    )
+    frame = pd.DataFrame.from_records(list(records), columns=MAPPING_COLUMNS)
+    if not frame.empty:
+        frame['is_sensitive'] = frame['is_sensitive'].astype(bool)
+        frame['is_outside_eea'] = frame['is_outside_eea'].astype(bool)
+        frame['retention_period_days'] = frame['retention_period_days'].astype(np.int64)
+    return frame
+
+
+def _records(frame, columns):
+    out = frame[columns].copy()
+    for column in columns:
+        if column.endswith('_id'):
+            out[column] = out[column].astype(str)
+    return out.to_dict('records')
+
+
+def cross_border_transfers(frame):
+    """Sensitive data categories mapped to storage outside the EEA"""
+    transfers = frame[frame['is_sensitive'] & frame['is_outside_eea']].sort_values(['category_name', 'storage_name'])
+    return _records(transfers, [
+        'mapping_id', 'category_id', 'category_name', 'legal_basis',
+        'storage_id', 'storage_name', 'storage_type', 'location', 'purpose'
+    ])
+
+
+def storage_risk_scores(frame, max_retention_days):
+    """
+    Score each storage location from the mappings it holds.
+
+    Each mapping contributes ``(1 + 2 * sensitive) * (2 if outside EEA) *
+    storage type weight``, plus one point if its retention period exceeds
+    the organization maximum.
+    """
+    weights = frame['storage_type'].map(STORAGE_TYPE_WEIGHTS).fillna(2.0).to_numpy()
+    sensitivity = 1 + 2 * frame['is_sensitive'].to_numpy(dtype=np.int64)
+    transfer = np.where(frame['is_outside_eea'].to_numpy(), 2.0, 1.0)
+    over_retention = (frame['retention_period_days'].to_numpy() > max_retention_days).astype(np.float64)
+    scored = frame.assign(
+        risk=sensitivity * transfer * weights + over_retention,
+        sensitive=frame['is_sensitive'].astype(np.int64)
+    )
+
+    grouped = scored.groupby(['storage_id', 'storage_name', 'storage_type', 'is_outside_eea'], sort=False).agg(
+        risk_score=('risk', 'sum'),
+        mappings=('mapping_id', 'size'),
+        sensitive_mappings=('sensitive', 'sum')
+    ).reset_index().sort_values('risk_score', ascending=False)
+
+    thresholds = np.array([threshold for threshold, _ in RISK_LEVELS])
+    labels = np.array([label for _, label in RISK_LEVELS])
+    grouped['risk_level'] = labels[np.searchsorted(thresholds, grouped['risk_score'].to_numpy(), side='right') - 1]
+    grouped['risk_score'] = grouped['risk_score'].round(2)
+
+    return _records(grouped, [
+        'storage_id', 'storage_name', 'storage_type', 'is_outside_eea',
+        'risk_score', 'risk_level', 'mappings', 'sensitive_mappings'
+    ])
+
+
+def category_storage_matrix(frame):
+    """Count of mappings per data category and storage type"""
+    storage_types = [value for value, _ in DataStorage._meta.get_field('storage_type').choices]
+    matrix = pd.crosstab(frame['category_name'], frame['storage_type']).reindex(columns=storage_types, fill_value=0)
+    return {
+        'categories': matrix.index.tolist(),
+        'storage_types': storage_types,
+        'counts': matrix.to_numpy().tolist()
+    }
+
+
+def retention_conflicts(frame, categories, max_retention_days):
+    """
+    Retention findings:
+
+    * ``exceeds_policy`` - a category keeps data longer than the organization maximum
+    * ``no_retention_period`` - a category has no positive retention period
+    * ``mixed_retention`` - one storage holds categories with different retention periods
+    """
+    findings = []
+
+    over = categories[categories['retention_period_days'] > max_retention_days]
+    for row in over.itertuples(index=False):
+        findings.append({
+            'type': 'exceeds_policy',
+            'category_id': str(row.id),
+            'category_name': row.name,
+            'retention_period_days': int(row.retention_period_days),
+            'max_retention_days': max_retention_days
+        })
+
+    missing = categories[categories['retention_period_days'] <= 0]
+    for row in missing.itertuples(index=False):
+        findings.append({
+            'type': 'no_retention_period',
+            'category_id': str(row.id),
+            'category_name': row.name
+        })
+
+    if not frame.empty:
+        spread = frame.groupby(['storage_id', 'storage_name'], sort=False)['retention_period_days'].agg(['min', 'max', 'nunique'])
+        for (storage_id, storage_name), row in spread[spread['nunique'] > 1].iterrows():
+            findings.append({
+                'type': 'mixed_retention',
+                'storage_id': str(storage_id),
+                'storage_name': storage_name,
+                'min_retention_days': int(row['min']),
+                'max_retention_days': int(row['max'])
+            })
+
+    return findings
+
+
+def compute_risk_analytics(organization_id):
+    """Run every analysis over an organization's data map"""
+    max_retention_days = settings.DATA_RETENTION_PERIOD_DAYS
+    frame = load_mapping_frame(organization_id)
+    categories = pd.DataFrame.from_records(
+        list(DataCategory.objects.filter(organization_id=organization_id).values_list(
+            'id', 'name', 'retention_period_days')),
+        columns=['id', 'name', 'retention_period_days']
+    )
+
+    if frame.empty:
+        storage_scores = []
+        transfers = []
+        matrix = {'categories': [], 'storage_types': [], 'counts': []}
+    else:
+        storage_scores = storage_risk_scores(frame, max_retention_days)
+        transfers = cross_border_transfers(frame)
+        matrix = category_storage_matrix(frame)
+
+    return {
+        'summary': {
+            'mappings': int(len(frame)),
+            'sensitive_mappings': int(frame['is_sensitive'].sum()) if not frame.empty else 0,
+            'cross_border_sensitive_transfers': len(transfers),
+        },
+        'cross_border_transfers': transfers,
+        'storage_risk': storage_scores,
+        'category_storage_matrix': matrix,
+        'retention_findings': retention_conflicts(frame, categories, max_retention_days),
+    }
+
+
+def get_risk_analytics(organization_id):
+    """Return cached analytics for an organization, computing them on a miss"""
+    return analytics_cache.get(organization_id, compute_risk_analytics)
+
+
+def invalidate(organization_id):
+    analytics_cache.invalidate(organization_id)
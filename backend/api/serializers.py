@@ -4,8 +4,9 @@ from .models import (
     Organization, User, DataCategory, DataStorage, DataMapping,
     DataSubjectRequest, Document, ComplianceAction, DataSubject,
     ConsentActivity, WorkflowTemplate, WorkflowStepTemplate,
-    WorkflowInstance, WorkflowStep
+    WorkflowInstance, WorkflowStep, WorkflowStepExecution, Notification, ExportJob
 )
+from .automation_sandbox import ScriptError, check_script
 
 class OrganizationSerializer(serializers.ModelSerializer):
     class Meta:
@@ -41,8 +42,8 @@ class DataSubjectRequestSerializer(serializers.ModelSerializer):
         model = DataSubjectRequest
         fields = ['id', 'request_type', 'data_subject_name', 'data_subject_email', 'request_details', 
                  'date_received', 'status', 'assigned_to', 'due_date', 'completed_date', 'notes', 
-                 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+                 'overdue_at', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'overdue_at', 'created_at', 'updated_at']
 
 class DataSubjectSerializer(serializers.ModelSerializer):
     """Serializer for data subjects (individuals whose data is processed)"""
@@ -78,11 +79,16 @@ class DocumentSerializer(serializers.ModelSerializer):
         model = Document
         fields = [
             'id', 'title', 'document_type', 'is_template', 'content',
-            'template_variables', 'file', 'version', 'status', 
+            'template_variables', 'file', 'file_name', 'version', 'status', 
             'review_date', 'created_by', 'data_subject',
             'data_subject_detail', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'created_by']
+        read_only_fields = ['id', 'file_name', 'created_at', 'updated_at', 'created_by']
+
+class DocumentSummarySerializer(DocumentSerializer):
+    """A document without its body, for lists and nested details"""
+    class Meta(DocumentSerializer.Meta):
+        fields = [field for field in DocumentSerializer.Meta.fields if field != 'content']
 
 class WorkflowStepTemplateSerializer(serializers.ModelSerializer):
     """Serializer for workflow step templates"""
@@ -95,24 +101,40 @@ class WorkflowStepTemplateSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    def validate_automation_script(self, value):
+        """Reject scripts the automation sandbox would refuse to run"""
+        if value:
+            try:
+                check_script(value)
+            except ScriptError as e:
+                raise serializers.ValidationError(str(e))
+        return value
 
 class WorkflowTemplateSerializer(serializers.ModelSerializer):
     """Serializer for workflow templates"""
-    step_templates = WorkflowStepTemplateSerializer(many=True, read_only=True)
+    step_templates = serializers.SerializerMethodField()
     
     class Meta:
         model = WorkflowTemplate
         fields = [
             'id', 'name', 'description', 'workflow_type',
-            'estimated_completion_days', 'is_active',
+            'estimated_completion_days', 'is_active', 'version',
             'step_templates', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'version', 'created_at', 'updated_at']
+    
+    def get_step_templates(self, obj):
+        # Serialized once per template version and served from the compiled template cache
+        return obj.get_compiled().derived(
+            'serialized_steps',
+            lambda compiled: list(WorkflowStepTemplateSerializer(compiled.step_templates, many=True).data)
+        )
 
 class WorkflowStepSerializer(serializers.ModelSerializer):
     """Serializer for individual workflow steps"""
-    document_template_detail = DocumentSerializer(source='document_template', read_only=True)
-    generated_document_detail = DocumentSerializer(source='generated_document', read_only=True)
+    document_template_detail = DocumentSummarySerializer(source='document_template', read_only=True)
+    generated_document_detail = DocumentSummarySerializer(source='generated_document', read_only=True)
     
     class Meta:
         model = WorkflowStep
@@ -121,9 +143,9 @@ class WorkflowStepSerializer(serializers.ModelSerializer):
             'order', 'is_automated', 'document_template', 'document_template_detail',
             'status', 'assigned_to', 'start_date', 'due_date',
             'completed_date', 'result_notes', 'generated_document',
-            'generated_document_detail', 'created_at', 'updated_at'
+            'generated_document_detail', 'overdue_at', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 
+        read_only_fields = ['id', 'created_at', 'updated_at', 'overdue_at',
                            'generated_document', 'generated_document_detail']
 
 class WorkflowInstanceSerializer(serializers.ModelSerializer):
@@ -138,9 +160,11 @@ class WorkflowInstanceSerializer(serializers.ModelSerializer):
             'id', 'organization', 'template', 'template_detail', 'name',
             'status', 'data_subject', 'related_request', 'assigned_to',
             'start_date', 'due_date', 'completed_date', 'current_step',
-            'steps', 'progress_percentage', 'created_at', 'updated_at'
+            'steps', 'total_steps', 'completed_steps', 'failed_steps', 'skipped_steps',
+            'progress_percentage', 'overdue_at', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'progress_percentage']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'progress_percentage', 'overdue_at',
+                           'total_steps', 'completed_steps', 'failed_steps', 'skipped_steps']
     
     def get_progress_percentage(self, obj):
         return obj.get_progress_percentage()
@@ -149,5 +173,47 @@ class ComplianceActionSerializer(serializers.ModelSerializer):
     class Meta:
         model = ComplianceAction
         fields = ['id', 'title', 'description', 'priority', 'status', 'due_date', 
-                 'assigned_to', 'completed_date', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
\ No newline at end of file
+                 'assigned_to', 'completed_date', 'overdue_at', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'overdue_at', 'created_at', 'updated_at']
+
+class WorkflowStepExecutionSerializer(serializers.ModelSerializer):
+    """Serializer for recorded runs of automated workflow steps"""
+    
+    class Meta:
+        model = WorkflowStepExecution
+        fields = [
+            'id', 'workflow', 'step', 'worker', 'success', 'result_notes',
+            'started_at', 'finished_at', 'duration_ms'
+        ]
+        read_only_fields = fields
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    """Serializer for in-app notifications"""
+    
+    class Meta:
+        model = Notification
+        fields = ['id', 'kind', 'title', 'object_id', 'user', 'read_at', 'created_at']
+        read_only_fields = fields
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    """Serializer for background export jobs"""
+    progress_percentage = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ExportJob
+        fields = [
+            'id', 'export_type', 'format', 'parameters', 'status',
+            'total_rows', 'processed_rows', 'progress_percentage', 'error',
+            'started_at', 'completed_at', 'expires_at', 'created_by',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'status', 'total_rows', 'processed_rows', 'progress_percentage',
+            'error', 'started_at', 'completed_at', 'expires_at', 'created_by',
+            'created_at', 'updated_at'
+        ]
+    
+    def get_progress_percentage(self, obj):
+        return obj.get_progress_percentage()
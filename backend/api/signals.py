@@ -0,0 +1,110 @@
+# api/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from . import datamap, document_templates, file_store, risk_analytics
+from .authentication import invalidate_token, invalidate_user_tokens
+from .models import (
+    User, DataCategory, DataStorage, DataMapping, Document,
+    WorkflowInstance, WorkflowStep, WorkflowStepTemplate, WorkflowTemplate
+)
+
+
+@receiver(post_delete, sender=Token)
+@receiver(post_save, sender=Token)
+def invalidate_cached_token(sender, instance, **kwargs):
+    """
+    Drop a token from the auth cache when it is deleted (e.g. on logout) or
+    re-saved; again on commit, in case another process cached it meanwhile
+    """
+    invalidate_token(instance.key)
+    transaction.on_commit(lambda: invalidate_token(instance.key))
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_user_tokens(sender, instance, created, update_fields=None, **kwargs):
+    """Drop cached tokens when a user changes (deactivation, organization move, etc.)"""
+    if created or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        # Logging in only records the time; the cached user is still good
+        return
+    invalidate_user_tokens(instance)
+    transaction.on_commit(lambda: invalidate_user_tokens(instance))
+
+
+@receiver(post_save, sender=DataCategory)
+@receiver(post_save, sender=DataStorage)
+@receiver(post_save, sender=DataMapping)
+@receiver(post_delete, sender=DataCategory)
+@receiver(post_delete, sender=DataStorage)
+@receiver(post_delete, sender=DataMapping)
+def invalidate_data_map(sender, instance, **kwargs):
+    """
+    Drop the organization's cached data map and risk analytics once the
+    change commits (a rolled-back change leaves them alone)
+    """
+    organization_id = instance.organization_id
+
+    def invalidate():
+        datamap.invalidate(organization_id)
+        risk_analytics.invalidate(organization_id)
+
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_delete, sender=WorkflowStep)
+def update_workflow_step_counters(sender, instance, **kwargs):
+    """Keep the workflow's step counters right when a step is removed"""
+    WorkflowInstance.apply_step_counter_deltas(
+        instance.workflow_id,
+        WorkflowInstance.step_counter_deltas([(instance.status, None)])
+    )
+
+
+@receiver(post_save, sender=WorkflowStepTemplate)
+@receiver(post_delete, sender=WorkflowStepTemplate)
+def bump_workflow_template_version(sender, instance, **kwargs):
+    """A step change is a new version of its template (drops compiled copies)"""
+    WorkflowTemplate.bump_versions(WorkflowTemplate.objects.filter(pk=instance.workflow_template_id))
+
+
+@receiver(post_save, sender=Document)
+@receiver(post_delete, sender=Document)
+def bump_document_template_users(sender, instance, **kwargs):
+    """Templates whose steps use a changed document template get a new version"""
+    if kwargs.get('signal') is post_save and not (instance.is_template or getattr(instance, '_loaded_is_template', False)):
+        # Generated documents are never step templates; skip the lookup
+        return
+    WorkflowTemplate.bump_versions(WorkflowTemplate.objects.filter(
+        pk__in=WorkflowStepTemplate.objects.filter(document_template_id=instance.pk).values('workflow_template_id')
+    ))
+
+
+@receiver(post_save, sender=Document)
+@receiver(post_delete, sender=Document)
+def invalidate_document_template_list(sender, instance, **kwargs):
+    """
+    Drop the organization's cached template list once a template is added,
+    changed or removed and the change commits
+    """
+    if instance.is_template or getattr(instance, '_loaded_is_template', False):
+        organization_id = instance.organization_id
+        transaction.on_commit(lambda: document_templates.invalidate(organization_id))
+
+
+@receiver(post_save, sender=Document)
+def count_document_file_references(sender, instance, created, update_fields=None, **kwargs):
+    """Move a document's stored-file reference when its file is added, replaced or cleared"""
+    if update_fields is not None and 'file' not in update_fields:
+        return
+    name = instance.file.name or None
+    previous = None if created else getattr(instance, '_loaded_file', None)
+    if name != previous:
+        file_store.acquire(name)
+        file_store.release(previous)
+
+
+@receiver(post_delete, sender=Document)
+def release_document_file(sender, instance, **kwargs):
+    """Drop a deleted document's reference to its stored file"""
+    file_store.release(instance.file.name or None)
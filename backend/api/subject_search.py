@@ -0,0 +1,151 @@
+# api/subject_search.py
+import heapq
+import time
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models.functions import Lower
+from .models import ConsentActivity, DataSubject, DataSubjectRequest, Document, WorkflowInstance
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+# Deepest row (offset + limit) a page may reach; each source fetches at most this many rows
+MAX_WINDOW = 10000
+
+
+def _subjects(organization_id, email):
+    return DataSubject.objects.annotate(email_lower=Lower('email')).filter(
+        organization_id=organization_id, email_lower=email
+    )
+
+
+def _subject_ids(organization_id, email):
+    # Used as a subquery so every source can run independently of the others
+    return _subjects(organization_id, email).values('id')
+
+
+def data_subjects_source(organization_id, email):
+    return _subjects(organization_id, email), 'created_at', [
+        'id', 'first_name', 'last_name', 'email', 'phone',
+        'marketing_consent', 'data_processing_consent', 'cookie_consent',
+        'data_expiry_date', 'created_at'
+    ]
+
+
+def consent_activities_source(organization_id, email):
+    return ConsentActivity.objects.filter(
+        data_subject__in=_subject_ids(organization_id, email)
+    ), 'timestamp', [
+        'id', 'data_subject_id', 'activity_type', 'consent_type', 'timestamp', 'ip_address', 'notes'
+    ]
+
+
+def documents_source(organization_id, email):
+    return Document.objects.filter(
+        organization_id=organization_id,
+        data_subject__in=_subject_ids(organization_id, email)
+    ), 'created_at', [
+        'id', 'data_subject_id', 'title', 'document_type', 'version', 'status', 'created_at'
+    ]
+
+
+def requests_source(organization_id, email):
+    return DataSubjectRequest.objects.annotate(email_lower=Lower('data_subject_email')).filter(
+        organization_id=organization_id, email_lower=email
+    ), 'date_received', [
+        'id', 'request_type', 'status', 'data_subject_name', 'data_subject_email',
+        'date_received', 'due_date', 'completed_date'
+    ]
+
+
+def workflows_source(organization_id, email):
+    return WorkflowInstance.objects.filter(
+        organization_id=organization_id,
+        data_subject__in=_subject_ids(organization_id, email)
+    ), 'start_date', [
+        'id', 'data_subject_id', 'name', 'status', 'start_date', 'due_date', 'completed_date'
+    ]
+
+
+SEARCH_SOURCES = {
+    'data_subjects': data_subjects_source,
+    'consent_activities': consent_activities_source,
+    'documents': documents_source,
+    'requests': requests_source,
+    'workflows': workflows_source,
+}
+
+
+def _run_source(name, organization_id, email, window, close_connection):
+    """Count a source and fetch its newest ``window`` rows; returns (name, count, rows, elapsed ms)"""
+    started = time.perf_counter()
+    try:
+        queryset, timestamp_field, fields = SEARCH_SOURCES[name](organization_id, email)
+        count = queryset.count()
+        rows = []
+        if count:
+            for row in queryset.order_by(f'-{timestamp_field}', '-id').values(*fields)[:window]:
+                rows.append({
+                    'source': name,
+                    'id': row['id'],
+                    'timestamp': row[timestamp_field],
+                    'data': row
+                })
+        return name, count, rows, round((time.perf_counter() - started) * 1000, 2)
+    finally:
+        if close_connection:
+            # Worker threads get their own connection; don't leave it open
+            connections.close_all()
+
+
+def search_subject_data(organization_id, email, limit=DEFAULT_LIMIT, offset=0, sources=None, max_workers=None):
+    """
+    Find everything an organization holds about the person with ``email``.
+
+    Each source is one query (plus a count) keyed on an indexed column and
+    runs on its own thread and connection. Results are merged newest first
+    into one timeline and sliced with ``limit``/``offset``.
+
+    Inside a transaction the sources run serially on the current connection,
+    since other connections cannot see uncommitted rows.
+    """
+    email = email.strip().lower()
+    sources = list(sources or SEARCH_SOURCES)
+    limit = max(1, min(limit, MAX_LIMIT))
+    offset = max(0, offset)
+    window = min(offset + limit, MAX_WINDOW)
+
+    if max_workers is None:
+        max_workers = settings.SUBJECT_SEARCH_MAX_WORKERS
+    concurrent = max_workers > 1 and len(sources) > 1 and not connection.in_atomic_block
+
+    if concurrent:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(sources))) as executor:
+            results = list(executor.map(
+                lambda name: _run_source(name, organization_id, email, window, True), sources
+            ))
+    else:
+        results = [_run_source(name, organization_id, email, window, False) for name in sources]
+
+    counts = {name: count for name, count, _, _ in results}
+    timings = {name: elapsed for name, _, _, elapsed in results}
+    merged = heapq.merge(
+        *[rows for _, _, rows, _ in results],
+        key=lambda row: row['timestamp'], reverse=True
+    )
+    page = list(islice(merged, offset, window))
+    total = sum(counts.values())
+
+    return {
+        'email': email,
+        'count': total,
+        'counts': counts,
+        'timings_ms': timings,
+        'concurrent': concurrent,
+        'limit': limit,
+        'offset': offset,
+        'next_offset': offset + len(page) if offset + len(page) < min(total, MAX_WINDOW) else None,
+        'results': page
+    }
@@ -0,0 +1,74 @@
+# api/template_cache.py
+import threading
+from collections import OrderedDict
+
+# Compiled templates kept per process; the least recently used are dropped first
+MAX_TEMPLATES = 500
+
+# Template id -> CompiledTemplate. Entries are only used while their version
+# matches the template row, so a change made through any process (which bumps
+# WorkflowTemplate.version) is picked up the next time the template is read.
+_compiled = OrderedDict()
+_lock = threading.Lock()
+
+
+class CompiledTemplate:
+    """
+    One version of a workflow template's structure: its step templates in
+    order with their document templates resolved, and the field values new
+    workflow steps are created from. Treated as read-only once built.
+    """
+
+    def __init__(self, template):
+        self.template_id = template.pk
+        self.version = template.version
+        self.step_templates = tuple(
+            template.step_templates.select_related('document_template').order_by('order')
+        )
+        self.blueprints = tuple(
+            {field: getattr(step, field) for field in template.STEP_FIELDS}
+            for step in self.step_templates
+        )
+        self.document_templates = {
+            step.document_template_id: step.document_template
+            for step in self.step_templates if step.document_template_id
+        }
+        self._derived = {}
+        self._derived_lock = threading.Lock()
+
+    def derived(self, key, build):
+        """A value computed once per version from this template, e.g. its serialized steps"""
+        with self._derived_lock:
+            if key not in self._derived:
+                self._derived[key] = build(self)
+            return self._derived[key]
+
+
+def compiled_template(template):
+    """The compiled structure of ``template`` at its current version, compiling it on a miss"""
+    with _lock:
+        compiled = _compiled.get(template.pk)
+        if compiled is not None and compiled.version == template.version:
+            _compiled.move_to_end(template.pk)
+            return compiled
+
+    compiled = CompiledTemplate(template)
+    with _lock:
+        current = _compiled.get(template.pk)
+        # Don't replace a newer version another thread compiled meanwhile
+        if current is None or current.version <= compiled.version:
+            _compiled[template.pk] = compiled
+            _compiled.move_to_end(template.pk)
+            while len(_compiled) > MAX_TEMPLATES:
+                _compiled.popitem(last=False)
+    return compiled
+
+
+def invalidate(template_id):
+    with _lock:
+        _compiled.pop(template_id, None)
+
+
+def clear():
+    with _lock:
+        _compiled.clear()
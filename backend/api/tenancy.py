@@ -0,0 +1,25 @@
+# api/tenancy.py
+
+
+def get_organization_id(request):
+    """
+    Resolve the organization id for a request once.
+
+    Reads the ``organization_id`` column already on the authenticated user,
+    so the Organization row itself is never loaded.
+    """
+    organization_id = getattr(request, '_organization_id', None)
+    if organization_id is None:
+        organization_id = request.user.organization_id
+        request._organization_id = organization_id
+    return organization_id
+
+
+class OrganizationScopedMixin:
+    """
+    Gives views an ``organization_id`` for tenant filtering.
+    """
+
+    @property
+    def organization_id(self):
+        return get_organization_id(self.request)
@@ -0,0 +1,40 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from api.models import Organization, User
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    """
+    Tests run in one process, so a local-memory cache stands in for the
+    shared one (and hits make no queries); tests of query counts against
+    the database cache configure it themselves
+    """
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def organization():
+    return Organization.objects.create(name="Test Org", industry="legal")
+
+
+@pytest.fixture
+def user(organization):
+    return User.objects.create_user(
+        username="tester",
+        email="tester@example.com",
+        password="password",
+        organization=organization,
+        is_admin=True
+    )
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
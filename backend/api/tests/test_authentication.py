@@ -0,0 +1,119 @@
+import pytest
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from api.authentication import _local_cache, _revocations
+from api.checks import check_shared_caches
+
+@pytest.mark.django_db
+class TestCachedTokenAuthentication:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        _local_cache.clear()
+        _revocations.update(generation=None, next_check=0.0)
+        yield
+        _local_cache.clear()
+
+    @pytest.fixture
+    def token_client(self, user):
+        token = Token.objects.create(user=user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client, token
+
+    def test_cached_token_skips_database(self, token_client, django_assert_num_queries):
+        """Test that a cached token authenticates without touching the database"""
+        client, _ = token_client
+        assert client.get('/api/users/me/').status_code == 200
+
+        with django_assert_num_queries(0):
+            response = client.get('/api/users/me/')
+
+        assert response.status_code == 200
+
+    def test_cached_token_skips_database_cache(self, token_client, settings, django_assert_num_queries):
+        """Test that with the database cache as the shared cache, a local hit makes no query"""
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'api_cache'}}
+        settings.TOKEN_AUTH_CACHE = {**settings.TOKEN_AUTH_CACHE, 'REVOCATION_CHECK_INTERVAL': 60}
+        client, _ = token_client
+        assert client.get('/api/users/me/').status_code == 200
+
+        with django_assert_num_queries(0):
+            response = client.get('/api/users/me/')
+
+        assert response.status_code == 200
+
+    def test_revocation_reaches_other_processes(self, token_client, settings):
+        """Test that a token revoked in another process is dropped from this one's local cache"""
+        settings.TOKEN_AUTH_CACHE = {**settings.TOKEN_AUTH_CACHE, 'REVOCATION_CHECK_INTERVAL': 0}
+        client, token = token_client
+        assert client.get('/api/users/me/').status_code == 200
+        entry = _local_cache.get(token.key)
+
+        # The other process revokes the token; this one still holds its copy
+        token.delete()
+        _local_cache.set(token.key, entry)
+
+        assert client.get('/api/users/me/').status_code == 401
+
+    def test_organization_loaded_with_user(self, token_client, organization, django_assert_num_queries):
+        """Test that the user's organization comes with the token lookup"""
+        client, _ = token_client
+
+        # Token lookup (user + organization in one join) and the organization list query
+        with django_assert_num_queries(2):
+            response = client.get('/api/organizations/')
+
+        assert response.json()[0]['id'] == str(organization.id)
+
+    def test_token_deletion_revokes_immediately(self, token_client):
+        """Test that deleting a token (e.g. on logout) invalidates the cache"""
+        client, token = token_client
+        assert client.get('/api/users/me/').status_code == 200
+
+        token.delete()
+
+        assert client.get('/api/users/me/').status_code == 401
+
+    def test_user_deactivation_revokes_immediately(self, token_client, user):
+        """Test that deactivating a user invalidates their cached tokens"""
+        client, _ = token_client
+        assert client.get('/api/users/me/').status_code == 200
+
+        user.is_active = False
+        user.save()
+
+        assert client.get('/api/users/me/').status_code == 401
+
+    def test_shared_cache_layer(self, token_client, settings, django_assert_num_queries):
+        """Test that another process can authenticate from the shared cache"""
+        settings.TOKEN_AUTH_CACHE = {**settings.TOKEN_AUTH_CACHE, 'SHARED_CACHE': 'default'}
+        client, token = token_client
+        assert client.get('/api/users/me/').status_code == 200
+
+        # Simulate a different process with an empty local cache
+        _local_cache.clear()
+        with django_assert_num_queries(0):
+            assert client.get('/api/users/me/').status_code == 200
+
+        token.delete()
+        assert client.get('/api/users/me/').status_code == 401
+
+    def test_login_does_not_touch_tokens(self, token_client, user, django_assert_num_queries):
+        """Test that recording a login keeps the user's cached tokens without a token query"""
+        client, _ = token_client
+        assert client.get('/api/users/me/').status_code == 200
+
+        with django_assert_num_queries(1):
+            user.save(update_fields=['last_login'])
+        with django_assert_num_queries(0):
+            assert client.get('/api/users/me/').status_code == 200
+
+    def test_process_local_cache_is_refused(self, settings):
+        """Test that the system check refuses caches that revocations cannot reach across processes"""
+        assert {error.id for error in check_shared_caches(None)} == {'api.E003'}
+
+        settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'api_cache'}}
+        assert check_shared_caches(None) == []
+
+        settings.TOKEN_AUTH_CACHE = {**settings.TOKEN_AUTH_CACHE, 'SHARED_CACHE': None}
+        assert {error.id for error in check_shared_caches(None)} == {'api.E001'}
@@ -0,0 +1,129 @@
+import pytest
+from api import automation_sandbox
+from api.automation_sandbox import SandboxPool, ScriptError, check_script
+from api.models import DataSubject, WorkflowStepTemplate, WorkflowTemplate
+
+
+@pytest.fixture(scope='module')
+def pool():
+    """One sandbox worker process, shared by the tests in this module"""
+    pool = SandboxPool(1, memory_limit_mb=512, user='nobody')
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def sandbox(pool, monkeypatch):
+    """Route run_script through the test pool"""
+    monkeypatch.setattr(automation_sandbox, 'get_pool', lambda: pool)
+    return pool
+
+
+class TestAutomationSandbox:
+    def test_script_sees_only_its_context(self, pool):
+        """Test that scripts run with the given context and their output is captured"""
+        success, output = pool.run("print('Hello', subject['first_name'])", {'subject': {'first_name': 'Jane'}}, 2, 5)
+        assert success
+        assert output == 'Hello Jane'
+
+        success, output = pool.run("open('/etc/passwd')", {}, 2, 5)
+        assert not success
+        assert "NameError" in output
+
+    def test_failures(self, pool):
+        """Test that exceptions and ``success = False`` fail the script"""
+        assert pool.run("raise ValueError('bad data')", {}, 2, 5) == (False, 'Script failed: ValueError: bad data')
+        assert pool.run("print('not yet')\nsuccess = False", {}, 2, 5) == (False, 'not yet')
+
+    def test_restricted_scripts_are_rejected(self, pool):
+        """Test that imports and underscore names are refused before running"""
+        for source in ["import os", "().__class__.__bases__", "x = _secret"]:
+            with pytest.raises(ScriptError):
+                check_script(source)
+        success, output = pool.run("import os", {}, 2, 5)
+        assert not success
+        assert output.startswith('Script rejected')
+
+    def test_frame_escape_is_rejected(self, pool):
+        """Test that frames reached through generators and str.format cannot be used to leave the sandbox"""
+        escape = (
+            "def f():\n    yield gen.gi_frame.f_back\n"
+            "gen = f()\n"
+            "for fr in gen:\n    break\n"
+            "print(fr.f_back.f_globals['os'].popen('id').read())"
+        )
+        for source in [
+            escape,
+            "gen = (x for x in [1])\nprint(gen.gi_frame)",
+            "def f():\n    pass\nprint(f.func_globals)",
+            "print('{0.gi_frame}'.format(x for x in [1]))",
+            "print('{x}'.format_map(subject))",
+        ]:
+            with pytest.raises(ScriptError):
+                check_script(source)
+        success, output = pool.run(escape, {}, 2, 5)
+        assert not success
+        assert 'uid=' not in output
+        assert output.startswith('Script rejected')
+
+    def test_match_class_attributes_are_rejected(self, pool):
+        """Test that match class patterns cannot read attributes outside the allow-list"""
+        escape = (
+            "try:\n    1 / 0\n"
+            "except Exception as e:\n"
+            "    match e:\n"
+            "        case Exception(__traceback__=tb, __class__=cls, __getattribute__=getter):\n"
+            "            print(tb, cls, getter)\n"
+        )
+        with pytest.raises(ScriptError):
+            check_script(escape)
+        success, output = pool.run(escape, {}, 2, 5)
+        assert not success
+        assert output.startswith('Script rejected')
+
+        source = "match subject:\n    case {'names': [first, *rest]}:\n        print(first.upper())"
+        assert pool.run(source, {'subject': {'names': ['al', 'bo']}}, 2, 5) == (True, 'AL')
+
+    def test_allowed_methods(self, pool):
+        """Test that scripts can still use the methods of plain data"""
+        source = "names = [n.strip().title() for n in subject.get('names', [])]\nprint(', '.join(sorted(names)))"
+        assert pool.run(source, {'subject': {'names': [' bo', 'al ']}}, 2, 5) == (True, 'Al, Bo')
+
+    def test_limits_stop_scripts_and_worker_recovers(self, pool):
+        """Test that runaway scripts are stopped and the pool keeps working"""
+        success, output = pool.run("while True:\n    pass", {}, 1, 3)
+        assert not success
+        assert 'limit exceeded' in output
+        assert pool.run("print(sum(range(10)))", {}, 2, 5) == (True, '45')
+
+
+@pytest.mark.django_db
+class TestAutomatedScriptSteps:
+    def test_engine_runs_step_scripts(self, organization, sandbox):
+        """Test that automated steps with scripts run in the sandbox and record their output"""
+        subject = DataSubject.objects.create(organization=organization, first_name='Jane', last_name='Doe',
+                                             email='jane@example.com', marketing_consent=True)
+        template = WorkflowTemplate.objects.create(organization=organization, name='Withdraw', workflow_type='consent_withdrawal')
+        WorkflowStepTemplate.objects.create(
+            workflow_template=template, name='Check', step_type='custom', order=0, is_automated=True,
+            automation_script="print('Consent on file for', subject['email'])\nsuccess = subject['marketing_consent']"
+        )
+        WorkflowStepTemplate.objects.create(workflow_template=template, name='Confirm', step_type='approval', order=1)
+
+        workflow = template.create_workflow_instance(data_subject=subject)
+        current = workflow.advance_to_next_step()
+
+        check = workflow.steps.get(name='Check')
+        assert check.status == 'completed'
+        assert check.result_notes == 'Consent on file for jane@example.com'
+        assert current.name == 'Confirm'
+
+    def test_step_template_scripts_are_validated(self, api_client, organization):
+        """Test that the API refuses scripts the sandbox would reject"""
+        template = WorkflowTemplate.objects.create(organization=organization, name='SAR', workflow_type='subject_access')
+        response = api_client.post('/api/workflow-step-templates/', {
+            'workflow_template': str(template.id), 'name': 'Bad', 'step_type': 'custom',
+            'is_automated': True, 'automation_script': 'import os'
+        })
+        assert response.status_code == 400
+        assert 'automation_script' in response.data
@@ -0,0 +1,98 @@
+import io
+import zipfile
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from api.batch_documents import generate_batch, subject_queryset
+from api.export_jobs import process_queued_jobs
+from api.models import DataSubject, Document, ExportJob
+
+
+@pytest.fixture
+def template(organization):
+    return Document.objects.create(organization=organization, title='Annual notice', document_type='privacy_policy',
+                                   is_template=True, content='Dear {{subject_first_name}}, from {{organization_name}}')
+
+
+@pytest.fixture
+def subjects(organization):
+    """Seven subjects, the first four with marketing consent"""
+    return [
+        DataSubject.objects.create(organization=organization, first_name=f'Subject{i}', last_name='Doe',
+                                   email=f'subject{i}@example.com', marketing_consent=i < 4)
+        for i in range(7)
+    ]
+
+
+@pytest.mark.django_db
+class TestBatchDocuments:
+    def test_generates_in_chunks(self, organization, template, subjects, django_assert_max_num_queries):
+        """Test that documents are rendered per subject and inserted one chunk per INSERT"""
+        with django_assert_max_num_queries(6):
+            result = generate_batch(template, subject_queryset(organization.id), chunk_size=3, max_workers=2)
+        assert (result['generated'], result['chunks']) == (7, 3)
+
+        generated = Document.objects.filter(is_template=False)
+        assert generated.count() == 7
+        document = generated.get(data_subject=subjects[0])
+        assert document.content == f'Dear Subject0, from {organization.name}'
+        assert document.title == 'Annual notice - Subject0 Doe'
+
+    def test_subject_filters(self, organization, subjects):
+        """Test subject filters and their validation"""
+        assert subject_queryset(organization.id, {'marketing_consent': 'true'}).count() == 4
+        assert subject_queryset(organization.id, {'ids': [str(subjects[0].id)]}).count() == 1
+        assert subject_queryset(organization.id, {'created_before': '2000-01-01'}).count() == 0
+        for filters in [{'colour': 'red'}, {'cookie_consent': 'maybe'}, {'ids': ['nope']}, ['ids']]:
+            with pytest.raises(ValueError):
+                subject_queryset(organization.id, filters)
+
+    def test_endpoint_streams_zip(self, api_client, template, subjects):
+        """Test the batch endpoint, including the streamed ZIP"""
+        response = api_client.post(f'/api/documents/{template.id}/generate_batch/',
+                                   {'filters': {'marketing_consent': True}}, format='json')
+        assert response.status_code == 201
+        assert response.data['generated'] == 4
+
+        response = api_client.post(f'/api/documents/{template.id}/generate_batch/',
+                                   {'filters': {'marketing_consent': False}, 'format': 'zip'}, format='json')
+        assert response.status_code == 200
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        assert len(archive.namelist()) == 3
+        assert archive.read(archive.namelist()[0]).decode().startswith('Dear Subject')
+
+        response = api_client.post(f'/api/documents/{template.id}/generate_batch/',
+                                   {'filters': {'colour': 'red'}}, format='json')
+        assert response.status_code == 400
+
+    def test_large_batch_is_queued(self, api_client, template, subjects, settings, tmp_path):
+        """Test that batches over the synchronous limit run as a resumable background job"""
+        settings.MEDIA_ROOT = str(tmp_path)
+        settings.DOCUMENT_BATCH_SYNC_LIMIT = 5
+        response = api_client.post(f'/api/documents/{template.id}/generate_batch/', {}, format='json')
+        assert response.status_code == 202
+        assert response.data['export_type'] == 'document_batch'
+        assert not Document.objects.filter(is_template=False).exists()
+
+        assert process_queued_jobs() == 1
+        job = ExportJob.objects.get(id=response.data['id'])
+        assert (job.status, job.total_rows, job.processed_rows) == ('completed', 7, 7)
+        assert Document.objects.filter(is_template=False).count() == 7
+        assert len(job.file.read().decode().splitlines()) == 8
+
+        # A rerun (e.g. after its worker died) skips subjects that already have their document
+        ExportJob.objects.filter(id=job.id).update(status='queued')
+        process_queued_jobs()
+        assert ExportJob.objects.get(id=job.id).total_rows == 0
+        assert Document.objects.filter(is_template=False).count() == 7
+
+        response = api_client.post(f'/api/documents/{template.id}/generate_batch/',
+                                   {'filters': {'marketing_consent': False}, 'background': True}, format='json')
+        assert response.status_code == 202
+
+    def test_command(self, template, subjects):
+        """Test the management command with a filter"""
+        out = StringIO()
+        call_command('generate_documents', '--template', str(template.id), '--filter', 'marketing_consent=false',
+                     stdout=out)
+        assert 'Generated 3 documents' in out.getvalue()
@@ -0,0 +1,102 @@
+import uuid
+import pytest
+from django.utils import timezone
+from datetime import timedelta
+from api.models import ComplianceAction, DataSubjectRequest, Organization, User
+
+@pytest.mark.django_db
+class TestBulkUpdates:
+    def _create_request(self, organization, status='new'):
+        return DataSubjectRequest.objects.create(
+            organization=organization, request_type='access', data_subject_name='Jane',
+            data_subject_email='jane@example.com', request_details='', status=status,
+            due_date=timezone.now() + timedelta(days=30)
+        )
+
+    def test_bulk_update_status_outcomes(self, organization, api_client, django_assert_max_num_queries):
+        """Test that status changes are validated per id and applied in one UPDATE"""
+        new_requests = [self._create_request(organization) for _ in range(3)]
+        completed = self._create_request(organization, status='completed')
+        already_denied = self._create_request(organization, status='denied')
+        foreign = self._create_request(Organization.objects.create(name='Other', industry='other'))
+        missing = uuid.uuid4()
+
+        ids = [str(r.id) for r in new_requests] + [str(completed.id), str(already_denied.id), str(foreign.id), str(missing), 'not-a-uuid']
+
+        # Savepoint + row lock/read + one UPDATE + savepoint release
+        with django_assert_max_num_queries(4):
+            response = api_client.post(
+                '/api/data-subject-requests/bulk_update_status/', {'ids': ids, 'status': 'denied'}, format='json'
+            )
+
+        assert response.status_code == 200
+        outcomes = {r['id']: r['outcome'] for r in response.json()['results']}
+        assert [outcomes[str(r.id)] for r in new_requests] == ['updated'] * 3
+        assert outcomes[str(completed.id)] == 'rejected'
+        assert outcomes[str(already_denied.id)] == 'unchanged'
+        assert outcomes[str(foreign.id)] == 'not_found'
+        assert outcomes[str(missing)] == 'not_found'
+        assert outcomes['not-a-uuid'] == 'invalid_id'
+        assert DataSubjectRequest.objects.filter(status='denied').count() == 4
+        assert DataSubjectRequest.objects.get(id=completed.id).status == 'completed'
+
+    def test_bulk_assign(self, organization, user, api_client):
+        """Test that many requests can be assigned to one user"""
+        requests = [self._create_request(organization) for _ in range(2)]
+
+        response = api_client.post(
+            '/api/data-subject-requests/bulk_assign/',
+            {'ids': [str(r.id) for r in requests], 'user_id': str(user.id)},
+            format='json'
+        )
+
+        assert response.status_code == 200
+        assert {r['outcome'] for r in response.json()['results']} == {'updated'}
+        assert DataSubjectRequest.objects.filter(assigned_to=user).count() == 2
+
+    def test_bulk_assign_rejects_foreign_user(self, organization, api_client):
+        """Test that requests cannot be assigned to users outside the organization"""
+        other = Organization.objects.create(name='Other', industry='other')
+        outsider = User.objects.create_user(username='outsider', password='password', organization=other)
+
+        response = api_client.post(
+            '/api/data-subject-requests/bulk_assign/',
+            {'ids': [str(self._create_request(organization).id)], 'user_id': str(outsider.id)},
+            format='json'
+        )
+
+        assert response.status_code == 404
+
+    def test_bulk_compliance_action_update(self, organization, api_client):
+        """Test that compliance actions can be completed in bulk"""
+        actions = [ComplianceAction.objects.create(organization=organization, title=f'Action {i}') for i in range(3)]
+
+        response = api_client.post(
+            '/api/compliance-actions/bulk_update/',
+            {'ids': [str(a.id) for a in actions], 'changes': {'status': 'completed', 'priority': 'high'}},
+            format='json'
+        )
+
+        assert response.status_code == 200
+        assert {r['outcome'] for r in response.json()['results']} == {'updated'}
+        assert ComplianceAction.objects.filter(status='completed', priority='high', completed_date__isnull=False).count() == 3
+
+    def test_bulk_due_date_extension_clears_overdue(self, organization, api_client):
+        """Test that extending the due date of overdue actions in bulk clears the flag"""
+        action = ComplianceAction.objects.create(organization=organization, title='Late', overdue_at=timezone.now(),
+                                                 due_date=timezone.localdate() - timezone.timedelta(days=1))
+
+        api_client.post('/api/compliance-actions/bulk_update/',
+                        {'ids': [str(action.id)], 'changes': {'due_date': str(timezone.localdate())}}, format='json')
+
+        assert ComplianceAction.objects.get(pk=action.pk).overdue_at is None
+
+    def test_bulk_rejects_unknown_fields(self, api_client):
+        """Test that unsupported fields are rejected as a whole"""
+        response = api_client.post(
+            '/api/compliance-actions/bulk_update/',
+            {'ids': [str(uuid.uuid4())], 'changes': {'title': 'Renamed'}},
+            format='json'
+        )
+
+        assert response.status_code == 400
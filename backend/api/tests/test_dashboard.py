@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from datetime import timedelta
+from api.aggregates import conditional_counts
+from api.models import ComplianceAction, DataCategory, DataStorage, DataSubjectRequest, DataSubject
+
+@pytest.mark.django_db
+class TestDashboardAggregation:
+    def _create_requests(self, organization):
+        now = timezone.now()
+        DataSubjectRequest.objects.create(
+            organization=organization, request_type='access', data_subject_name='A',
+            data_subject_email='a@example.com', request_details='', status='new',
+            due_date=now - timedelta(days=1)
+        )
+        DataSubjectRequest.objects.create(
+            organization=organization, request_type='erasure', data_subject_name='B',
+            data_subject_email='b@example.com', request_details='', status='completed',
+            due_date=now - timedelta(days=1)
+        )
+        DataSubjectRequest.objects.create(
+            organization=organization, request_type='access', data_subject_name='C',
+            data_subject_email='c@example.com', request_details='', status='in_progress',
+            due_date=now + timedelta(days=10)
+        )
+
+    def test_conditional_counts_single_query(self, organization):
+        """Test that grouped and conditional counts come from one query"""
+        self._create_requests(organization)
+        from django.db.models import Q
+
+        with CaptureQueriesContext(connection) as queries:
+            stats = conditional_counts(
+                DataSubjectRequest.objects.filter(organization=organization),
+                group_by=['status', 'request_type'],
+                conditions={'overdue': Q(status__in=['new', 'in_progress'], due_date__lt=timezone.now())}
+            )
+
+        assert len(queries) == 1
+        assert stats['total'] == 3
+        assert stats['status'] == {'new': 1, 'in_progress': 1, 'completed': 1, 'denied': 0}
+        assert stats['request_type']['access'] == 2
+        assert stats['overdue'] == 1
+
+    def test_summary_query_budget(self, organization, api_client, django_assert_max_num_queries):
+        """Test that the summary dashboard stays within its query budget"""
+        self._create_requests(organization)
+        ComplianceAction.objects.create(organization=organization, title='Review DPA', priority='high')
+        DataCategory.objects.create(organization=organization, name='Contact', legal_basis='consent')
+        DataStorage.objects.create(organization=organization, name='CRM', storage_type='saas')
+
+        with django_assert_max_num_queries(6):
+            response = api_client.get('/api/dashboard/summary/')
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['data_subject_requests']['total'] == 3
+        assert data['data_subject_requests']['overdue'] == 1
+        assert data['compliance_actions']['by_priority']['high'] == 1
+        assert data['data_inventory']['retention_compliance'] == 100
+        assert data['data_inventory']['storage_by_type']['saas'] == 1
+
+    def test_enhanced_query_budget(self, organization, api_client, django_assert_max_num_queries):
+        """Test that the enhanced dashboard stays within its query budget"""
+        self._create_requests(organization)
+        DataSubject.objects.create(
+            organization=organization, first_name='Jane', last_name='Doe',
+            email='jane@example.com', marketing_consent=True
+        )
+
+        with django_assert_max_num_queries(8):
+            response = api_client.get('/api/dashboard/enhanced/')
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['data_subjects']['count'] == 1
+        assert data['consent']['marketing_consent'] == 1
+        assert data['data_subject_requests']['pending'] == 1
+        assert data['data_subject_requests']['overdue'] == 1
@@ -0,0 +1,63 @@
+import pytest
+from api.models import DataCategory, DataStorage, DataMapping
+
+@pytest.mark.django_db
+class TestDataMap:
+    @pytest.fixture
+    def data_map(self, organization):
+        contact = DataCategory.objects.create(organization=organization, name='Contact', legal_basis='consent')
+        health = DataCategory.objects.create(organization=organization, name='Health', legal_basis='consent', is_sensitive=True)
+        crm = DataStorage.objects.create(organization=organization, name='CRM', storage_type='saas')
+        drive = DataStorage.objects.create(organization=organization, name='Drive', storage_type='cloud', is_outside_eea=True)
+        backup = DataStorage.objects.create(organization=organization, name='Backup', storage_type='cloud')
+        for category, storage in [(contact, crm), (contact, drive), (health, drive), (health, backup)]:
+            DataMapping.objects.create(organization=organization, data_category=category, storage=storage, purpose='Service')
+        return {'contact': contact, 'health': health, 'crm': crm, 'drive': drive, 'backup': backup}
+
+    def test_graph_cached_and_rebuilt_on_commit(self, data_map, organization, api_client, django_assert_num_queries,
+                                                django_capture_on_commit_callbacks):
+        """Test that the graph is served from cache and rebuilt once a change commits"""
+        response = api_client.get('/api/data-map/')
+        assert len(response.json()['nodes']) == 5
+        assert len(response.json()['links']) == 4
+
+        with django_assert_num_queries(0):
+            api_client.get('/api/data-map/')
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            paper = DataStorage.objects.create(organization=organization, name='Archive', storage_type='paper')
+            DataMapping.objects.create(organization=organization, data_category=data_map['contact'], storage=paper, purpose='Archive')
+            data_map['crm'].delete()
+        # Not committed yet: still the cached graph
+        with django_assert_num_queries(0):
+            assert len(api_client.get('/api/data-map/').json()['nodes']) == 5
+
+        for callback in callbacks:
+            callback()
+        with django_assert_num_queries(3):
+            data = api_client.get('/api/data-map/').json()
+
+        node_names = {node['name'] for node in data['nodes']}
+        assert 'Archive' in node_names and 'CRM' not in node_names
+        assert len(data['links']) == 4
+        assert not any(link['target'] == str(data_map['crm'].id) for link in data['links'])
+
+    def test_clustered_graph_with_drill_down(self, data_map, api_client):
+        """Test that nodes can be grouped by storage type and sensitivity and expanded"""
+        data = api_client.get('/api/data-map/?group_by=storage_type,sensitivity').json()
+        clusters = {node['id']: node for node in data['nodes']}
+
+        assert set(clusters) == {'storage_type:saas', 'storage_type:cloud', 'sensitivity:sensitive', 'sensitivity:non_sensitive'}
+        assert clusters['storage_type:cloud']['size'] == 2
+        assert clusters['storage_type:cloud']['outside_eea'] == 1
+        links = {(link['source'], link['target']): link['count'] for link in data['links']}
+        assert links[('sensitivity:sensitive', 'storage_type:cloud')] == 2
+
+        data = api_client.get('/api/data-map/?group_by=storage_type&expand=storage_type:cloud').json()
+        node_ids = {node['id'] for node in data['nodes']}
+        assert str(data_map['drive'].id) in node_ids
+        assert 'storage_type:saas' in node_ids
+
+    def test_invalid_group_by(self, api_client):
+        """Test that unknown grouping modes are rejected"""
+        assert api_client.get('/api/data-map/?group_by=location').status_code == 400
@@ -0,0 +1,122 @@
+import datetime
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from api.deadlines import items_overdue, next_deadline, process_due_deadlines
+from api.models import (
+    ComplianceAction, DataSubjectRequest, Notification, WorkflowInstance, WorkflowStep
+)
+
+
+def make_request(organization, name, due_date, **kwargs):
+    return DataSubjectRequest.objects.create(
+        organization=organization, request_type='access', data_subject_name=name,
+        data_subject_email=f'{name.lower()}@example.com', request_details='All data', due_date=due_date, **kwargs
+    )
+
+
+@pytest.fixture
+def deadlines(organization, user):
+    now = timezone.now()
+    workflow = WorkflowInstance.objects.create(organization=organization, name='Erasure',
+                                               due_date=now - timezone.timedelta(hours=1))
+    return {
+        'late_request': make_request(organization, 'Late', now - timezone.timedelta(days=1), assigned_to=user),
+        'future_request': make_request(organization, 'Future', now + timezone.timedelta(days=3)),
+        'done_request': make_request(organization, 'Done', now - timezone.timedelta(days=1), status='completed'),
+        'workflow': workflow,
+        'step': WorkflowStep.objects.create(workflow=workflow, name='Verify', step_type='verify_identity',
+                                            due_date=now - timezone.timedelta(minutes=5)),
+        'late_action': ComplianceAction.objects.create(organization=organization, title='Update DPA',
+                                                       due_date=(now - timezone.timedelta(days=2)).date()),
+        'today_action': ComplianceAction.objects.create(organization=organization, title='Review policy',
+                                                        due_date=timezone.localdate(now)),
+    }
+
+
+@pytest.mark.django_db
+class TestDeadlineScheduler:
+    def test_flags_newly_due_items_and_notifies(self, deadlines, user):
+        """Test that only open items past their deadline are flagged, once"""
+        received = []
+        handler = lambda sender, kind, items, **kwargs: received.append((kind, len(items)))
+        items_overdue.connect(handler)
+        try:
+            flipped = process_due_deadlines()
+        finally:
+            items_overdue.disconnect(handler)
+
+        assert flipped == {'request_overdue': 1, 'workflow_overdue': 1, 'step_overdue': 1, 'action_overdue': 1}
+        assert set(received) == {('request_overdue', 1), ('workflow_overdue', 1), ('step_overdue', 1), ('action_overdue', 1)}
+
+        assert DataSubjectRequest.objects.get(pk=deadlines['late_request'].pk).overdue_at is not None
+        assert DataSubjectRequest.objects.get(pk=deadlines['future_request'].pk).overdue_at is None
+        assert DataSubjectRequest.objects.get(pk=deadlines['done_request'].pk).overdue_at is None
+        assert ComplianceAction.objects.get(pk=deadlines['late_action'].pk).overdue_at is not None
+        assert ComplianceAction.objects.get(pk=deadlines['today_action'].pk).overdue_at is None
+
+        notification = Notification.objects.get(kind='request_overdue')
+        assert notification.user == user
+        assert notification.object_id == deadlines['late_request'].pk
+
+        # Already flagged items are not picked up again
+        assert sum(process_due_deadlines().values()) == 0
+        assert Notification.objects.count() == 4
+
+    def test_next_deadline_and_extension(self, deadlines):
+        """Test that the next wake-up time is the earliest open deadline and extensions clear the flag"""
+        process_due_deadlines()
+        # The action due today falls due once the day is over
+        tomorrow = timezone.localdate() + timezone.timedelta(days=1)
+        assert next_deadline() == timezone.make_aware(datetime.datetime.combine(tomorrow, datetime.time.min))
+
+        deadlines['today_action'].status = 'completed'
+        deadlines['today_action'].save()
+        assert next_deadline() == deadlines['future_request'].due_date
+
+        request = deadlines['late_request']
+        request.refresh_from_db()
+        request.due_date = timezone.now() + timezone.timedelta(days=7)
+        request.save()
+        assert request.overdue_at is None
+
+        action = ComplianceAction.objects.get(pk=deadlines['late_action'].pk)
+        action.due_date = timezone.localdate()
+        action.save()
+        assert action.overdue_at is None
+        assert action.status == 'pending'
+
+    def test_locked_due_items_do_not_set_the_next_wake(self, deadlines):
+        """Test that an item already due (e.g. held locked elsewhere) is not taken as the next deadline"""
+        now = timezone.now()
+        upcoming = next_deadline(now)
+        assert upcoming > now
+        # Nothing has been flagged yet, yet the next wake-up is still in the future
+        assert DataSubjectRequest.objects.filter(overdue_at__isnull=True, due_date__lt=now).exists()
+
+    def test_batches(self, organization):
+        """Test that more items than one batch are all flagged"""
+        past = timezone.now() - timezone.timedelta(days=1)
+        for i in range(5):
+            make_request(organization, f'Subject{i}', past)
+        assert process_due_deadlines(batch_size=2)['request_overdue'] == 5
+
+    def test_notifications_api(self, deadlines, api_client):
+        """Test that users see their notifications and can mark them read"""
+        process_due_deadlines()
+
+        data = api_client.get('/api/notifications/?unread=true').json()
+        assert len(data) == 4
+
+        response = api_client.post('/api/notifications/mark_read/', {'ids': [data[0]['id']]}, format='json')
+        assert response.json() == {'updated': 1}
+        assert len(api_client.get('/api/notifications/?unread=true').json()) == 3
+
+        assert api_client.post('/api/notifications/mark_read/', {}, format='json').json() == {'updated': 3}
+
+    def test_run_once_command(self, deadlines):
+        """Test that the scheduler command flags due items once"""
+        out = StringIO()
+        call_command('run_deadline_scheduler', once=True, stdout=out)
+        assert 'Flagged 4 overdue items' in out.getvalue()
@@ -0,0 +1,90 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from api.compression import MARKER, compress_text, decompress_text
+from api.models import Document
+
+BODY = 'We process your personal data to provide our services.\n' * 100
+
+
+def stored_content(document):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT content FROM api_document WHERE id = %s', [document.pk.hex])
+        return cursor.fetchone()[0]
+
+
+def body_reads(queries):
+    return [q for q in queries.captured_queries if q['sql'].startswith('SELECT') and '"content"' in q['sql']]
+
+
+@pytest.mark.django_db
+class TestDocumentCompression:
+    def test_round_trip(self):
+        """Test that short bodies are kept as written and a body starting with the marker survives"""
+        assert compress_text('short') == 'short'
+        assert len(compress_text(BODY)) < len(BODY) / 10
+        assert decompress_text(compress_text(BODY)) == BODY
+        tricky = MARKER + 'z not compressed'
+        assert compress_text(tricky) != tricky
+        assert decompress_text(compress_text(tricky)) == tricky
+
+    def test_large_bodies_stored_compressed(self, organization):
+        """Test that a large body is compressed in the database and read back transparently"""
+        document = Document.objects.create(organization=organization, title='Policy', document_type='other',
+                                           content=BODY)
+        assert stored_content(document).startswith(MARKER)
+        assert Document.objects.get(pk=document.pk).content == BODY
+
+    def test_metadata_reads_skip_the_body(self, organization):
+        """Test that the body is only read when used, with one query"""
+        Document.objects.create(organization=organization, title='Policy', document_type='other', content=BODY)
+        with CaptureQueriesContext(connection) as queries:
+            documents = list(Document.objects.filter(organization=organization))
+            assert documents[0].title == 'Policy'
+        assert not body_reads(queries)
+
+        with CaptureQueriesContext(connection) as queries:
+            assert documents[0].content == BODY
+        assert len(queries) == 1
+
+        documents[0].title = 'Privacy policy'
+        documents[0].save()
+        assert Document.objects.with_content().get(pk=documents[0].pk).content == BODY
+
+    def test_list_omits_body(self, api_client, organization):
+        """Test that the document list leaves bodies out and the detail view includes them"""
+        document = Document.objects.create(organization=organization, title='Policy', document_type='other',
+                                           content=BODY)
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get('/api/documents/')
+        assert 'content' not in response.data[0]
+        assert not body_reads(queries)
+        assert api_client.get(f'/api/documents/{document.id}/').data['content'] == BODY
+
+    def test_compress_existing_rows(self, organization):
+        """Test that the command compresses plain bodies without touching updated_at"""
+        document = Document.objects.create(organization=organization, title='Policy', document_type='other')
+        with connection.cursor() as cursor:
+            cursor.execute('UPDATE api_document SET content = %s WHERE id = %s', [BODY, document.pk.hex])
+        assert Document.objects.get(pk=document.pk).content == BODY
+        updated_at = Document.objects.get(pk=document.pk).updated_at
+
+        call_command('compress_documents', batch_size=1)
+        assert stored_content(document).startswith(MARKER)
+        document = Document.objects.get(pk=document.pk)
+        assert document.content == BODY
+        assert document.updated_at == updated_at
+
+    def test_lazy_load_keeps_unsaved_changes(self, organization):
+        """Test that reading the body reads only the body, and a refresh reloads a loaded body"""
+        document = Document.objects.create(organization=organization, title='Policy', document_type='other',
+                                           content=BODY)
+        loaded = Document.objects.get(pk=document.pk)
+        loaded.title = 'Renamed'
+        assert loaded.content == BODY
+        assert loaded.title == 'Renamed'
+
+        Document.objects.filter(pk=document.pk).update(content='Replaced')
+        document.refresh_from_db()
+        assert document.content == 'Replaced'
@@ -0,0 +1,64 @@
+import pytest
+from api import document_renderer
+from api.document_renderer import CompiledDocument, compiled_document
+from api.models import DataSubject, Document
+
+
+@pytest.fixture
+def subject(organization):
+    return DataSubject.objects.create(organization=organization, first_name='Jane', last_name='Doe',
+                                      email='jane@example.com')
+
+
+@pytest.fixture
+def template(organization):
+    return Document.objects.create(
+        organization=organization, title='Letter', document_type='other', is_template=True,
+        content='Dear {{subject_full_name}}, {{ organization_name }} keeps your data until {{expiry_date}}. '
+                'Contact {{dpo_name}} about {{unknown}}.',
+        template_variables={'dpo_name': {'default': 'our DPO'}}
+    )
+
+
+class TestCompiledDocument:
+    def test_single_pass_render(self):
+        """Test that placeholders are split out once and rendered in one pass"""
+        compiled = CompiledDocument('Hi {{name}}, {{name}} again; {{missing}} stays.')
+        assert compiled.names == {'name', 'missing'}
+        assert compiled.render({'name': 'Jo'}) == 'Hi Jo, Jo again; {{missing}} stays.'
+        # Values that themselves look like placeholders are not expanded again
+        assert compiled.render({'name': '{{missing}}', 'missing': 'x'}) == 'Hi {{missing}}, {{missing}} again; x stays.'
+
+
+@pytest.mark.django_db
+class TestDocumentRenderer:
+    def test_subject_rendering(self, template, subject, organization):
+        """Test built-in and declared variables in generated documents"""
+        document = template.generate_document_for_subject(subject)
+        assert document.content == (
+            f"Dear Jane Doe, {organization.name} keeps your data until Not set. "
+            "Contact our DPO about {{unknown}}."
+        )
+
+    def test_compiled_once_per_version(self, template, subject, monkeypatch):
+        """Test that a template is compiled once until it is saved again"""
+        compiles = []
+        original = CompiledDocument.__init__
+        monkeypatch.setattr(CompiledDocument, '__init__', lambda self, text: compiles.append(1) or original(self, text))
+        document_renderer.clear()
+
+        for _ in range(3):
+            template._populate_template_for_subject(subject)
+        assert len(compiles) == 1
+
+        template.content = 'Hello {{subject_first_name}}'
+        template.save()
+        assert template._populate_template_for_subject(subject) == 'Hello Jane'
+        assert len(compiles) == 2
+        assert compiled_document(template)[0].names == {'subject_first_name'}
+
+    def test_extra_values_override(self, template):
+        """Test that caller-supplied values fill declared variables"""
+        content = document_renderer.render_document(template, extra={'dpo_name': 'Sam', 'unused': 'x'})
+        assert 'Contact Sam about' in content
+        assert '{{subject_full_name}}' in content
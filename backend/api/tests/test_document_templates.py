@@ -0,0 +1,71 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from api.models import DataSubject, Document
+
+
+@pytest.fixture
+def template(organization):
+    return Document.objects.create(
+        organization=organization, title='Erasure confirmation', document_type='erasure_confirmation',
+        is_template=True, status='active', content='Dear {{subject_first_name}}, ref {{reference}}.',
+        template_variables={'reference': 'n/a'}
+    )
+
+
+@pytest.mark.django_db
+class TestDocumentTemplates:
+    def test_list_is_cached_and_invalidated(self, api_client, organization, template,
+                                            django_capture_on_commit_callbacks):
+        """Test that the template list comes from the cache until a template change commits"""
+        Document.objects.create(organization=organization, title='Letter', document_type='other', content='x')
+        response = api_client.get('/api/document-templates/')
+        assert [t['name'] for t in response.data] == ['Erasure confirmation']
+        assert response.data[0]['variables'] == ['reference']
+
+        with CaptureQueriesContext(connection) as queries:
+            api_client.get('/api/document-templates/')
+        assert not [q for q in queries.captured_queries if 'FROM "api_document"' in q['sql']]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            template.title = 'Erasure notice'
+            template.save()
+            # Not yet committed: the cached list still stands
+            assert api_client.get('/api/document-templates/').data[0]['name'] == 'Erasure confirmation'
+        assert api_client.get('/api/document-templates/').data[0]['name'] == 'Erasure notice'
+
+        with django_capture_on_commit_callbacks(execute=True):
+            template.is_template = False
+            template.save()
+        assert api_client.get('/api/document-templates/').data == []
+
+    def test_generate_from_template(self, api_client, organization, template):
+        """Test generation for a subject with fields, without re-reading the body once compiled"""
+        subject = DataSubject.objects.create(organization=organization, first_name='Jane', last_name='Doe',
+                                             email='jane@example.com')
+        url = f'/api/generate-document/{template.id}/'
+        response = api_client.post(url, {'data_subject_id': str(subject.id), 'fields': {'reference': 'E-1'}},
+                                   format='json')
+        assert response.status_code == 200
+        assert response.data['content'] == 'Dear Jane, ref E-1.'
+        assert response.data['data_subject'] == subject.id
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.post(url, {'fields': {}}, format='json')
+        body_reads = [q for q in queries.captured_queries
+                      if q['sql'].startswith('SELECT') and '"api_document"."content"' in q['sql']]
+        assert not body_reads
+        assert response.data['content'] == 'Dear {{subject_first_name}}, ref n/a.'
+
+    def test_generate_errors(self, api_client, organization, template):
+        """Test unknown templates and subjects, and titles or types a document cannot hold"""
+        plain = Document.objects.create(organization=organization, title='Letter', document_type='other')
+        assert api_client.post(f'/api/generate-document/{plain.id}/', {}, format='json').status_code == 404
+        response = api_client.post(f'/api/generate-document/{template.id}/', {'data_subject_id': 'nope'}, format='json')
+        assert response.status_code == 404
+
+        url = f'/api/generate-document/{template.id}/'
+        for data in [{'title': 'x' * 256}, {'title': 3}, {'document_type': 'memo'}, {'document_type': ['other']}]:
+            assert api_client.post(url, data, format='json').status_code == 400
+        assert not Document.objects.filter(is_template=False).exclude(pk=plain.pk).exists()
+        assert api_client.post(url, {'title': 'Notice', 'document_type': 'other'}, format='json').status_code == 200
@@ -0,0 +1,85 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from api import document_versions
+from api.document_versions import (
+    SNAPSHOT_INTERVAL, apply_delta, create_version, encode_delta, history, next_version, revision_content
+)
+from api.models import Document, DocumentRevision
+
+
+def body(revision):
+    """A long policy body with one clause changed per revision"""
+    return ''.join(
+        f"Clause {line}: {'revised in ' + str(revision) if line == revision % 40 else 'unchanged text'}\n"
+        for line in range(40)
+    )
+
+
+@pytest.fixture
+def document(organization):
+    return Document.objects.create(organization=organization, title='Privacy policy',
+                                   document_type='privacy_policy', content=body(0))
+
+
+@pytest.mark.django_db
+class TestDocumentVersions:
+    def test_chain_of_deltas_with_snapshots(self, document, monkeypatch):
+        """Test that every version can be rebuilt, with periodic snapshots and small deltas"""
+        for revision in range(1, 25):
+            create_version(document, content=body(revision))
+
+        revisions = list(DocumentRevision.objects.filter(document=document).order_by('number'))
+        assert len(revisions) == 25
+        assert [r.number for r in revisions if r.is_snapshot] == [1, 1 + SNAPSHOT_INTERVAL, 1 + 2 * SNAPSHOT_INTERVAL]
+        assert all(r.stored_size < r.size / 4 for r in revisions if not r.is_snapshot)
+
+        monkeypatch.setattr(document_versions, '_checkpoints', type(document_versions._checkpoints)())
+        for number in (25, 1, 12, 20):
+            assert revision_content(document.pk, number) == body(number - 1)
+
+        document.refresh_from_db()
+        assert (document.version, document.content, document.status) == ('3.4', body(24), 'draft')
+
+    def test_checkpoints_avoid_reads(self, document, django_assert_num_queries):
+        """Test that a rebuilt version is served from the checkpoint cache"""
+        create_version(document, content=body(1))
+        revision_content(document.pk, 2)
+        with django_assert_num_queries(0):
+            assert revision_content(document.pk, 2) == body(1)
+
+    def test_history_does_not_load_bodies(self, document):
+        """Test that listing versions never selects the stored data"""
+        create_version(document, content=body(1))
+        with CaptureQueriesContext(connection) as queries:
+            versions = history(document)
+        assert [v['version'] for v in versions] == ['1.0', '1.1']
+        assert not any('"data"' in q['sql'] for q in queries.captured_queries)
+
+    def test_delta_round_trip_and_version_numbers(self):
+        """Test delta encoding edge cases and decimal version increments"""
+        for old, new in [('', 'a\nb'), ('a\nb\nc', 'a\nc\nd'), ('same', 'same'), ('x\n', '')]:
+            assert apply_delta(old, encode_delta(old, new)) == new
+        assert next_version('1.9') == '2.0'
+        assert next_version('1.2') == '1.3'
+        with pytest.raises(ValueError):
+            next_version('draft')
+
+    def test_endpoints(self, api_client, document):
+        """Test creating, listing and reading versions through the API"""
+        response = api_client.post(f'/api/documents/{document.id}/version/', {'content': body(1)}, format='json')
+        assert response.status_code == 200
+        assert (response.data['id'], response.data['version']) == (str(document.id), '1.1')
+
+        versions = api_client.get(f'/api/documents/{document.id}/versions/').data
+        assert [v['number'] for v in versions] == [1, 2]
+        first = api_client.get(f'/api/documents/{document.id}/versions/1/')
+        assert first.data['content'] == body(0)
+        assert api_client.get(f'/api/documents/{document.id}/versions/9/').status_code == 404
+
+    def test_version_input_is_validated(self, api_client, document):
+        """Test that a non-string body or an over-long title is refused rather than failing"""
+        url = f'/api/documents/{document.id}/version/'
+        for data in [{'content': 42}, {'content': ['a']}, {'title': 7}, {'title': 'x' * 256}]:
+            assert api_client.post(url, data, format='json').status_code == 400
+        assert not document.revisions.exists()
@@ -0,0 +1,132 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from datetime import timedelta
+from api import export_jobs
+from api.export_jobs import (
+    claim_next_job, cleanup_expired_jobs, enqueue_export, process_queued_jobs, reclaim_stale_jobs, run_export_job
+)
+from api.models import DataSubject, ExportJob
+
+@pytest.mark.django_db
+class TestExportJobs:
+    @pytest.fixture(autouse=True)
+    def media_root(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        return tmp_path
+
+    @pytest.fixture
+    def subjects(self, organization):
+        return [
+            DataSubject.objects.create(
+                organization=organization, first_name=f'First{i}', last_name='Last',
+                email=f'subject{i}@example.com', data_processing_consent=True
+            )
+            for i in range(3)
+        ]
+
+    def test_job_lifecycle_via_api(self, subjects, api_client):
+        """Test that a queued export is processed and can be polled and downloaded"""
+        response = api_client.post('/api/export-jobs/', {'export_type': 'data_subjects', 'format': 'csv'}, format='json')
+        assert response.status_code == 201
+        job_id = response.json()['id']
+        assert response.json()['status'] == 'queued'
+
+        assert process_queued_jobs() == 1
+
+        job = api_client.get(f'/api/export-jobs/{job_id}/').json()
+        assert job['status'] == 'completed'
+        assert job['total_rows'] == 3
+        assert job['processed_rows'] == 3
+        assert job['progress_percentage'] == 100
+
+        download = api_client.get(f'/api/export-jobs/{job_id}/download/')
+        lines = b''.join(download.streaming_content).decode().splitlines()
+        assert lines[0].startswith('Subject ID,First Name')
+        assert len(lines) == 4
+
+    def test_download_before_completion(self, api_client, organization):
+        """Test that unfinished exports cannot be downloaded"""
+        job = enqueue_export(organization.id, 'data_subjects')
+        assert api_client.get(f'/api/export-jobs/{job.id}/download/').status_code == 409
+
+    def test_inventory_export_can_run_in_background(self, api_client):
+        """Test that the inventory export endpoint can enqueue a job"""
+        response = api_client.get('/api/export-data-inventory/?format=xlsx&background=true')
+
+        assert response.status_code == 202
+        assert ExportJob.objects.get(id=response.json()['id']).export_type == 'data_inventory'
+
+    def test_expired_artifacts_are_removed(self, subjects, organization, media_root):
+        """Test that expired export files are deleted"""
+        job = enqueue_export(organization.id, 'data_subjects', export_format='ndjson')
+        process_queued_jobs()
+        job.refresh_from_db()
+        path = job.file.path
+
+        ExportJob.objects.filter(id=job.id).update(expires_at=timezone.now() - timedelta(minutes=1))
+        assert cleanup_expired_jobs() == 1
+
+        job.refresh_from_db()
+        assert job.status == 'expired'
+        assert not media_root.joinpath(path).exists()
+
+    def test_worker_command_runs_once(self, subjects, organization):
+        """Test that the worker command drains the queue"""
+        enqueue_export(organization.id, 'retention_report', export_format='xlsx')
+        out = StringIO()
+
+        call_command('process_export_jobs', '--once', stdout=out)
+
+        assert 'Processed 1 export jobs' in out.getvalue()
+        assert ExportJob.objects.get().status == 'completed'
+
+    def test_stale_running_job_is_requeued(self, subjects, organization):
+        """Test that a job whose worker died is requeued, then failed after too many attempts"""
+        job = enqueue_export(organization.id, 'data_subjects')
+        claim_next_job()
+        stale = timezone.now() + timedelta(minutes=11)
+
+        assert reclaim_stale_jobs() == 0
+        assert reclaim_stale_jobs(now=stale) == 1
+        job.refresh_from_db()
+        assert job.status == 'queued'
+
+        ExportJob.objects.filter(id=job.id).update(status='running', attempts=3)
+        assert reclaim_stale_jobs(now=stale + timedelta(minutes=11)) == 1
+        job.refresh_from_db()
+        assert job.status == 'failed'
+        assert job.error
+
+    def test_deleted_running_job_stays_deleted(self, subjects, organization, media_root, monkeypatch):
+        """Test that deleting a running job stops it without re-creating the row or leaving a file"""
+        enqueue_export(organization.id, 'data_subjects')
+        job = claim_next_job()
+        source = export_jobs.EXPORT_SOURCES['data_subjects']
+
+        def deleting_source(organization_id, parameters):
+            columns, total, rows = source(organization_id, parameters)
+            ExportJob.objects.filter(id=job.id).delete()
+            return columns, total, rows
+
+        monkeypatch.setitem(export_jobs.EXPORT_SOURCES, 'data_subjects', deleting_source)
+        monkeypatch.setattr(export_jobs, 'PROGRESS_INTERVAL', 1)
+        run_export_job(job)
+
+        assert not ExportJob.objects.exists()
+        assert not any(path.is_file() for path in media_root.rglob('*'))
+
+    def test_reclaimed_job_result_is_discarded(self, subjects, organization, monkeypatch):
+        """Test that a worker whose job was requeued as stale does not overwrite the new claim"""
+        enqueue_export(organization.id, 'data_subjects')
+        job = claim_next_job()
+        ExportJob.objects.filter(id=job.id).update(status='queued')
+        claim_next_job()
+
+        run_export_job(job)
+
+        reclaimed = ExportJob.objects.get(id=job.id)
+        assert reclaimed.status == 'running'
+        assert reclaimed.attempts == 2
+        assert not reclaimed.file
@@ -0,0 +1,101 @@
+import datetime
+import hashlib
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from api import file_store
+from api.file_store import collect_unreferenced, parse_range
+from api.models import Document, Organization, StoredFile
+
+PDF = b'%PDF-1.4 privacy policy ' + bytes(range(256)) * 40
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+def make_document(organization, data=PDF, name='policy.pdf'):
+    return Document.objects.create(organization=organization, title='Policy', document_type='privacy_policy',
+                                   file=ContentFile(data, name=name))
+
+
+def expire_grace_period():
+    StoredFile.objects.update(last_stored_at=timezone.now() - file_store.GRACE_PERIOD - datetime.timedelta(seconds=1))
+
+
+@pytest.mark.django_db
+class TestFileStore:
+    def test_identical_files_stored_once(self, organization):
+        """Test that the same bytes uploaded by two organizations share one stored file"""
+        other = Organization.objects.create(name='Other Org')
+        first = make_document(organization)
+        second = make_document(other, name='copy.pdf')
+
+        digest = hashlib.sha256(PDF).hexdigest()
+        assert first.file.name == second.file.name == file_store.blob_name(digest)
+        assert (first.file_name, second.file_name) == ('policy.pdf', 'copy.pdf')
+        stored = StoredFile.objects.get()
+        assert (stored.digest, stored.size, stored.ref_count) == (digest, len(PDF), 2)
+        with first.file.open('rb') as f:
+            assert f.read() == PDF
+
+    def test_deleted_only_when_unreferenced(self, organization, django_capture_on_commit_callbacks):
+        """Test that a shared file survives until its last document goes, and its grace period ends"""
+        first = make_document(organization)
+        second = make_document(organization)
+        name = first.file.name
+
+        with django_capture_on_commit_callbacks(execute=True):
+            first.delete()
+        assert StoredFile.objects.get().ref_count == 1
+
+        with django_capture_on_commit_callbacks(execute=True):
+            second.file = ContentFile(b'replacement', name='new.pdf')
+            second.save()
+        assert StoredFile.objects.get(name=name).ref_count == 0
+        # Stored moments ago, so kept for now
+        assert default_storage.exists(name)
+
+        expire_grace_period()
+        assert collect_unreferenced() == 1
+        assert not default_storage.exists(name)
+        assert list(StoredFile.objects.values_list('ref_count', flat=True)) == [1]
+
+    def test_parse_range(self):
+        """Test single byte ranges, suffixes and ranges outside the file"""
+        assert parse_range('bytes=0-9', 100) == (0, 9)
+        assert parse_range('bytes=90-', 100) == (90, 99)
+        assert parse_range('bytes=95-200', 100) == (95, 99)
+        assert parse_range('bytes=-10', 100) == (90, 99)
+        assert parse_range('bytes=0-1,5-6', 100) is None
+        assert parse_range(None, 100) is None
+        with pytest.raises(ValueError):
+            parse_range('bytes=100-', 100)
+
+    def test_upload_and_range_download(self, api_client):
+        """Test a streamed, hashed upload and ranged, revalidated downloads"""
+        response = api_client.post('/api/documents/', {
+            'title': 'Policy', 'document_type': 'privacy_policy',
+            'file': SimpleUploadedFile('policy.pdf', PDF, content_type='application/pdf'),
+        }, format='multipart')
+        assert response.status_code == 201
+        assert response.data['file_name'] == 'policy.pdf'
+        assert StoredFile.objects.get().digest == hashlib.sha256(PDF).hexdigest()
+        url = f"/api/documents/{response.data['id']}/download/"
+
+        response = api_client.get(url, HTTP_RANGE='bytes=4-11')
+        assert response.status_code == 206
+        assert b''.join(response.streaming_content) == PDF[4:12]
+        assert response['Content-Range'] == f'bytes 4-11/{len(PDF)}'
+
+        response = api_client.get(url)
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/pdf'
+        assert b''.join(response.streaming_content) == PDF
+        etag = response['ETag']
+
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        assert api_client.get(url, HTTP_RANGE=f'bytes={len(PDF)}-').status_code == 416
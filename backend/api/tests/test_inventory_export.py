@@ -0,0 +1,59 @@
+import io
+import json
+import pytest
+from openpyxl import load_workbook
+from api.models import DataCategory, DataStorage, DataMapping
+
+@pytest.mark.django_db
+class TestInventoryExport:
+    @pytest.fixture(autouse=True)
+    def inventory(self, organization):
+        contact = DataCategory.objects.create(organization=organization, name='Contact', legal_basis='consent')
+        DataCategory.objects.create(organization=organization, name='Unmapped', legal_basis='contract')
+        crm = DataStorage.objects.create(organization=organization, name='CRM', storage_type='saas')
+        drive = DataStorage.objects.create(organization=organization, name='Drive', storage_type='cloud', is_outside_eea=True)
+        DataMapping.objects.create(organization=organization, data_category=contact, storage=crm, purpose='Sales')
+        DataMapping.objects.create(organization=organization, data_category=contact, storage=drive, purpose='Backup')
+
+    def test_json_export_single_query(self, api_client, django_assert_num_queries):
+        """Test that the nested JSON export comes from one joined query"""
+        with django_assert_num_queries(1):
+            data = api_client.get('/api/export-data-inventory/').json()
+
+        assert [c['category_name'] for c in data] == ['Contact', 'Unmapped']
+        assert [s['storage_name'] for s in data[0]['storages']] == ['CRM', 'Drive']
+        assert data[1]['storages'] == []
+
+    def test_csv_export_streams(self, api_client):
+        """Test that the CSV export is a streaming response with one row per mapping"""
+        response = api_client.get('/api/export-data-inventory/?format=csv')
+
+        assert response.status_code == 200
+        assert response.streaming
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert lines[0].startswith('Category,Sensitive,Legal Basis')
+        assert len(lines) == 4
+        assert lines[2] == 'Contact,False,consent,365,Drive,cloud,True,Backup'
+
+    def test_ndjson_export(self, api_client):
+        """Test that the NDJSON export emits one JSON document per row"""
+        response = api_client.get('/api/export-data-inventory/?format=ndjson')
+
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        assert len(rows) == 3
+        assert rows[0]['storage_name'] == 'CRM'
+        assert rows[2]['storage_name'] is None
+
+    def test_xlsx_export(self, api_client):
+        """Test that the XLSX export produces a readable workbook"""
+        response = api_client.get('/api/export-data-inventory/?format=xlsx')
+
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        rows = list(workbook.active.values)
+        assert rows[0][0] == 'Category'
+        assert rows[1][4] == 'CRM'
+        assert len(rows) == 4
+
+    def test_unsupported_format(self, api_client):
+        """Test that unknown formats are rejected"""
+        assert api_client.get('/api/export-data-inventory/?format=pdf').status_code == 400
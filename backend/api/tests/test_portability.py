@@ -0,0 +1,46 @@
+import io
+import json
+import zipfile
+import pytest
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from datetime import timedelta
+from api.models import ConsentActivity, DataSubject, DataSubjectRequest, Document
+
+@pytest.mark.django_db
+class TestPortabilityPackage:
+    @pytest.fixture(autouse=True)
+    def media_root(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+
+    def test_package_contains_all_subject_data(self, organization, api_client):
+        """Test that the streamed ZIP holds the subject record and every related table"""
+        subject = DataSubject.objects.create(
+            organization=organization, first_name='Jane', last_name='Doe', email='jane@example.com'
+        )
+        for activity_type in ('consent_given', 'consent_withdrawn'):
+            ConsentActivity.objects.create(data_subject=subject, activity_type=activity_type, consent_type='marketing')
+        document = Document(
+            organization=organization, title='SAR Response', document_type='subject_access_response',
+            content='Dear Jane', data_subject=subject
+        )
+        document.file.save('response.pdf', ContentFile(b'%PDF-1.4 test'), save=False)
+        document.save()
+        DataSubjectRequest.objects.create(
+            organization=organization, request_type='portability', data_subject_name='Jane Doe',
+            data_subject_email='JANE@example.com', request_details='Please export my data',
+            due_date=timezone.now() + timedelta(days=30)
+        )
+
+        response = api_client.get(f'/api/data-subjects/{subject.id}/portability/')
+
+        assert response.status_code == 200
+        assert response.streaming
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        names = set(archive.namelist())
+        assert {'subject.json', 'consent_activities.csv', 'documents.csv', 'requests.csv', 'workflows.csv'} <= names
+        assert json.loads(archive.read('subject.json'))['subject']['email'] == 'jane@example.com'
+        assert len(archive.read('consent_activities.csv').decode().splitlines()) == 3
+        assert archive.read(f'documents/{document.id}.txt') == b'Dear Jane'
+        assert archive.read(f'documents/files/{document.id}/{document.file.name.split("/")[-1]}') == b'%PDF-1.4 test'
+        assert 'Please export my data' in archive.read('requests.csv').decode()
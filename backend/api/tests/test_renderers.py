@@ -0,0 +1,39 @@
+import io
+import json
+import uuid
+import pytest
+from datetime import datetime, timezone as dt_timezone
+from rest_framework.exceptions import ParseError
+from api.renderers import FastJSONRenderer, FastJSONParser
+
+class TestFastJSON:
+    def test_renders_uuid_and_datetime_natively(self):
+        """Test that UUID and datetime values need no pre-conversion"""
+        subject_id = uuid.uuid4()
+        data = {
+            'id': subject_id,
+            'created_at': datetime(2024, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc),
+            'notes': 'line\u2028break'
+        }
+
+        output = FastJSONRenderer().render(data)
+
+        assert b'\\u2028' in output
+        assert json.loads(output) == {
+            'id': str(subject_id),
+            'created_at': '2024-01-02T03:04:05Z',
+            'notes': 'line\u2028break'
+        }
+
+    def test_stdlib_fallback(self, settings):
+        """Test that the renderer falls back to stdlib json when disabled"""
+        settings.USE_ORJSON = False
+        assert json.loads(FastJSONRenderer().render({'count': 1})) == {'count': 1}
+
+    def test_parser_round_trip_and_errors(self):
+        """Test that the parser returns data and raises ParseError on bad input"""
+        parser = FastJSONParser()
+        assert parser.parse(io.BytesIO(b'{"status": "new"}')) == {'status': 'new'}
+
+        with pytest.raises(ParseError):
+            parser.parse(io.BytesIO(b'{"status": '))
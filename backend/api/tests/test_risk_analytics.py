@@ -0,0 +1,62 @@
+import pytest
+from api.models import DataCategory, DataStorage, DataMapping
+
+@pytest.mark.django_db
+class TestRiskAnalytics:
+    @pytest.fixture
+    def data_map(self, organization):
+        contact = DataCategory.objects.create(organization=organization, name='Contact', legal_basis='consent',
+                                              retention_period_days=365)
+        health = DataCategory.objects.create(organization=organization, name='Health', legal_basis='consent',
+                                             is_sensitive=True, retention_period_days=3650)
+        crm = DataStorage.objects.create(organization=organization, name='CRM', storage_type='saas')
+        drive = DataStorage.objects.create(organization=organization, name='Drive', storage_type='cloud',
+                                           location='US', is_outside_eea=True)
+        for category, storage in [(contact, crm), (contact, drive), (health, drive)]:
+            DataMapping.objects.create(organization=organization, data_category=category, storage=storage, purpose='Service')
+        return {'contact': contact, 'health': health, 'crm': crm, 'drive': drive}
+
+    def test_risk_analytics(self, data_map, api_client):
+        """Test transfers, storage scores, matrix and retention findings"""
+        data = api_client.get('/api/data-map/risk/').json()
+
+        assert data['summary'] == {'mappings': 3, 'sensitive_mappings': 1, 'cross_border_sensitive_transfers': 1}
+        assert data['cross_border_transfers'][0]['category_name'] == 'Health'
+        assert data['cross_border_transfers'][0]['storage_name'] == 'Drive'
+
+        # Drive: contact 1*2*1.5 + health 3*2*1.5 + 1 (over retention) = 13; CRM: 1*1*2 = 2
+        scores = {row['storage_name']: row for row in data['storage_risk']}
+        assert scores['Drive']['risk_score'] == 13
+        assert scores['Drive']['risk_level'] == 'medium'
+        assert scores['CRM']['risk_score'] == 2
+        assert scores['CRM']['risk_level'] == 'low'
+        assert data['storage_risk'][0]['storage_name'] == 'Drive'
+
+        matrix = data['category_storage_matrix']
+        row = matrix['counts'][matrix['categories'].index('Contact')]
+        assert row[matrix['storage_types'].index('saas')] == 1
+        assert row[matrix['storage_types'].index('cloud')] == 1
+
+        findings = {(f['type'], f.get('category_name') or f.get('storage_name')) for f in data['retention_findings']}
+        assert findings == {('exceeds_policy', 'Health'), ('mixed_retention', 'Drive')}
+
+    def test_cached_until_map_changes(self, data_map, organization, api_client, django_assert_num_queries,
+                                      django_capture_on_commit_callbacks):
+        """Test that results are cached and recomputed once a mapping change commits"""
+        api_client.get('/api/data-map/risk/')
+        with django_assert_num_queries(0):
+            api_client.get('/api/data-map/risk/')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            DataMapping.objects.create(organization=organization, data_category=data_map['health'],
+                                       storage=data_map['crm'], purpose='Support')
+            # Not yet committed: the cached results still stand
+            assert api_client.get('/api/data-map/risk/').json()['summary']['mappings'] == 3
+        data = api_client.get('/api/data-map/risk/').json()
+        assert data['summary']['mappings'] == 4
+
+    def test_empty_map(self, api_client):
+        """Test that an organization without mappings gets empty results"""
+        data = api_client.get('/api/data-map/risk/').json()
+        assert data['summary']['mappings'] == 0
+        assert data['storage_risk'] == []
@@ -0,0 +1,82 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.utils import timezone
+from api.models import (
+    ConsentActivity, DataSubject, DataSubjectRequest, Document, Organization, WorkflowInstance
+)
+
+
+@pytest.fixture
+def subject_data(organization):
+    now = timezone.now()
+    subject = DataSubject.objects.create(organization=organization, first_name='Jane', last_name='Doe',
+                                         email='Jane.Doe@example.com')
+    for days in (3, 2, 1):
+        ConsentActivity.objects.create(data_subject=subject, activity_type='consent_given',
+                                       timestamp=now - timezone.timedelta(days=days))
+    Document.objects.create(organization=organization, title='SAR response', document_type='subject_access_response',
+                            data_subject=subject)
+    DataSubjectRequest.objects.create(organization=organization, request_type='access', data_subject_name='Jane Doe',
+                                      data_subject_email='jane.doe@EXAMPLE.com', request_details='All data',
+                                      date_received=now - timezone.timedelta(days=10))
+    WorkflowInstance.objects.create(organization=organization, name='Access request', data_subject=subject,
+                                    due_date=now + timezone.timedelta(days=30))
+
+    # Same email in another organization must not be returned
+    other = Organization.objects.create(name='Other Org', industry='legal')
+    DataSubjectRequest.objects.create(organization=other, request_type='access', data_subject_name='Jane Doe',
+                                      data_subject_email='jane.doe@example.com', request_details='All data')
+    return subject
+
+
+@pytest.mark.django_db
+class TestSubjectSearch:
+    def test_search_all_sources(self, subject_data, api_client):
+        """Test that every source is searched case-insensitively and merged newest first"""
+        data = api_client.get('/api/subject-search/?email=JANE.DOE@example.com').json()
+
+        assert data['count'] == 7
+        assert data['counts'] == {
+            'data_subjects': 1, 'consent_activities': 3, 'documents': 1, 'requests': 1, 'workflows': 1
+        }
+        assert set(data['timings_ms']) == set(data['counts'])
+        assert data['results'][-1]['source'] == 'requests'
+        timestamps = [record['timestamp'] for record in data['results']]
+        assert timestamps == sorted(timestamps, reverse=True)
+
+    def test_pagination(self, subject_data, api_client):
+        """Test that limit/offset pages through the merged results"""
+        first = api_client.get('/api/subject-search/?email=jane.doe@example.com&limit=4').json()
+        second = api_client.get('/api/subject-search/?email=jane.doe@example.com&limit=4&offset=4').json()
+
+        assert len(first['results']) == 4 and first['next_offset'] == 4
+        assert len(second['results']) == 3 and second['next_offset'] is None
+        ids = {r['id'] for r in first['results']} | {r['id'] for r in second['results']}
+        assert len(ids) == 7
+
+    def test_source_filter_and_validation(self, subject_data, api_client):
+        """Test that sources can be restricted and bad parameters are rejected"""
+        data = api_client.get('/api/subject-search/?email=jane.doe@example.com&sources=requests').json()
+        assert data['counts'] == {'requests': 1}
+
+        assert api_client.get('/api/subject-search/').status_code == 400
+        assert api_client.get('/api/subject-search/?email=a@b.com&sources=emails').status_code == 400
+        assert api_client.get('/api/subject-search/?email=a@b.com&limit=x').status_code == 400
+
+    def test_command(self, subject_data, organization):
+        """Test that the management command prints per-source counts"""
+        out = StringIO()
+        call_command('search_subject_data', email='jane.doe@example.com', organization=str(organization.id), stdout=out)
+        assert 'consent_activities: 3' in out.getvalue()
+        assert 'Found 7 records' in out.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sources_queried_concurrently(subject_data, organization):
+    """Test that sources run on worker threads outside a transaction"""
+    from api.subject_search import search_subject_data
+
+    result = search_subject_data(organization.id, 'jane.doe@example.com', max_workers=5)
+    assert result['concurrent'] is True
+    assert result['count'] == 7
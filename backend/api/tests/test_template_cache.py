@@ -0,0 +1,82 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from api.models import Document, WorkflowStepTemplate, WorkflowTemplate
+
+
+@pytest.fixture
+def template(organization):
+    """A template with a document step and an approval step"""
+    document = Document.objects.create(organization=organization, title='Notice', document_type='other',
+                                       is_template=True, content='Dear {{subject_first_name}}')
+    template = WorkflowTemplate.objects.create(organization=organization, name='SAR', workflow_type='subject_access')
+    WorkflowStepTemplate.objects.create(workflow_template=template, name='Generate', step_type='generate_document',
+                                        order=0, document_template=document)
+    WorkflowStepTemplate.objects.create(workflow_template=template, name='Approve', step_type='approval', order=1)
+    return template
+
+
+def step_template_queries(queries):
+    return [q for q in queries.captured_queries if 'FROM "api_workflowsteptemplate"' in q['sql']]
+
+
+def fresh(template):
+    return WorkflowTemplate.objects.get(pk=template.pk)
+
+
+@pytest.mark.django_db
+class TestTemplateCache:
+    def test_instantiation_reuses_compiled_template(self, template):
+        """Test that template structure is read once per version"""
+        fresh(template).create_workflow_instance()
+        with CaptureQueriesContext(connection) as queries:
+            workflow = fresh(template).create_workflow_instance()
+        assert not step_template_queries(queries)
+        assert list(workflow.steps.values_list('name', flat=True)) == ['Generate', 'Approve']
+
+        compiled = fresh(template).get_compiled()
+        assert compiled.document_templates[compiled.blueprints[0]['document_template_id']].title == 'Notice'
+
+    def test_changes_bump_the_version(self, template):
+        """Test that template, step and document changes invalidate compiled templates"""
+        version = fresh(template).version
+        WorkflowStepTemplate.objects.create(workflow_template=template, name='Send', step_type='send_notification', order=2)
+        template = fresh(template)
+        assert template.version == version + 1
+        assert [step['name'] for step in template.get_step_blueprints()] == ['Generate', 'Approve', 'Send']
+
+        document = Document.objects.get(title='Notice')
+        document.title = 'Updated notice'
+        document.save()
+        template = fresh(template)
+        assert template.version == version + 2
+        assert next(iter(template.get_compiled().document_templates.values())).title == 'Updated notice'
+
+        template.name = 'Access request'
+        template.save(update_fields=['name'])
+        assert fresh(template).version == version + 3
+
+    def test_stale_save_takes_a_new_version(self, template):
+        """Test that saving an instance loaded before a step change still moves to a distinct version"""
+        stale = fresh(template)
+        WorkflowStepTemplate.objects.create(workflow_template=template, name='Send', step_type='send_notification', order=2)
+        stepped = fresh(template).version
+
+        stale.name = 'Access request'
+        stale.save()
+        assert stale.version == stepped + 1
+        assert fresh(template).version == stepped + 1
+
+    def test_listing_serves_steps_from_cache(self, api_client, template):
+        """Test that listing templates does not re-read or re-serialize their steps"""
+        first = api_client.get('/api/workflow-templates/')
+        with CaptureQueriesContext(connection) as queries:
+            second = api_client.get('/api/workflow-templates/')
+        assert not step_template_queries(queries)
+        assert first.data == second.data
+
+        step = template.step_templates.get(name='Approve')
+        step.name = 'Sign off'
+        step.save()
+        names = [s['name'] for s in api_client.get(f'/api/workflow-templates/{template.id}/').data['step_templates']]
+        assert names == ['Generate', 'Sign off']
@@ -0,0 +1,38 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from api.models import Organization, WorkflowTemplate, WorkflowStepTemplate
+
+@pytest.mark.django_db
+class TestTenantResolution:
+    def _create_template(self, organization, name):
+        template = WorkflowTemplate.objects.create(
+            organization=organization, name=name, workflow_type='subject_access'
+        )
+        WorkflowStepTemplate.objects.create(
+            workflow_template=template, name='Verify identity', step_type='verify_identity', order=1
+        )
+        return template
+
+    def test_steps_denormalize_organization(self, organization):
+        """Test that steps inherit the organization of their workflow"""
+        template = self._create_template(organization, 'SAR')
+        workflow = template.create_workflow_instance()
+
+        assert template.step_templates.get().organization_id == organization.id
+        assert workflow.steps.get().organization_id == organization.id
+
+    def test_step_filters_without_join(self, organization, api_client):
+        """Test that step endpoints filter by organization_id without joining the workflow"""
+        other = Organization.objects.create(name='Other Org', industry='other')
+        self._create_template(organization, 'SAR').create_workflow_instance()
+        self._create_template(other, 'Other SAR').create_workflow_instance()
+
+        with CaptureQueriesContext(connection) as queries:
+            steps = api_client.get('/api/workflow-steps/').json()
+            step_templates = api_client.get('/api/workflow-step-templates/').json()
+
+        assert len(steps) == 1
+        assert len(step_templates) == 1
+        assert not any('JOIN "api_workflowinstance"' in q['sql'] for q in queries.captured_queries)
+        assert not any('"api_organization"' in q['sql'] for q in queries.captured_queries)
@@ -0,0 +1,126 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from api.models import Document, WorkflowStep, WorkflowStepRollup, WorkflowStepTemplate, WorkflowTemplate
+from api.workflow_analytics import percentile, rebuild_rollups, workflow_analytics
+from api.workflow_processor import process_ready_steps
+
+
+@pytest.fixture
+def template(organization):
+    """An erasure template of two manual steps"""
+    template = WorkflowTemplate.objects.create(organization=organization, name='Erasure', workflow_type='erasure')
+    WorkflowStepTemplate.objects.create(workflow_template=template, name='Verify', step_type='verify_identity', order=0)
+    WorkflowStepTemplate.objects.create(workflow_template=template, name='Delete', step_type='data_action', order=1)
+    return template
+
+
+def run_workflow(template, verify_minutes, fail_delete=False):
+    """Run one workflow, backdating the first step so it took ``verify_minutes``"""
+    workflow = template.create_workflow_instance()
+    verify = workflow.advance_to_next_step()
+    WorkflowStep.objects.filter(pk=verify.pk).update(start_date=timezone.now() - timedelta(minutes=verify_minutes))
+    workflow.refresh_from_db()
+    delete = workflow.advance_to_next_step()
+    if fail_delete:
+        delete.status = 'failed'
+        delete.save()
+    else:
+        workflow.advance_to_next_step()
+    return workflow
+
+
+def stats_for(result, step_type):
+    return next(item for item in result['templates'][0]['step_types'] if item['step_type'] == step_type)
+
+
+@pytest.mark.django_db
+class TestWorkflowAnalytics:
+    def test_rollups_follow_step_completion(self, organization, template):
+        """Test that finished steps and workflows are rolled up as they finish"""
+        for minutes in (1, 2, 3, 50):
+            run_workflow(template, minutes)
+        run_workflow(template, 4, fail_delete=True)
+
+        result = workflow_analytics(organization.id)
+        verify = stats_for(result, 'verify_identity')
+        assert verify['completed'] == 5
+        assert verify['failure_rate'] == 0
+        assert 60 <= verify['duration_seconds']['p50'] <= 300
+        assert verify['duration_seconds']['p99'] <= verify['duration_seconds']['max'] < 50 * 60 + 60
+        # Manual steps are not queued for the processor
+        assert verify['queue_seconds']['p50'] is None
+
+        delete = stats_for(result, 'data_action')
+        assert (delete['completed'], delete['failed'], delete['failure_rate']) == (4, 1, 0.2)
+        # Slowest step type first
+        assert result['templates'][0]['step_types'][0]['step_type'] == 'verify_identity'
+        assert result['templates'][0]['workflows']['completed'] == 4
+
+    def test_queue_time_is_the_wait_for_the_processor(self, organization, settings):
+        """Test that queue time runs from a step becoming current to its automation starting"""
+        document = Document.objects.create(organization=organization, title='Notice', document_type='other',
+                                           is_template=True, content='Dear {{subject_first_name}}')
+        template = WorkflowTemplate.objects.create(organization=organization, name='Notify', workflow_type='custom')
+        WorkflowStepTemplate.objects.create(workflow_template=template, name='Wait', step_type='approval', order=0)
+        WorkflowStepTemplate.objects.create(workflow_template=template, name='Generate', step_type='generate_document',
+                                            order=1, is_automated=True, document_template=document)
+        workflow = template.create_workflow_instance()
+        # The first step's hour counts towards its duration, not the next step's queue time
+        wait = workflow.advance_to_next_step()
+        WorkflowStep.objects.filter(pk=wait.pk).update(start_date=timezone.now() - timedelta(hours=1))
+        workflow.refresh_from_db()
+
+        settings.WORKFLOW_ENGINE_STEP_BUDGET = 0
+        generate = workflow.advance_to_next_step()
+        WorkflowStep.objects.filter(pk=generate.pk).update(start_date=timezone.now() - timedelta(minutes=8))
+        assert len(process_ready_steps(max_workers=1)) == 1
+
+        queue = stats_for(workflow_analytics(organization.id), 'generate_document')['queue_seconds']
+        assert 300 <= queue['p50'] <= 600
+        assert queue['max'] < 600
+
+    def test_steps_are_counted_once(self, organization, template):
+        """Test that saving a finished step again does not count it twice"""
+        workflow = template.create_workflow_instance()
+        step = workflow.advance_to_next_step()
+        step.status = 'skipped'
+        step.save()
+        step.result_notes = 'Not needed'
+        step.save()
+        assert WorkflowStepRollup.objects.get(step_type='verify_identity').skipped == 1
+
+    def test_reads_only_rollups(self, organization, template, django_assert_num_queries):
+        """Test that analytics cost one query however many steps there are"""
+        for minutes in (1, 2, 3):
+            run_workflow(template, minutes)
+        with django_assert_num_queries(1):
+            workflow_analytics(organization.id)
+
+    def test_rebuild_matches_incremental(self, organization, template):
+        """Test that rebuilding from history gives the same rollups"""
+        for minutes in (1, 20):
+            run_workflow(template, minutes)
+        run_workflow(template, 5, fail_delete=True)
+        before = workflow_analytics(organization.id)
+
+        WorkflowStepRollup.objects.all().delete()
+        assert rebuild_rollups(organization.id) == 3
+        assert workflow_analytics(organization.id) == before
+
+    def test_percentile_interpolation(self):
+        """Test percentile estimates from bucket counts"""
+        histogram = WorkflowStepRollup.empty_histogram()
+        assert percentile(histogram, 0.5, 0) is None
+        histogram[WorkflowStepRollup.bucket(45)] = 10
+        assert 30 <= percentile(histogram, 0.5, 59) <= 60
+        assert percentile(histogram, 0.99, 50) == 50
+
+    def test_endpoint(self, api_client, organization, template):
+        """Test the analytics endpoint and its validation"""
+        run_workflow(template, 1)
+        response = api_client.get('/api/workflow-analytics/', {'days': 7, 'template': str(template.id)})
+        assert response.status_code == 200
+        assert response.data['templates'][0]['workflow_type'] == 'erasure'
+        assert api_client.get('/api/workflow-analytics/', {'days': 'x'}).status_code == 400
+        assert api_client.get('/api/workflow-analytics/', {'template': 'nope'}).status_code == 400
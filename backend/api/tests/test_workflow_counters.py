@@ -0,0 +1,74 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from api.models import DataSubject, Document, WorkflowInstance, WorkflowStepTemplate, WorkflowTemplate
+
+
+@pytest.fixture
+def workflow(organization):
+    """A workflow of two automated document steps followed by two manual steps"""
+    subject = DataSubject.objects.create(organization=organization, first_name='Jane', last_name='Doe',
+                                         email='jane@example.com')
+    document = Document.objects.create(organization=organization, title='Notice', document_type='other',
+                                       is_template=True, content='Dear {{subject_first_name}}')
+    template = WorkflowTemplate.objects.create(organization=organization, name='SAR', workflow_type='subject_access')
+    for order in range(2):
+        WorkflowStepTemplate.objects.create(workflow_template=template, name=f'Generate {order}',
+                                            step_type='generate_document', order=order,
+                                            is_automated=True, document_template=document)
+    WorkflowStepTemplate.objects.create(workflow_template=template, name='Review', step_type='approval', order=2)
+    WorkflowStepTemplate.objects.create(workflow_template=template, name='Send', step_type='send_notification', order=3)
+    return template.create_workflow_instance(data_subject=subject)
+
+
+def counters(workflow):
+    workflow = WorkflowInstance.objects.get(pk=workflow.pk)
+    return (workflow.total_steps, workflow.completed_steps, workflow.failed_steps, workflow.skipped_steps)
+
+
+@pytest.mark.django_db
+class TestWorkflowCounters:
+    def test_counters_follow_step_changes(self, workflow):
+        """Test that counters are maintained through creation, engine runs, saves and deletes"""
+        assert counters(workflow) == (4, 0, 0, 0)
+
+        current = workflow.advance_to_next_step()
+        assert counters(workflow) == (4, 2, 0, 0)
+        assert workflow.completed_steps == 2
+
+        current.status = 'skipped'
+        current.save()
+        assert counters(workflow) == (4, 2, 0, 1)
+
+        current.status = 'failed'
+        current.save()
+        assert counters(workflow) == (4, 2, 1, 0)
+
+        workflow.steps.get(name='Send').delete()
+        assert counters(workflow) == (3, 2, 1, 0)
+
+    def test_progress_read_without_queries(self, workflow, django_assert_num_queries):
+        """Test that progress comes from the counters"""
+        workflow.advance_to_next_step()
+        workflow = WorkflowInstance.objects.get(pk=workflow.pk)
+        with django_assert_num_queries(0):
+            assert workflow.get_progress_percentage() == 50
+
+    def test_repair_command(self, workflow):
+        """Test that drifted counters are reported and repaired"""
+        workflow.advance_to_next_step()
+        WorkflowInstance.objects.filter(pk=workflow.pk).update(total_steps=9, completed_steps=0)
+
+        out = StringIO()
+        call_command('repair_workflow_counters', dry_run=True, stdout=out)
+        assert 'DRY RUN: 1 workflows' in out.getvalue()
+        assert counters(workflow) == (9, 0, 0, 0)
+
+        out = StringIO()
+        call_command('repair_workflow_counters', stdout=out)
+        assert 'Repaired counters on 1 workflows' in out.getvalue()
+        assert counters(workflow) == (4, 2, 0, 0)
+
+        out = StringIO()
+        call_command('repair_workflow_counters', stdout=out)
+        assert 'Repaired counters on 0 workflows' in out.getvalue()
@@ -0,0 +1,78 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from api.models import DataSubject, Document, WorkflowStepTemplate, WorkflowTemplate
+from api.workflow_engine import WorkflowEngine
+from api.workflow_processor import process_ready_steps
+
+
+@pytest.fixture
+def workflow(organization):
+    """A workflow of five automated document steps followed by a manual approval"""
+    subject = DataSubject.objects.create(organization=organization, first_name='Jane', last_name='Doe',
+                                         email='jane@example.com')
+    document = Document.objects.create(organization=organization, title='Notice', document_type='other',
+                                       is_template=True, content='Dear {{subject_first_name}}')
+    template = WorkflowTemplate.objects.create(organization=organization, name='Chain', workflow_type='custom')
+    for order in range(5):
+        WorkflowStepTemplate.objects.create(workflow_template=template, name=f'Generate {order}',
+                                            step_type='generate_document', order=order,
+                                            is_automated=True, document_template=document)
+    WorkflowStepTemplate.objects.create(workflow_template=template, name='Approve', step_type='approval', order=5)
+    return template.create_workflow_instance(data_subject=subject)
+
+
+@pytest.mark.django_db
+class TestWorkflowEngine:
+    def test_automated_chain_runs_iteratively_with_one_batched_write(self, workflow):
+        """Test that consecutive automated steps run in one pass and are saved in one UPDATE"""
+        with CaptureQueriesContext(connection) as queries:
+            current = workflow.advance_to_next_step()
+
+        assert current.name == 'Approve'
+        statuses = list(workflow.steps.order_by('order').values_list('status', flat=True))
+        assert statuses == ['completed'] * 5 + ['in_progress']
+        assert workflow.steps.filter(generated_document__isnull=False).count() == 5
+
+        step_updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "api_workflowstep"')]
+        step_selects = [q for q in queries.captured_queries if q['sql'].startswith('SELECT') and 'FROM "api_workflowstep"' in q['sql']]
+        assert len(step_updates) == 1
+        assert len(step_selects) == 1
+
+    def test_step_budget_leaves_remaining_steps_for_processor(self, workflow):
+        """Test that the step budget bounds one invocation and the processor resumes the chain"""
+        current = WorkflowEngine(workflow, step_budget=2).advance()
+
+        assert current.name == 'Generate 2'
+        assert current.status == 'in_progress'
+        assert workflow.steps.filter(status='completed').count() == 2
+
+        executions = process_ready_steps(max_workers=1)
+        assert len(executions) == 1 and executions[0].success
+        workflow.refresh_from_db()
+        assert workflow.current_step.name == 'Approve'
+
+    def test_failed_step_stops_the_chain(self, workflow):
+        """Test that a failing automated step halts the run and stays current"""
+        step = workflow.steps.get(order=2)
+        step.step_type = 'custom'
+        step.save()
+
+        current = workflow.advance_to_next_step()
+
+        assert current.pk == step.pk
+        step.refresh_from_db()
+        assert step.status == 'failed'
+        assert step.result_notes == 'Automation not implemented for this step type'
+        assert workflow.steps.filter(status='pending').count() == 3
+
+    def test_completing_manual_step_finishes_workflow(self, workflow, api_client):
+        """Test that completing the last manual step completes the workflow"""
+        current = workflow.advance_to_next_step()
+        response = api_client.post(f'/api/workflow-steps/{current.id}/complete/', {'notes': 'Approved'}, format='json')
+
+        assert response.status_code == 200
+        workflow.refresh_from_db()
+        assert workflow.status == 'completed'
+        assert workflow.current_step is None
+        assert workflow.completed_date is not None
@@ -0,0 +1,72 @@
+import pytest
+from django.utils import timezone
+from api.models import DataSubject, DataSubjectRequest, WorkflowInstance, WorkflowStep, WorkflowStepTemplate, WorkflowTemplate
+
+
+@pytest.fixture
+def template(organization):
+    template = WorkflowTemplate.objects.create(organization=organization, name='SAR', workflow_type='subject_access')
+    for order in range(15):
+        WorkflowStepTemplate.objects.create(workflow_template=template, name=f'Step {order}',
+                                            step_type='custom', order=order)
+    return template
+
+
+@pytest.fixture
+def subjects(organization):
+    return [
+        DataSubject.objects.create(organization=organization, first_name='Subject', last_name=str(i),
+                                   email=f'subject{i}@example.com')
+        for i in range(3)
+    ]
+
+
+@pytest.mark.django_db
+class TestWorkflowInstantiation:
+    def test_steps_created_in_bulk(self, template, organization, django_assert_max_num_queries):
+        """Test that a 15-step template is instantiated without one INSERT per step"""
+        template = WorkflowTemplate.objects.get(pk=template.pk)
+        with django_assert_max_num_queries(6):
+            workflow = template.create_workflow_instance()
+
+        steps = list(workflow.steps.all())
+        assert [step.order for step in steps] == list(range(15))
+        assert all(step.organization_id == organization.id for step in steps)
+
+    def test_step_list_loaded_once(self, template, django_assert_num_queries):
+        """Test that repeated instantiation reuses the loaded step list"""
+        template.create_workflow_instance()
+        with django_assert_num_queries(4):
+            template.create_workflow_instance()
+
+    def test_batch_create_for_subjects(self, template, subjects, api_client):
+        """Test that the batch endpoint creates one workflow per subject and reports missing ids"""
+        missing = '00000000-0000-0000-0000-000000000000'
+        response = api_client.post(f'/api/workflow-templates/{template.id}/create_workflows/', {
+            'data_subject_ids': [str(s.id) for s in subjects] + [missing, 'bad']
+        }, format='json')
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data['created'] == 3
+        assert [r['outcome'] for r in data['results']] == ['created'] * 3 + ['not_found', 'invalid_id']
+        assert WorkflowInstance.objects.filter(template=template, data_subject__in=subjects).count() == 3
+        assert WorkflowStep.objects.filter(workflow__template=template).count() == 45
+
+    def test_batch_create_for_requests(self, template, organization, api_client):
+        """Test that the batch endpoint links workflows to requests"""
+        dsr = DataSubjectRequest.objects.create(organization=organization, request_type='access',
+                                                data_subject_name='Jane', data_subject_email='jane@example.com',
+                                                request_details='All data', due_date=timezone.now())
+        response = api_client.post(f'/api/workflow-templates/{template.id}/create_workflows/', {
+            'request_ids': [str(dsr.id)]
+        }, format='json')
+
+        assert response.json()['created'] == 1
+        assert WorkflowInstance.objects.get(related_request=dsr).steps.count() == 15
+
+    def test_batch_create_requires_one_target(self, template, api_client):
+        """Test that exactly one of data_subject_ids or request_ids is required"""
+        url = f'/api/workflow-templates/{template.id}/create_workflows/'
+        assert api_client.post(url, {}, format='json').status_code == 400
+        assert api_client.post(url, {'data_subject_ids': []}, format='json').status_code == 400
@@ -0,0 +1,86 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from api.models import (
+    DataSubject, Document, Organization, WorkflowInstance, WorkflowStep, WorkflowStepExecution,
+    WorkflowStepTemplate, WorkflowTemplate
+)
+from api.workflow_processor import process_ready_steps
+
+
+@pytest.fixture
+def subject(organization):
+    return DataSubject.objects.create(organization=organization, first_name='Jane', last_name='Doe',
+                                      email='jane@example.com')
+
+
+def make_ready_workflow(organization, subject, step_type, document_template=None):
+    """Create a workflow whose current step is an automated step waiting to run"""
+    template = WorkflowTemplate.objects.create(organization=organization, name=f'{step_type} workflow',
+                                               workflow_type='custom')
+    WorkflowStepTemplate.objects.create(workflow_template=template, name=step_type, step_type=step_type,
+                                        order=0, is_automated=True, document_template=document_template)
+    workflow = template.create_workflow_instance(data_subject=subject)
+    step = workflow.steps.get()
+    WorkflowStep.objects.filter(pk=step.pk).update(status='in_progress')
+    WorkflowInstance.objects.filter(pk=workflow.pk).update(status='in_progress', current_step=step)
+    return workflow, step
+
+
+@pytest.fixture
+def ready_workflows(organization, subject):
+    document = Document.objects.create(organization=organization, title='Notice', document_type='other',
+                                       is_template=True, content='Dear {{subject_first_name}}')
+    return (
+        make_ready_workflow(organization, subject, 'generate_document', document),
+        make_ready_workflow(organization, subject, 'custom'),
+    )
+
+
+@pytest.mark.django_db
+class TestWorkflowProcessor:
+    def test_process_endpoint_runs_each_step_once(self, ready_workflows, api_client):
+        """Test that ready steps run once and their results are recorded"""
+        (generate_workflow, generate_step), (custom_workflow, custom_step) = ready_workflows
+
+        data = api_client.post('/api/automated-workflows/process/').json()
+        assert data['processed'] == 2
+        assert data['successful'] == 1
+        assert data['failed'] == 1
+
+        generate_step.refresh_from_db()
+        assert generate_step.status == 'completed'
+        assert generate_step.generated_document.content == 'Dear Jane'
+        assert WorkflowStep.objects.get(pk=custom_step.pk).status == 'failed'
+        assert WorkflowInstance.objects.get(pk=generate_workflow.pk).status == 'completed'
+
+        executions = api_client.get(f'/api/workflow-steps/{generate_step.id}/executions/').json()
+        assert len(executions) == 1 and executions[0]['success'] is True
+
+        # Nothing is left to run, so a second click does not execute anything again
+        assert api_client.post('/api/automated-workflows/process/').json()['processed'] == 0
+        assert WorkflowStepExecution.objects.count() == 2
+
+    def test_scoped_to_organization_and_limit(self, ready_workflows, organization):
+        """Test that runs can be limited and scoped to an organization"""
+        assert len(process_ready_steps(organization_id=organization.id, limit=1, max_workers=1)) == 1
+        other = Organization.objects.create(name='Other Org', industry='legal')
+        assert process_ready_steps(organization_id=other.id) == []
+
+    def test_run_once_command(self, ready_workflows):
+        """Test that the command runs all ready steps and reports failures"""
+        out = StringIO()
+        call_command('process_workflows', once=True, stdout=out)
+        assert 'Ran 2 automated steps (1 failed)' in out.getvalue()
+
+
+    def test_step_left_ready_runs_once_per_pass(self, ready_workflows, monkeypatch):
+        """Test that a step its automation leaves ready is claimed once per pass, then again by the next"""
+        monkeypatch.setattr(WorkflowStep, 'execute_automation', lambda step: False)
+
+        executions = process_ready_steps(max_workers=1)
+        assert len(executions) == 2
+        assert WorkflowStep.objects.filter(status='in_progress', claimed_at__isnull=False).count() == 2
+
+        assert len(process_ready_steps(max_workers=1)) == 2
+        assert WorkflowStepExecution.objects.count() == 4
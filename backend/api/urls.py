@@ -20,6 +20,8 @@ router.register(r'workflow-templates', views.WorkflowTemplateViewSet)
 router.register(r'workflow-step-templates', views.WorkflowStepTemplateViewSet)
 router.register(r'workflow-instances', views.WorkflowInstanceViewSet)
 router.register(r'workflow-steps', views.WorkflowStepViewSet)
+router.register(r'export-jobs', views.ExportJobViewSet)
+router.register(r'notifications', views.NotificationViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -29,12 +31,15 @@ urlpatterns = [
     # Custom endpoints
     path('dashboard/summary/', views.DashboardSummaryView.as_view(), name='dashboard-summary'),
     path('data-map/', views.DataMapView.as_view(), name='data-map'),
+    path('data-map/risk/', views.DataMapRiskView.as_view(), name='data-map-risk'),
     path('document-templates/', views.DocumentTemplateListView.as_view(), name='document-templates'),
     path('generate-document/<uuid:template_id>/', views.GenerateDocumentView.as_view(), name='generate-document'),
+    path('subject-search/', views.SubjectSearchView.as_view(), name='subject-search'),
     path('export-data-inventory/', views.ExportDataInventoryView.as_view(), name='export-data-inventory'),
     
     # New GDPR automation endpoints
     path('dashboard/enhanced/', views.EnhancedDashboardView.as_view(), name='enhanced-dashboard'),
     path('automated-workflows/process/', views.AutomatedWorkflowView.as_view(), name='process-automated-workflows'),
+    path('workflow-analytics/', views.WorkflowAnalyticsView.as_view(), name='workflow-analytics'),
 ]
 
@@ -1,25 +1,37 @@
 # viewsets.py
 
+import os
+import tempfile
+import uuid
 from rest_framework import viewsets, permissions, views, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import FileResponse, StreamingHttpResponse
+from django.db.models import Q
 from django.utils import timezone
 from .models import (
     Organization, User, DataCategory, DataStorage, DataMapping,
-    DataSubjectRequest, Document, ComplianceAction, DataSubject, ConsentActivity,
-    WorkflowTemplate, WorkflowInstance, WorkflowStepTemplate, WorkflowStep
+    DataSubjectRequest, Document, DocumentRevision, ComplianceAction, DataSubject, ConsentActivity,
+    WorkflowTemplate, WorkflowInstance, WorkflowStepTemplate, WorkflowStep, Notification, ExportJob
 )
 from .serializers import (
     OrganizationSerializer, UserSerializer, DataCategorySerializer,
     DataStorageSerializer, DataMappingSerializer, DataSubjectRequestSerializer,
-    DocumentSerializer, ComplianceActionSerializer, DataSubjectSerializer,
+    DocumentSerializer, DocumentSummarySerializer, ComplianceActionSerializer, DataSubjectSerializer,
     ConsentActivitySerializer, WorkflowTemplateSerializer, WorkflowInstanceSerializer,
-    WorkflowStepTemplateSerializer, WorkflowStepSerializer
+    WorkflowStepTemplateSerializer, WorkflowStepSerializer, WorkflowStepExecutionSerializer,
+    NotificationSerializer, ExportJobSerializer
 )
 from .permissions import IsOrganizationAdmin, IsOrganizationMember
+from . import batch_documents, datamap, document_templates, document_versions, exports, export_jobs, file_store, portability, risk_analytics, subject_search, workflow_analytics, workflow_processor
+from .aggregates import conditional_counts
+from .bulk import BulkError, apply_bulk_update, bulk_create_workflows, parse_ids
+from .tenancy import OrganizationScopedMixin, get_organization_id
 
 
-class OrganizationViewSet(viewsets.ModelViewSet):
+class OrganizationViewSet(OrganizationScopedMixin, viewsets.ModelViewSet):
     """
     API endpoint for organizations
     """
@@ -31,11 +43,10 @@ class OrganizationViewSet(viewsets.ModelViewSet):
         """
         Filter organizations to only show the user's organization
         """
-        user = self.request.user
-        return Organization.objects.filter(id=user.organization.id)
+        return Organization.objects.filter(id=self.organization_id)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(OrganizationScopedMixin, viewsets.ModelViewSet):
     """
     API endpoint for users
     """
@@ -47,8 +58,7 @@ class UserViewSet(viewsets.ModelViewSet):
         """
         Filter users to only show users in the same organization
         """
-        user = self.request.user
-        return User.objects.filter(organization=user.organization)
+        return User.objects.filter(organization_id=self.organization_id)
     
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def me(self, request):
@@ -57,7 +67,7 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class DataCategoryViewSet(viewsets.ModelViewSet):
+class DataCategoryViewSet(OrganizationScopedMixin, viewsets.ModelViewSet):
     """
     API endpoint for data categories
     """
@@ -69,17 +79,16 @@ class DataCategoryViewSet(viewsets.ModelViewSet):
         """
         Filter data categories to only show those in the user's organization
         """
-        user = self.request.user
-        return DataCategory.objects.filter(organization=user.organization)
+        return DataCategory.objects.filter(organization_id=self.organization_id)
     
     def perform_create(self, serializer):
         """
         Set the organization when creating a new data category
         """
-        serializer.save(organization=self.request.user.organization)
+        serializer.save(organization_id=self.organization_id)
 
 
-class DataStorageViewSet(viewsets.ModelViewSet):
+class DataStorageViewSet(OrganizationScopedMixin, viewsets.ModelViewSet):
     """
     API endpoint for data storage locations
     """
@@ -91,17 +100,16 @@ class DataStorageViewSet(viewsets.ModelViewSet):
         """
         Filter data storage locations to only show those in the user's organization
         """
-        user = self.request.user
-        return DataStorage.objects.filter(organization=user.organization)
+        return DataStorage.objects.filter(organization_id=self.organization_id)
     
     def perform_create(self, serializer):
         """
         Set the organization when creating a new data storage location
         """
-        serializer.save(organization=self.request.user.organization)
+        serializer.save(organization_id=self.organization_id)
 
 
-class DataMappingViewSet(viewsets.ModelViewSet):
+class DataMappingViewSet(OrganizationScopedMixin, viewsets.ModelViewSet):
     """
     API endpoint for data mappings
     """
@@ -113,17 +121,16 @@ class DataMappingViewSet(viewsets.ModelViewSet):
         """
         Filter data mappings to only show those in the user's organization
         """
-        user = self.request.user
-        return DataMapping.objects.filter(organization=user.organization)
+        return DataMapping.objects.filter(organization_id=self.organization_id)
     
     def perform_create(self, serializer):
         """
         Set the organization when creating a new data mapping
         """
-        serializer.save(organization=self.request.user.organization)
+        serializer.save(organization_id=self.organization_id)
 
 
-class DataSubjectRequestViewSet(viewsets.ModelViewSet):
+class DataSubjectRequestViewSet(OrganizationScopedMixin, viewsets.ModelViewSet):
     """
     API endpoint for data subject requests
     """
@@ -135,14 +142,13 @@ class DataSubjectRequestViewSet(viewsets.ModelViewSet):
         """
         Filter requests to only show those in the user's organization
         """
-        user = self.request.user
-        return DataSubjectRequest.objects.filter(organization=user.organization)
+        return DataSubjectRequest.objects.filter(organization_id=self.organization_id)
     
     def perform_create(self, serializer):
         """
         Set the organization when creating a new data subject request
         """
-        serializer.save(organization=self.request.user.organization)
+        serializer.save(organization_id=self.organization_id)
     
     @action(detail=True, methods=['post'])
     def assign(self, request, pk=None):
@@ -153,7 +159,7 @@ class DataSubjectRequestViewSet(viewsets.ModelViewSet):
         user_id = request.data.get('user_id')
         
         try:
-            user = User.objects.get(id=user_id, organization=request.user.organization)
+            user = User.objects.get(id=user_id, organization_id=self.organization_id)
             dsr.assigned_to = user
             dsr.save()
             return Response({'status': 'request assigned'})
@@ -177,9 +183,71 @@ class DataSubjectRequestViewSet(viewsets.ModelViewSet):
         dsr.save()
         
         return Response({'status': 'request status updated'})
+    
+    @action(detail=False, methods=['post'])
+    def bulk_assign(self, request):
+        """
+        Assign many requests to a user in one transaction
+        """
+        user_id = request.data.get('user_id')
+        
+        try:
+            user = User.objects.only('id').get(id=user_id, organization_id=self.organization_id)
+        except (User.DoesNotExist, ValidationError, ValueError):
+            return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        def check(row):
+            if row['assigned_to'] == user.id:
+                return 'unchanged'
+        
+        try:
+            results = apply_bulk_update(
+                self.get_queryset(), request.data.get('ids'),
+                updates={'assigned_to_id': user.id},
+                fields=['assigned_to'],
+                check=check
+            )
+        except BulkError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({'results': results})
+    
+    @action(detail=False, methods=['post'])
+    def bulk_update_status(self, request):
+        """
+        Move many requests to a new status in one transaction
+        """
+        status_value = request.data.get('status')
+        
+        if status_value not in DataSubjectRequest.STATUS_TRANSITIONS:
+            return Response({'error': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        def check(row):
+            if row['status'] == status_value:
+                return 'unchanged'
+            if status_value not in DataSubjectRequest.STATUS_TRANSITIONS[row['status']]:
+                return f"Cannot change status from {row['status']} to {status_value}"
+        
+        updates = {'status': status_value}
+        if status_value == 'completed':
+            updates['completed_date'] = timezone.now()
+        elif status_value in ('new', 'in_progress'):
+            updates['completed_date'] = None
+        
+        try:
+            results = apply_bulk_update(
+                self.get_queryset(), request.data.get('ids'),
+                updates=updates,
+                fields=['status'],
+                check=check
+            )
+        except BulkError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({'results': results})
 
 
-class DocumentViewSet(viewsets.ModelViewSet):
+class DocumentViewSet(OrganizationScopedMixin, viewsets.ModelViewSet):
     """
     API endpoint for documents
     """
@@ -189,46 +257,131 @@ class DocumentViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """
-        Filter documents to only show those in the user's organization
+        Filter documents to only show those in the user's organization.
+        A document is loaded with its body only where the body is returned.
         """
-        user = self.request.user
-        return Document.objects.filter(organization=user.organization)
+        documents = Document.objects.filter(organization_id=self.organization_id)
+        if self.action in ('retrieve', 'update', 'partial_update'):
+            return documents.with_content()
+        return documents
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return DocumentSummarySerializer
+        return DocumentSerializer
+    
+    def initialize_request(self, request, *args, **kwargs):
+        # Uploaded files stream to disk and are hashed on the way, ready for the content-addressed store
+        request.upload_handlers = [file_store.HashingFileUploadHandler(request)]
+        return super().initialize_request(request, *args, **kwargs)
     
     def perform_create(self, serializer):
         """
         Set the organization and created_by when creating a new document
         """
         serializer.save(
-            organization=self.request.user.organization,
+            organization_id=self.organization_id,
             created_by=self.request.user
         )
     
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """
+        Download the document's file, or one byte range of it (``Range``)
+        """
+        doc = self.get_object()
+        if not doc.file:
+            return Response({'error': 'Document has no file'}, status=status.HTTP_404_NOT_FOUND)
+        return file_store.file_response(request, doc.file, doc.file_name or os.path.basename(doc.file.name))
+    
     @action(detail=True, methods=['post'])
     def version(self, request, pk=None):
         """
-        Create a new version of an existing document
+        Create a new version of an existing document, optionally with a new
+        ``content`` and ``title``; earlier versions stay in its history
         """
         doc = self.get_object()
+        content = request.data.get('content')
+        title = request.data.get('title')
+        max_title = Document._meta.get_field('title').max_length
+        if content is not None and not isinstance(content, str):
+            return Response({'error': 'content must be a string'}, status=status.HTTP_400_BAD_REQUEST)
+        if title is not None and (not isinstance(title, str) or len(title) > max_title):
+            return Response({'error': f'title must be a string of at most {max_title} characters'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            document_versions.create_version(doc, content=content, title=title, created_by=request.user)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Create new version with incremented version number
-        current_version = float(doc.version)
-        new_version = str(current_version + 0.1)
-        
-        new_doc = Document.objects.create(
-            organization=doc.organization,
-            title=doc.title,
-            document_type=doc.document_type,
-            content=doc.content,
-            version=new_version,
-            status='draft',
-            created_by=request.user
-        )
-        
-        serializer = self.get_serializer(new_doc)
+        doc.refresh_from_db()
+        serializer = self.get_serializer(doc)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def versions(self, request, pk=None):
+        """
+        List the recorded versions of this document (without their bodies)
+        """
+        return Response(document_versions.history(self.get_object()))
+    
+    @action(detail=True, methods=['get'], url_path=r'versions/(?P<number>[0-9]+)')
+    def version_content(self, request, pk=None, number=None):
+        """
+        Get the body of one recorded version
+        """
+        doc = self.get_object()
+        try:
+            content = document_versions.revision_content(doc.pk, int(number))
+        except DocumentRevision.DoesNotExist:
+            return Response({'error': 'Version not found'}, status=status.HTTP_404_NOT_FOUND)
+        revision = doc.revisions.values(*document_versions.HISTORY_FIELDS).get(number=number)
+        return Response({**revision, 'content': content})
+    
+    @action(detail=True, methods=['post'])
+    def generate_batch(self, request, pk=None):
+        """
+        Generate this template for every data subject matching ``filters``.
+        With ``format=zip`` the generated documents are streamed back as a
+        ZIP while generation progresses. Batches larger than
+        ``DOCUMENT_BATCH_SYNC_LIMIT`` subjects (or any, with
+        ``background=true``) are queued as a background job instead.
+        """
+        template = self.get_object()
+        if not template.is_template:
+            return Response({'error': 'Document is not a template'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        fields = request.data.get('fields') or {}
+        if not isinstance(fields, dict):
+            return Response({'error': 'fields must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            subjects = batch_documents.subject_queryset(self.organization_id, request.data.get('filters'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if request.data.get('format') == 'zip':
+            response = StreamingHttpResponse(
+                batch_documents.stream_batch_zip(template, subjects, extra=fields),
+                content_type='application/zip'
+            )
+            filename = f"documents_{template.id}_{timezone.now().strftime('%Y%m%d')}.zip"
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+            return response
+        
+        background = str(request.data.get('background', '')).lower() == 'true'
+        if background or subjects.count() > settings.DOCUMENT_BATCH_SYNC_LIMIT:
+            job = export_jobs.enqueue_document_batch(
+                template, request.data.get('filters'), fields, created_by=request.user
+            )
+            return Response(ExportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+        
+        return Response(
+            batch_documents.generate_batch(template, subjects, extra=fields),
+            status=status.HTTP_201_CREATED
+        )
 
 
-class ComplianceActionViewSet(viewsets.ModelViewSet):
+class ComplianceActionViewSet(OrganizationScopedMixin, viewsets.ModelViewSet):
     """
     API endpoint for compliance actions
     """
@@ -240,14 +393,64 @@ class ComplianceActionViewSet(viewsets.ModelViewSet):
         """
         Filter compliance actions to only show those in the user's organization
         """
-        user = self.request.user
-        return ComplianceAction.objects.filter(organization=user.organization)
+        return ComplianceAction.objects.filter(organization_id=self.organization_id)
     
     def perform_create(self, serializer):
         """
         Set the organization when creating a new compliance action
         """
-        serializer.save(organization=self.request.user.organization)
+        serializer.save(organization_id=self.organization_id)
+    
+    @action(detail=False, methods=['post'])
+    def bulk_update(self, request):
+        """
+        Update status, priority, assignee or due date of many actions in one transaction
+        """
+        changes = request.data.get('changes') or {}
+        allowed_fields = {'status', 'priority', 'assigned_to', 'due_date'}
+        
+        if not changes or set(changes) - allowed_fields:
+            return Response(
+                {'error': f"changes must only contain: {', '.join(sorted(allowed_fields))}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer = ComplianceActionSerializer(data=changes, partial=True)
+        serializer.is_valid(raise_exception=True)
+        updates = dict(serializer.validated_data)
+        
+        assignee = updates.pop('assigned_to', None)
+        if 'assigned_to' in changes:
+            if assignee is not None and assignee.organization_id != self.organization_id:
+                return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+            updates['assigned_to_id'] = assignee.id if assignee else None
+        
+        if updates.get('status') == 'completed':
+            updates['completed_date'] = timezone.now().date()
+        elif 'status' in updates:
+            updates['completed_date'] = None
+        
+        fields = [field[:-3] if field.endswith('_id') else field for field in updates if field != 'completed_date']
+        
+        # An extended deadline is no longer overdue, as on save()
+        if updates.get('due_date') and updates['due_date'] >= timezone.localdate():
+            updates['overdue_at'] = None
+        
+        def check(row):
+            if all(row[field] == updates.get(field, updates.get(f'{field}_id')) for field in fields):
+                return 'unchanged'
+        
+        try:
+            results = apply_bulk_update(
+                self.get_queryset(), request.data.get('ids'),
+                updates=updates,
+                fields=fields,
+                check=check
+            )
+        except BulkError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({'results': results})
 
 
 # Custom API views
@@ -262,52 +465,48 @@ class DashboardSummaryView(views.APIView):
         """
         Get summary data for the dashboard
         """
-        org = request.user.organization
-        
-        # Count data subject requests by status
-        dsr_counts = {}
-        for status_choice, _ in DataSubjectRequest._meta.get_field('status').choices:
-            dsr_counts[status_choice] = DataSubjectRequest.objects.filter(
-                organization=org, status=status_choice
-            ).count()
-        
-        # Count overdue requests
-        overdue_requests = DataSubjectRequest.objects.filter(
-            organization=org,
-            status__in=['new', 'in_progress'],
-            due_date__lt=timezone.now()
-        ).count()
-        
-        # Count compliance actions by priority and status
-        actions_by_priority = {}
-        for priority, _ in ComplianceAction._meta.get_field('priority').choices:
-            actions_by_priority[priority] = ComplianceAction.objects.filter(
-                organization=org, priority=priority
-            ).count()
-        
-        actions_by_status = {}
-        for status_choice, _ in ComplianceAction._meta.get_field('status').choices:
-            actions_by_status[status_choice] = ComplianceAction.objects.filter(
-                organization=org, status=status_choice
-            ).count()
+        org_id = get_organization_id(request)
+        now = timezone.now()
+        
+        # Count data subject requests by status, plus overdue requests
+        dsr_stats = conditional_counts(
+            DataSubjectRequest.objects.filter(organization_id=org_id),
+            group_by=['status'],
+            conditions={
+                'overdue': Q(status__in=['new', 'in_progress'], due_date__lt=now),
+            }
+        )
+        dsr_counts = dsr_stats['status']
+        overdue_requests = dsr_stats['overdue']
+        
+        # Count compliance actions by priority and status, plus overdue open actions
+        action_stats = conditional_counts(
+            ComplianceAction.objects.filter(organization_id=org_id),
+            group_by=['priority', 'status'],
+            conditions={
+                'overdue': Q(status__in=['pending', 'in_progress'], overdue_at__isnull=False),
+            }
+        )
+        actions_by_priority = action_stats['priority']
+        actions_by_status = action_stats['status']
         
         # Calculate retention compliance
-        total_data_categories = DataCategory.objects.filter(organization=org).count()
-        categories_with_retention = DataCategory.objects.filter(
-            organization=org, 
-            retention_period_days__gt=0
-        ).count()
+        category_stats = conditional_counts(
+            DataCategory.objects.filter(organization_id=org_id),
+            conditions={'with_retention': Q(retention_period_days__gt=0)}
+        )
+        total_data_categories = category_stats['total']
+        categories_with_retention = category_stats['with_retention']
         
         retention_compliance = 0
         if total_data_categories > 0:
             retention_compliance = int((categories_with_retention / total_data_categories) * 100)
         
         # Count data storages by type
-        storage_counts = {}
-        for storage_type, _ in DataStorage._meta.get_field('storage_type').choices:
-            storage_counts[storage_type] = DataStorage.objects.filter(
-                organization=org, storage_type=storage_type
-            ).count()
+        storage_counts = conditional_counts(
+            DataStorage.objects.filter(organization_id=org_id),
+            group_by=['storage_type']
+        )['storage_type']
         
         return Response({
             'data_subject_requests': {
@@ -318,6 +517,7 @@ class DashboardSummaryView(views.APIView):
             'compliance_actions': {
                 'by_priority': actions_by_priority,
                 'by_status': actions_by_status,
+                'overdue': action_stats['overdue'],
                 'total': sum(actions_by_status.values())
             },
             'data_inventory': {
@@ -339,48 +539,39 @@ class DataMapView(views.APIView):
         """
         Get data mapping in a format suitable for visualization
         """
-        org = request.user.organization
-        
-        # Get all data categories and storage locations
-        categories = DataCategory.objects.filter(organization=org)
-        storages = DataStorage.objects.filter(organization=org)
-        mappings = DataMapping.objects.filter(organization=org)
+        graph = datamap.get_graph(get_organization_id(request))
         
-        # Format for visualization (nodes and links)
-        nodes = []
-        links = []
-        
-        # Add category nodes
-        for cat in categories:
-            nodes.append({
-                'id': str(cat.id),
-                'name': cat.name,
-                'type': 'category',
-                'sensitive': cat.is_sensitive
-            })
-        
-        # Add storage nodes
-        for storage in storages:
-            nodes.append({
-                'id': str(storage.id),
-                'name': storage.name,
-                'type': 'storage',
-                'storage_type': storage.storage_type,
-                'outside_eea': storage.is_outside_eea
-            })
+        # Optional server-side clustering, e.g. ?group_by=storage_type,sensitivity
+        group_by = [g for g in request.query_params.get('group_by', '').split(',') if g]
+        if set(group_by) - {'storage_type', 'sensitivity'}:
+            return Response(
+                {'error': 'group_by must be storage_type and/or sensitivity'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Add links between categories and storages
-        for mapping in mappings:
-            links.append({
-                'source': str(mapping.data_category.id),
-                'target': str(mapping.storage.id),
-                'purpose': mapping.purpose
+        if not group_by:
+            return Response({
+                'nodes': list(graph['nodes'].values()),
+                'links': list(graph['links'].values())
             })
         
-        return Response({
-            'nodes': nodes,
-            'links': links
-        })
+        # Drill down into clusters, e.g. ?expand=storage_type:cloud
+        expand = [c for c in request.query_params.get('expand', '').split(',') if c]
+        return Response(datamap.cluster_graph(graph, group_by, expand))
+
+
+class DataMapRiskView(views.APIView):
+    """
+    API endpoint for data-flow risk analytics over the data map
+    """
+    permission_classes = [permissions.IsAuthenticated, IsOrganizationMember]
+    
+    def get(self, request):
+        """
+        Get cross-border transfers, storage risk scores, the category/storage
+        matrix and retention findings for the organization
+        """
+        return Response(risk_analytics.get_risk_analytics(get_organization_id(request)))
 
 
 class DocumentTemplateListView(views.APIView):
@@ -391,42 +582,12 @@ class DocumentTemplateListView(views.APIView):
     
     def get(self, request):
         """
-        Get list of available document templates
+        Get list of available document templates, e.g. ?status=active
         """
-        # In MVP, these would be hardcoded templates
-        templates = [
-            {
-                'id': '1',
-                'name': 'Privacy Policy',
-                'description': 'Generic GDPR-compliant privacy policy for professional services',
-                'document_type': 'privacy_policy'
-            },
-            {
-                'id': '2',
-                'name': 'Client Consent Form',
-                'description': 'Template for obtaining client consent for data processing',
-                'document_type': 'consent_form'
-            },
-            {
-                'id': '3',
-                'name': 'Data Processing Agreement',
-                'description': 'Template for agreements with third-party data processors',
-                'document_type': 'dpa'
-            },
-            {
-                'id': '4',
-                'name': 'Engagement Letter GDPR Clauses',
-                'description': 'GDPR clauses to include in client engagement letters',
-                'document_type': 'other'
-            },
-            {
-                'id': '5',
-                'name': 'Data Breach Notification Template',
-                'description': 'Template for notifying ICO of a data breach',
-                'document_type': 'breach_notification'
-            }
-        ]
-        
+        templates = document_templates.list_templates(get_organization_id(request))
+        status_filter = request.query_params.get('status')
+        if status_filter:
+            templates = [template for template in templates if template['status'] == status_filter]
         return Response(templates)
 
 
@@ -438,81 +599,142 @@ class GenerateDocumentView(views.APIView):
     
     def post(self, request, template_id):
         """
-        Generate a document from a template with custom fields
+        Generate a document from a template, optionally for a data subject
+        (``data_subject_id``), with custom ``fields``
         """
-        # Get template content based on template_id
-        # In MVP, these would be hardcoded template contents
-        template_content = "This is the template content with {{ORGANIZATION_NAME}} placeholders"
+        organization_id = get_organization_id(request)
+        try:
+            template = document_templates.get_template(organization_id, template_id)
+        except Document.DoesNotExist:
+            return Response({'error': 'Template not found'}, status=status.HTTP_404_NOT_FOUND)
         
         # Get custom fields from request
-        fields = request.data.get('fields', {})
-        
-        # Replace placeholders in template with custom fields
-        content = template_content
-        for key, value in fields.items():
-            content = content.replace('{{' + key + '}}', value)
-        
-        # Create new document
-        doc = Document.objects.create(
-            organization=request.user.organization,
-            title=request.data.get('title', 'Generated Document'),
-            document_type=request.data.get('document_type', 'other'),
-            content=content,
-            created_by=request.user
-        )
+        fields = request.data.get('fields') or {}
+        if not isinstance(fields, dict):
+            return Response({'error': 'fields must be an object'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        data_subject = None
+        data_subject_id = request.data.get('data_subject_id')
+        if data_subject_id:
+            try:
+                data_subject = document_templates.find_subject(organization_id, data_subject_id)
+            except DataSubject.DoesNotExist:
+                return Response({'error': 'Data subject not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        try:
+            doc = document_templates.generate_document(
+                template,
+                data_subject=data_subject,
+                fields=fields,
+                title=request.data.get('title'),
+                document_type=request.data.get('document_type'),
+                created_by=request.user
+            )
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
         serializer = DocumentSerializer(doc)
         return Response(serializer.data)
 
 
+class SubjectSearchView(views.APIView):
+    """
+    API endpoint for finding everything held about a person (subject access)
+    """
+    permission_classes = [permissions.IsAuthenticated, IsOrganizationMember]
+    
+    def get(self, request):
+        """
+        Search all personal-data tables by email, e.g.
+        ?email=jane@example.com&limit=50&offset=0&sources=consent_activities,requests
+        """
+        email = request.query_params.get('email', '').strip()
+        if not email:
+            return Response({'error': 'email is required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            limit = int(request.query_params.get('limit', subject_search.DEFAULT_LIMIT))
+            offset = int(request.query_params.get('offset', 0))
+        except ValueError:
+            return Response({'error': 'limit and offset must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        sources = [s for s in request.query_params.get('sources', '').split(',') if s]
+        unknown = set(sources) - set(subject_search.SEARCH_SOURCES)
+        if unknown:
+            return Response(
+                {'error': f"Unknown sources: {', '.join(sorted(unknown))}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response(subject_search.search_subject_data(
+            get_organization_id(request), email, limit=limit, offset=offset, sources=sources or None
+        ))
+
+
 class ExportDataInventoryView(views.APIView):
     """
     API endpoint for exporting data inventory
     """
     permission_classes = [permissions.IsAuthenticated, IsOrganizationMember]
     
+    def perform_content_negotiation(self, request, force=False):
+        # ?format=csv/ndjson/xlsx selects a streaming export rather than a DRF renderer
+        return super().perform_content_negotiation(request, force=True)
+    
     def get(self, request):
         """
-        Export data inventory as CSV or JSON
+        Export data inventory as JSON, or stream it as CSV, NDJSON or XLSX
         """
         format_type = request.query_params.get('format', 'json')
-        org = request.user.organization
-        
-        # Get all data categories and their mappings
-        categories = DataCategory.objects.filter(organization=org)
-        
-        # Format data for export
-        data = []
-        for category in categories:
-            category_data = {
-                'category_name': category.name,
-                'is_sensitive': category.is_sensitive,
-                'legal_basis': category.legal_basis,
-                'retention_period_days': category.retention_period_days,
-                'storages': []
-            }
-            
-            # Add storage locations for this category
-            for mapping in category.mappings.all():
-                storage = mapping.storage
-                category_data['storages'].append({
-                    'storage_name': storage.name,
-                    'storage_type': storage.storage_type,
-                    'outside_eea': storage.is_outside_eea,
-                    'purpose': mapping.purpose
-                })
-            
-            data.append(category_data)
-        
-        # Return data in requested format
+        
+        # ?background=true queues the export as a job instead of producing it in this request
+        if request.query_params.get('background', '').lower() == 'true':
+            if format_type not in ('csv', 'ndjson', 'xlsx'):
+                return Response({'error': 'Unsupported format'}, status=status.HTTP_400_BAD_REQUEST)
+            job = export_jobs.enqueue_export(
+                get_organization_id(request), 'data_inventory',
+                export_format=format_type, created_by=request.user
+            )
+            return Response(ExportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+        
+        rows = exports.inventory_rows(get_organization_id(request))
+        filename = f"data_inventory_{timezone.now().strftime('%Y%m%d_%H%M%S')}"
+        
         if format_type == 'csv':
-            # In a real implementation, convert to CSV
-            return Response({'status': 'CSV export not implemented in MVP'})
-        else:
-            return Response(data)
+            response = StreamingHttpResponse(
+                exports.stream_csv(rows, exports.INVENTORY_COLUMNS),
+                content_type='text/csv'
+            )
+            response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+            return response
+        
+        if format_type == 'ndjson':
+            response = StreamingHttpResponse(
+                exports.stream_ndjson(rows, exports.INVENTORY_COLUMNS),
+                content_type='application/x-ndjson'
+            )
+            response['Content-Disposition'] = f'attachment; filename="{filename}.ndjson"'
+            return response
+        
+        if format_type == 'xlsx':
+            # XLSX is a zip container, so it is spooled to a temporary file and streamed from disk
+            spool = tempfile.TemporaryFile()
+            exports.write_xlsx(rows, exports.INVENTORY_COLUMNS, spool, sheet_name='Data Inventory')
+            spool.seek(0)
+            return FileResponse(
+                spool,
+                as_attachment=True,
+                filename=f"{filename}.xlsx",
+                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            )
+        
+        if format_type != 'json':
+            return Response({'error': 'Unsupported format'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(exports.nest_inventory(rows))
 
 
-class DataSubjectViewSet(viewsets.ModelViewSet):
+class DataSubjectViewSet(OrganizationScopedMixin, viewsets.ModelViewSet):
     """
     API endpoint for data subjects (individuals whose data is processed)
     """
@@ -524,14 +746,13 @@ class DataSubjectViewSet(viewsets.ModelViewSet):
         """
         Filter data subjects to only show those in the user's organization
         """
-        user = self.request.user
-        return DataSubject.objects.filter(organization=user.organization)
+        return DataSubject.objects.filter(organization_id=self.organization_id)
     
     def perform_create(self, serializer):
         """
         Set the organization when creating a new data subject
         """
-        serializer.save(organization=self.request.user.organization)
+        serializer.save(organization_id=self.organization_id)
     
     @action(detail=True, methods=['get'])
     def consent_activities(self, request, pk=None):
@@ -559,9 +780,23 @@ class DataSubjectViewSet(viewsets.ModelViewSet):
             )
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=True, methods=['get'])
+    def portability(self, request, pk=None):
+        """
+        Stream a ZIP of everything held about this data subject (right to data portability)
+        """
+        data_subject = self.get_object()
+        response = StreamingHttpResponse(
+            portability.stream_portability_package(data_subject),
+            content_type='application/zip'
+        )
+        filename = f"data_portability_{data_subject.id}_{timezone.now().strftime('%Y%m%d')}.zip"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
 
-class WorkflowTemplateViewSet(viewsets.ModelViewSet):
+class WorkflowTemplateViewSet(OrganizationScopedMixin, viewsets.ModelViewSet):
     """
     API endpoint for workflow templates
     """
@@ -573,14 +808,13 @@ class WorkflowTemplateViewSet(viewsets.ModelViewSet):
         """
         Filter workflow templates to only show those in the user's organization
         """
-        user = self.request.user
-        return WorkflowTemplate.objects.filter(organization=user.organization)
+        return WorkflowTemplate.objects.filter(organization_id=self.organization_id)
     
     def perform_create(self, serializer):
         """
         Set the organization when creating a new workflow template
         """
-        serializer.save(organization=self.request.user.organization)
+        serializer.save(organization_id=self.organization_id)
     
     @action(detail=True, methods=['post'])
     def create_workflow(self, request, pk=None):
@@ -595,7 +829,7 @@ class WorkflowTemplateViewSet(viewsets.ModelViewSet):
             try:
                 data_subject = DataSubject.objects.get(
                     id=data_subject_id, 
-                    organization=request.user.organization
+                    organization_id=self.organization_id
                 )
             except DataSubject.DoesNotExist:
                 return Response(
@@ -610,7 +844,7 @@ class WorkflowTemplateViewSet(viewsets.ModelViewSet):
             try:
                 data_request = DataSubjectRequest.objects.get(
                     id=request_id, 
-                    organization=request.user.organization
+                    organization_id=self.organization_id
                 )
             except DataSubjectRequest.DoesNotExist:
                 return Response(
@@ -626,9 +860,38 @@ class WorkflowTemplateViewSet(viewsets.ModelViewSet):
         
         serializer = WorkflowInstanceSerializer(workflow)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['post'])
+    def create_workflows(self, request, pk=None):
+        """
+        Create workflow instances from this template for many data subjects
+        (``data_subject_ids``) or many requests (``request_ids``) at once
+        """
+        template = self.get_object()
+        
+        if ('data_subject_ids' in request.data) == ('request_ids' in request.data):
+            return Response(
+                {'error': 'Provide either data_subject_ids or request_ids'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if 'data_subject_ids' in request.data:
+            queryset = DataSubject.objects.filter(organization_id=self.organization_id)
+            raw_ids, target = request.data['data_subject_ids'], 'data_subject'
+        else:
+            queryset = DataSubjectRequest.objects.filter(organization_id=self.organization_id)
+            raw_ids, target = request.data['request_ids'], 'request'
+        
+        try:
+            results = bulk_create_workflows(template, queryset, raw_ids, target)
+        except BulkError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        created = sum(1 for result in results if result['outcome'] == 'created')
+        return Response({'created': created, 'results': results}, status=status.HTTP_201_CREATED)
 
 
-class WorkflowStepTemplateViewSet(viewsets.ModelViewSet):
+class WorkflowStepTemplateViewSet(OrganizationScopedMixin, viewsets.ModelViewSet):
     """
     API endpoint for workflow step templates
     """
@@ -640,13 +903,10 @@ class WorkflowStepTemplateViewSet(viewsets.ModelViewSet):
         """
         Filter workflow step templates to only show those in the user's organization's workflows
         """
-        user = self.request.user
-        return WorkflowStepTemplate.objects.filter(
-            workflow_template__organization=user.organization
-        )
+        return WorkflowStepTemplate.objects.filter(organization_id=self.organization_id)
 
 
-class WorkflowInstanceViewSet(viewsets.ModelViewSet):
+class WorkflowInstanceViewSet(OrganizationScopedMixin, viewsets.ModelViewSet):
     """
     API endpoint for workflow instances
     """
@@ -658,8 +918,7 @@ class WorkflowInstanceViewSet(viewsets.ModelViewSet):
         """
         Filter workflow instances to only show those in the user's organization
         """
-        user = self.request.user
-        return WorkflowInstance.objects.filter(organization=user.organization)
+        return WorkflowInstance.objects.filter(organization_id=self.organization_id)
     
     @action(detail=True, methods=['post'])
     def advance(self, request, pk=None):
@@ -689,7 +948,7 @@ class WorkflowInstanceViewSet(viewsets.ModelViewSet):
         user_id = request.data.get('user_id')
         
         try:
-            user = User.objects.get(id=user_id, organization=request.user.organization)
+            user = User.objects.get(id=user_id, organization_id=self.organization_id)
             workflow.assigned_to = user
             workflow.save()
             return Response({'status': 'workflow assigned'})
@@ -700,7 +959,7 @@ class WorkflowInstanceViewSet(viewsets.ModelViewSet):
             )
 
 
-class WorkflowStepViewSet(viewsets.ModelViewSet):
+class WorkflowStepViewSet(OrganizationScopedMixin, viewsets.ModelViewSet):
     """
     API endpoint for workflow steps
     """
@@ -712,8 +971,7 @@ class WorkflowStepViewSet(viewsets.ModelViewSet):
         """
         Filter workflow steps to only show those in the user's organization's workflows
         """
-        user = self.request.user
-        return WorkflowStep.objects.filter(workflow__organization=user.organization)
+        return WorkflowStep.objects.filter(organization_id=self.organization_id)
     
     @action(detail=True, methods=['post'])
     def complete(self, request, pk=None):
@@ -738,6 +996,15 @@ class WorkflowStepViewSet(viewsets.ModelViewSet):
         step.workflow.advance_to_next_step()
         
         return Response({'status': 'step completed'})
+    
+    @action(detail=True, methods=['get'])
+    def executions(self, request, pk=None):
+        """
+        List the automated runs recorded for this step
+        """
+        step = self.get_object()
+        serializer = WorkflowStepExecutionSerializer(step.executions.all(), many=True)
+        return Response(serializer.data)
 
 
 class AutomatedWorkflowView(views.APIView):
@@ -750,48 +1017,59 @@ class AutomatedWorkflowView(views.APIView):
         """
         Process all pending automated steps in workflows
         """
-        user = request.user
-        org = user.organization
-        
-        # Find all in-progress workflows with automated current steps
-        workflows = WorkflowInstance.objects.filter(
-            organization=org,
-            status='in_progress',
-            current_step__is_automated=True
-        )
+        executions = workflow_processor.process_ready_steps(organization_id=get_organization_id(request))
         
         results = {
-            'processed': 0,
-            'successful': 0,
-            'failed': 0,
-            'details': []
+            'processed': len(executions),
+            'successful': sum(1 for execution in executions if execution.success),
+            'failed': sum(1 for execution in executions if not execution.success),
+            'details': [
+                {
+                    'workflow_id': str(execution.workflow_id),
+                    'workflow_name': execution.workflow.name,
+                    'step_id': str(execution.step_id),
+                    'step_name': execution.step.name,
+                    'success': execution.success,
+                    'notes': execution.result_notes
+                }
+                for execution in executions
+            ]
         }
         
-        for workflow in workflows:
-            current_step = workflow.current_step
-            if not current_step:
-                continue
-                
-            results['processed'] += 1
-            step_result = current_step.execute_automation()
-            
-            if step_result:
-                results['successful'] += 1
-            else:
-                results['failed'] += 1
-                
-            results['details'].append({
-                'workflow_id': str(workflow.id),
-                'workflow_name': workflow.name,
-                'step_id': str(current_step.id),
-                'step_name': current_step.name,
-                'success': step_result,
-                'notes': current_step.result_notes
-            })
-        
         return Response(results)
 
 
+class WorkflowAnalyticsView(views.APIView):
+    """
+    API endpoint for workflow execution analytics
+    """
+    permission_classes = [permissions.IsAuthenticated, IsOrganizationMember]
+    
+    def get(self, request):
+        """
+        Get step counts, failure rates, throughput and duration/queue-time
+        percentiles per template and step type, e.g.
+        ?days=30&template=<uuid>&step_type=approval
+        """
+        try:
+            days = int(request.query_params.get('days', workflow_analytics.DEFAULT_DAYS))
+        except ValueError:
+            return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        template_id = request.query_params.get('template')
+        if template_id:
+            try:
+                template_id = uuid.UUID(template_id)
+            except ValueError:
+                return Response({'error': 'template must be a UUID'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(workflow_analytics.workflow_analytics(
+            get_organization_id(request), days=days,
+            template_id=template_id or None,
+            step_type=request.query_params.get('step_type') or None
+        ))
+
+
 class EnhancedDashboardView(views.APIView):
     """
     API endpoint for enhanced dashboard with GDPR compliance metrics
@@ -802,63 +1080,88 @@ class EnhancedDashboardView(views.APIView):
         """
         Get enhanced dashboard data including GDPR-specific metrics
         """
-        user = request.user
-        org = user.organization
+        org_id = get_organization_id(request)
         
-        # Basic counts
-        data_subjects_count = DataSubject.objects.filter(organization=org).count()
-        expiring_soon_count = DataSubject.objects.filter(
-            organization=org,
-            data_expiry_date__lte=timezone.now() + timezone.timedelta(days=30),
-            data_expiry_date__gt=timezone.now()
-        ).count()
+        now = timezone.now()
+        
+        # Data subject and consent counts
+        subject_stats = conditional_counts(
+            DataSubject.objects.filter(organization_id=org_id),
+            conditions={
+                'expiring_soon': Q(
+                    data_expiry_date__lte=now + timezone.timedelta(days=30),
+                    data_expiry_date__gt=now
+                ),
+                'marketing_consent': Q(marketing_consent=True),
+                'data_processing_consent': Q(data_processing_consent=True),
+                'cookie_consent': Q(cookie_consent=True),
+            }
+        )
+        data_subjects_count = subject_stats['total']
+        expiring_soon_count = subject_stats['expiring_soon']
         
         # Data subject requests
+        dsr_stats = conditional_counts(
+            DataSubjectRequest.objects.filter(organization_id=org_id),
+            group_by=['status'],
+            conditions={
+                'overdue': Q(status__in=['new', 'in_progress'], due_date__lt=now),
+            }
+        )
         dsr_counts = {
-            'total': DataSubjectRequest.objects.filter(organization=org).count(),
-            'pending': DataSubjectRequest.objects.filter(organization=org, status='new').count(),
-            'in_progress': DataSubjectRequest.objects.filter(organization=org, status='in_progress').count(),
-            'completed': DataSubjectRequest.objects.filter(organization=org, status='completed').count(),
-            'overdue': DataSubjectRequest.objects.filter(
-                organization=org, 
-                status__in=['new', 'in_progress'],
-                due_date__lt=timezone.now()
-            ).count(),
+            'total': dsr_stats['total'],
+            'pending': dsr_stats['status']['new'],
+            'in_progress': dsr_stats['status']['in_progress'],
+            'completed': dsr_stats['status']['completed'],
+            'overdue': dsr_stats['overdue'],
         }
         
         # Workflows
+        workflow_stats = conditional_counts(
+            WorkflowInstance.objects.filter(organization_id=org_id),
+            group_by=['status'],
+            conditions={
+                # Read from the step counters, so no join on steps is needed
+                'with_failed_steps': Q(status='in_progress', failed_steps__gt=0),
+            }
+        )
         workflow_counts = {
-            'total': WorkflowInstance.objects.filter(organization=org).count(),
-            'pending': WorkflowInstance.objects.filter(organization=org, status='pending').count(),
-            'in_progress': WorkflowInstance.objects.filter(organization=org, status='in_progress').count(),
-            'completed': WorkflowInstance.objects.filter(organization=org, status='completed').count(),
-            'active_templates': WorkflowTemplate.objects.filter(organization=org, is_active=True).count(),
+            'total': workflow_stats['total'],
+            'pending': workflow_stats['status']['pending'],
+            'in_progress': workflow_stats['status']['in_progress'],
+            'completed': workflow_stats['status']['completed'],
+            'with_failed_steps': workflow_stats['with_failed_steps'],
+            'active_templates': WorkflowTemplate.objects.filter(organization_id=org_id, is_active=True).count(),
         }
         
         # Document metrics
+        document_stats = conditional_counts(
+            Document.objects.filter(organization_id=org_id),
+            conditions={
+                'templates': Q(is_template=True),
+                'active': Q(status='active'),
+                'needs_review': Q(status='active', review_date__lte=now),
+            }
+        )
         document_counts = {
-            'total': Document.objects.filter(organization=org).count(),
-            'templates': Document.objects.filter(organization=org, is_template=True).count(),
-            'active': Document.objects.filter(organization=org, status='active').count(),
-            'needs_review': Document.objects.filter(
-                organization=org,
-                status='active',
-                review_date__lte=timezone.now()
-            ).count(),
+            'total': document_stats['total'],
+            'templates': document_stats['templates'],
+            'active': document_stats['active'],
+            'needs_review': document_stats['needs_review'],
         }
         
         # Consent metrics
         consent_metrics = {
-            'marketing_consent': DataSubject.objects.filter(organization=org, marketing_consent=True).count(),
-            'data_processing_consent': DataSubject.objects.filter(organization=org, data_processing_consent=True).count(),
-            'cookie_consent': DataSubject.objects.filter(organization=org, cookie_consent=True).count(),
+            'marketing_consent': subject_stats['marketing_consent'],
+            'data_processing_consent': subject_stats['data_processing_consent'],
+            'cookie_consent': subject_stats['cookie_consent'],
             'total_data_subjects': data_subjects_count,
         }
         
         # Recent activities
         recent_consent_activities = ConsentActivity.objects.filter(
-            data_subject__organization=org
-        ).order_by('-timestamp')[:10]
+            data_subject__organization_id=org_id
+        ).select_related('data_subject').order_by('-timestamp')[:10]
         
         recent_consent = []
         for activity in recent_consent_activities:
@@ -881,4 +1184,87 @@ class EnhancedDashboardView(views.APIView):
             'documents': document_counts,
             'consent': consent_metrics,
             'recent_consent_activities': recent_consent,
-        })
\ No newline at end of file
+        })
+
+class NotificationViewSet(OrganizationScopedMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for the current user's notifications
+    """
+    queryset = Notification.objects.all()
+    serializer_class = NotificationSerializer
+    permission_classes = [permissions.IsAuthenticated, IsOrganizationMember]
+    
+    def get_queryset(self):
+        """
+        Notifications addressed to the user plus organization-wide ones;
+        ?unread=true limits the list to unread notifications
+        """
+        queryset = Notification.objects.filter(
+            Q(user=self.request.user) | Q(user__isnull=True),
+            organization_id=self.organization_id
+        )
+        if self.request.query_params.get('unread', '').lower() == 'true':
+            queryset = queryset.filter(read_at__isnull=True)
+        return queryset
+    
+    @action(detail=False, methods=['post'])
+    def mark_read(self, request):
+        """
+        Mark the given notifications (or all of them when no ids are sent) as read
+        """
+        queryset = self.get_queryset().filter(read_at__isnull=True)
+        ids = request.data.get('ids')
+        if ids is not None:
+            try:
+                ids, _ = parse_ids(ids)
+            except BulkError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(id__in=ids)
+        
+        updated = queryset.update(read_at=timezone.now())
+        return Response({'updated': updated})
+
+
+class ExportJobViewSet(OrganizationScopedMixin, viewsets.ModelViewSet):
+    """
+    API endpoint for background export jobs
+    """
+    queryset = ExportJob.objects.all()
+    serializer_class = ExportJobSerializer
+    permission_classes = [permissions.IsAuthenticated, IsOrganizationMember]
+    http_method_names = ['get', 'post', 'delete', 'head', 'options']
+    
+    def get_queryset(self):
+        """
+        Filter export jobs to only show those in the user's organization
+        """
+        return ExportJob.objects.filter(organization_id=self.organization_id)
+    
+    def perform_create(self, serializer):
+        """
+        Queue the export for the worker
+        """
+        serializer.save(organization_id=self.organization_id, created_by=self.request.user)
+    
+    def perform_destroy(self, instance):
+        """
+        Remove the artifact along with the job
+        """
+        if instance.file:
+            instance.file.delete(save=False)
+        instance.delete()
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """
+        Download the finished export file
+        """
+        job = self.get_object()
+        
+        if job.status != 'completed' or not job.file:
+            return Response(
+                {'error': f'Export is not available (status: {job.status})'},
+                status=status.HTTP_409_CONFLICT
+            )
+        
+        return FileResponse(job.file.open('rb'), as_attachment=True, filename=os.path.basename(job.file.name))
@@ -0,0 +1,189 @@
+# api/workflow_analytics.py
+import datetime
+from collections import defaultdict
+from django.db import transaction
+from django.utils import timezone
+from .models import WorkflowInstance, WorkflowStep, WorkflowStepRollup
+
+DEFAULT_DAYS = 30
+MAX_DAYS = 366
+
+PERCENTILES = {'p50': 0.5, 'p95': 0.95, 'p99': 0.99}
+
+# Rows read per query when rebuilding rollups from historical steps
+REBUILD_CHUNK_SIZE = 2000
+
+
+def percentile(histogram, q, max_value):
+    """
+    Estimate the ``q`` quantile from bucket counts.
+
+    The value is interpolated linearly inside the bucket that holds it, so it
+    is accurate to within that bucket's width; it never exceeds ``max_value``.
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    bounds = WorkflowStepRollup.BUCKET_BOUNDS
+    rank = q * total
+    seen = 0
+    for index, count in enumerate(histogram):
+        if count and seen + count >= rank:
+            lower = bounds[index - 1] if index else 0
+            upper = bounds[index] if index < len(bounds) else max_value
+            value = lower + (upper - lower) * (rank - seen) / count
+            return round(min(value, max_value), 1)
+        seen += count
+    return round(max_value, 1)
+
+
+class Summary:
+    """Rollup rows merged over a date range"""
+
+    def __init__(self):
+        self.rollup = WorkflowStepRollup()
+        self.rollup.duration_histogram = WorkflowStepRollup.empty_histogram()
+        self.rollup.queue_histogram = WorkflowStepRollup.empty_histogram()
+
+    def merge(self, row):
+        total = self.rollup
+        for field in ('completed', 'failed', 'skipped'):
+            setattr(total, field, getattr(total, field) + getattr(row, field))
+        for metric in ('duration', 'queue'):
+            setattr(total, f'{metric}_count', getattr(total, f'{metric}_count') + getattr(row, f'{metric}_count'))
+            setattr(total, f'{metric}_total', getattr(total, f'{metric}_total') + getattr(row, f'{metric}_total'))
+            setattr(total, f'{metric}_max', max(getattr(total, f'{metric}_max'), getattr(row, f'{metric}_max')))
+            histogram = getattr(total, f'{metric}_histogram')
+            for index, count in enumerate(getattr(row, f'{metric}_histogram')):
+                histogram[index] += count
+
+    def latency(self, metric):
+        rollup = self.rollup
+        count = getattr(rollup, f'{metric}_count')
+        histogram = getattr(rollup, f'{metric}_histogram')
+        maximum = getattr(rollup, f'{metric}_max')
+        stats = {name: percentile(histogram, q, maximum) for name, q in PERCENTILES.items()}
+        stats['mean'] = round(getattr(rollup, f'{metric}_total') / count, 1) if count else None
+        stats['max'] = round(maximum, 1) if count else None
+        return stats
+
+    def to_dict(self, days):
+        rollup = self.rollup
+        finished = rollup.completed + rollup.failed
+        return {
+            'count': rollup.completed + rollup.failed + rollup.skipped,
+            'completed': rollup.completed,
+            'failed': rollup.failed,
+            'skipped': rollup.skipped,
+            'failure_rate': round(rollup.failed / finished, 4) if finished else None,
+            'throughput_per_day': round(rollup.completed / days, 2),
+            'duration_seconds': self.latency('duration'),
+            'queue_seconds': self.latency('queue'),
+        }
+
+
+def workflow_analytics(organization_id, days=DEFAULT_DAYS, template_id=None, step_type=None):
+    """
+    Outcome counts, failure rates, throughput and duration/queue-time
+    percentiles per template and step type over the last ``days`` days.
+
+    Reads only the rollup rows (one per template, step type and day), so the
+    cost does not grow with the number of steps. Step types are listed
+    slowest first (by total time spent), so the bottleneck comes first.
+    """
+    days = max(1, min(days, MAX_DAYS))
+    since = timezone.localdate() - datetime.timedelta(days=days - 1)
+
+    rows = WorkflowStepRollup.objects.filter(
+        organization_id=organization_id, day__gte=since
+    ).select_related('template')
+    if template_id is not None:
+        rows = rows.filter(template_id=template_id)
+    if step_type is not None:
+        rows = rows.filter(step_type__in=[step_type, WorkflowStepRollup.WORKFLOW])
+
+    templates = {}
+    summaries = defaultdict(Summary)
+    for row in rows:
+        templates[row.template_id] = row.template
+        summaries[(row.template_id, row.step_type)].merge(row)
+
+    results = []
+    for template_id, template in templates.items():
+        step_types = [
+            (key[1], summary) for key, summary in summaries.items()
+            if key[0] == template_id and key[1] != WorkflowStepRollup.WORKFLOW
+        ]
+        step_types.sort(key=lambda item: item[1].rollup.duration_total, reverse=True)
+        workflows = summaries.get((template_id, WorkflowStepRollup.WORKFLOW)) or Summary()
+        workflow_stats = workflows.to_dict(days)
+        results.append({
+            'template_id': str(template_id),
+            'template_name': template.name,
+            'workflow_type': template.workflow_type,
+            'workflows': {
+                'completed': workflow_stats['completed'],
+                'throughput_per_day': workflow_stats['throughput_per_day'],
+                'duration_seconds': workflow_stats['duration_seconds'],
+            },
+            'step_types': [
+                {'step_type': name, **summary.to_dict(days)} for name, summary in step_types
+            ],
+        })
+    results.sort(key=lambda result: result['template_name'])
+
+    return {
+        'since': since,
+        'days': days,
+        'templates': results,
+    }
+
+
+def rebuild_rollups(organization_id=None, chunk_size=REBUILD_CHUNK_SIZE):
+    """
+    Recompute the rollups from the steps and workflows themselves.
+
+    Used to backfill history (or repair rollups); steps are streamed in
+    chunks and only the rollup rows are held in memory. Returns the number of
+    rows written.
+    """
+    rollups = {}
+
+    def add(key, *values):
+        if key not in rollups:
+            organization, template, step_type, day = key
+            rollups[key] = WorkflowStepRollup(
+                organization_id=organization, template_id=template, step_type=step_type, day=day,
+                duration_histogram=WorkflowStepRollup.empty_histogram(),
+                queue_histogram=WorkflowStepRollup.empty_histogram()
+            )
+        rollups[key].add(*values)
+
+    steps = WorkflowStep.objects.filter(
+        status__in=WorkflowStepRollup.FINAL_STATUSES, workflow__template__isnull=False
+    ).select_related('workflow').only(
+        'status', 'step_type', 'start_date', 'execution_started_at', 'completed_date', 'updated_at',
+        'workflow__organization_id', 'workflow__template_id'
+    )
+    workflows = WorkflowInstance.objects.filter(
+        status='completed', template__isnull=False
+    ).only('organization_id', 'template_id', 'start_date', 'completed_date', 'updated_at')
+    if organization_id is not None:
+        steps = steps.filter(organization_id=organization_id)
+        workflows = workflows.filter(organization_id=organization_id)
+
+    for step in steps.iterator(chunk_size=chunk_size):
+        # Failed and skipped steps have no completion date; count them on their last update
+        for key, *values in WorkflowStepRollup.samples(step.workflow, [step], now=step.updated_at):
+            add(key, *values)
+    for workflow in workflows.iterator(chunk_size=chunk_size):
+        for key, *values in WorkflowStepRollup.samples(workflow, workflow_finished=True, now=workflow.updated_at):
+            add(key, *values)
+
+    existing = WorkflowStepRollup.objects.all()
+    if organization_id is not None:
+        existing = existing.filter(organization_id=organization_id)
+    with transaction.atomic():
+        existing.delete()
+        WorkflowStepRollup.objects.bulk_create(rollups.values(), batch_size=500)
+    return len(rollups)
@@ -0,0 +1,173 @@
+# api/workflow_engine.py
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from . import automation_sandbox
+
+# Fields written back for every step the engine touches
+STEP_UPDATE_FIELDS = [
+    'status', 'start_date', 'execution_started_at', 'completed_date', 'result_notes', 'generated_document', 'updated_at'
+]
+WORKFLOW_UPDATE_FIELDS = ['status', 'completed_date', 'current_step', 'updated_at']
+
+
+class WorkflowEngine:
+    """
+    Iterative state machine that moves a workflow through its steps.
+
+    The workflow's steps are loaded once. Consecutive automated steps are run
+    in a loop (never recursively) until a manual step, a failed step or the
+    end of the workflow is reached, or until ``step_budget`` automated steps
+    have run; a step left over by the budget stays in progress for the
+    workflow processor to pick up. All state changes are written in one
+    batch when the run finishes, together with the workflow's step counters
+    and analytics rollups.
+    """
+
+    def __init__(self, workflow, step_budget=None, steps=()):
+        self.workflow = workflow
+        self.step_budget = settings.WORKFLOW_ENGINE_STEP_BUDGET if step_budget is None else step_budget
+        # Use the caller's instances for steps it already holds, so it sees the changes
+        given = {step.pk: step for step in steps}
+        self.steps = [
+            given.get(step.pk, step)
+            for step in workflow.steps.select_related('document_template').defer('document_template__content').order_by('order')
+        ]
+        for step in self.steps:
+            step.workflow = workflow
+        self.executed = 0
+        self._changed = {}
+        self._workflow_status = workflow.status
+        self._script_context = None
+
+    def _step(self, step_id):
+        return next((step for step in self.steps if step.pk == step_id), None)
+
+    def _touch(self, step):
+        self._changed[step.pk] = step
+
+    def _complete(self, step, notes=None):
+        step.status = 'completed'
+        step.completed_date = timezone.now()
+        if notes is not None:
+            step.result_notes = notes
+        self._touch(step)
+
+    def _execute(self, step):
+        """Run one step's automation in place; returns True if it completed"""
+        if step.execution_started_at is None:
+            step.execution_started_at = timezone.now()
+            self._touch(step)
+        try:
+            if step.step_type == 'generate_document' and step.document_template:
+                # Generate document using template
+                if step.document_template.is_template and self.workflow.data_subject:
+                    generated_doc = step.document_template.generate_document_for_subject(self.workflow.data_subject)
+                    step.generated_document = generated_doc
+                    self._complete(step, f"Document generated successfully: {generated_doc.title}")
+                    return True
+
+            if step.automation_script:
+                # Run the step's own script in the sandbox pool
+                if self._script_context is None:
+                    self._script_context = automation_sandbox.script_context(self.workflow)
+                success, output = automation_sandbox.run_script(step.automation_script, self._script_context)
+                if success:
+                    self._complete(step, output or "Automation script completed")
+                    return True
+                step.result_notes = output or "Automation script failed"
+                step.status = 'failed'
+            else:
+                step.result_notes = "Automation not implemented for this step type"
+                step.status = 'failed'
+        except Exception as e:
+            step.result_notes = f"Automation failed: {str(e)}"
+            step.status = 'failed'
+        self._touch(step)
+        return False
+
+    def _run(self):
+        """Move to the next pending step, running automated steps until one needs attention"""
+        workflow = self.workflow
+        workflow.status = 'in_progress'
+        while True:
+            next_step = next((step for step in self.steps if step.status == 'pending'), None)
+            if next_step is None:
+                # No more steps, workflow is complete
+                workflow.status = 'completed'
+                workflow.completed_date = timezone.now()
+                workflow.current_step = None
+                break
+
+            next_step.status = 'in_progress'
+            next_step.start_date = timezone.now()
+            self._touch(next_step)
+            workflow.current_step = next_step
+
+            if not next_step.is_automated or self.executed >= self.step_budget:
+                break
+            self.executed += 1
+            if not self._execute(next_step):
+                break
+
+        self._save()
+        return workflow.current_step
+
+    def _save(self, save_workflow=True):
+        """Write changed steps with one bulk UPDATE and the workflow (with its counters) with another"""
+        now = timezone.now()
+        workflow = self.workflow
+        changed = list(self._changed.values())
+        for step in changed:
+            step.updated_at = now
+
+        deltas = workflow.step_counter_deltas(
+            (getattr(step, '_loaded_status', step.status), step.status) for step in changed
+        )
+        # Steps (and the workflow) reaching a final status go into the analytics rollups
+        finished = [
+            step for step in changed
+            if step.status in ('completed', 'failed', 'skipped')
+            and getattr(step, '_loaded_status', None) != step.status
+        ]
+        workflow_finished = save_workflow and workflow.status == 'completed' and self._workflow_status != 'completed'
+        fields = {}
+        if save_workflow:
+            workflow.updated_at = now
+            fields = {field: getattr(workflow, field) for field in WORKFLOW_UPDATE_FIELDS}
+
+        with transaction.atomic():
+            if changed:
+                type(changed[0]).objects.bulk_update(changed, STEP_UPDATE_FIELDS)
+            workflow.apply_step_counter_deltas(workflow.pk, deltas, **fields)
+            if finished or workflow_finished:
+                workflow.record_outcomes(finished, workflow_finished)
+
+        for step in changed:
+            step._loaded_status = step.status
+        if save_workflow:
+            self._workflow_status = workflow.status
+        for field, delta in deltas.items():
+            setattr(workflow, field, getattr(workflow, field) + delta)
+        self._changed = {}
+
+    def advance(self):
+        """Complete the current step (if any) and move the workflow forward"""
+        current = self._step(self.workflow.current_step_id)
+        if current is not None:
+            self._complete(current)
+        return self._run()
+
+    def execute(self, step):
+        """
+        Run ``step``'s automation and, if it completes, move the workflow forward.
+
+        Returns True if the step completed.
+        """
+        step = self._step(step.pk)
+        self.executed += 1
+        if self._execute(step):
+            self._run()
+            return True
+        self._save(save_workflow=False)
+        return False
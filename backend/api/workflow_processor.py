@@ -0,0 +1,143 @@
+# api/workflow_processor.py
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .models import WorkflowStep, WorkflowStepExecution
+
+logger = logging.getLogger(__name__)
+
+
+def ready_steps(organization_id=None, claimed_before=None):
+    """
+    Automated steps that are the current step of an in-progress workflow
+    (and, given ``claimed_before``, have not been claimed since then)
+    """
+    queryset = WorkflowStep.objects.filter(
+        status='in_progress',
+        is_automated=True,
+        workflow__status='in_progress',
+        workflow__current_step=F('pk')
+    )
+    if organization_id is not None:
+        queryset = queryset.filter(organization_id=organization_id)
+    if claimed_before is not None:
+        queryset = queryset.filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=claimed_before))
+    return queryset
+
+
+def _worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+
+def process_next_step(organization_id=None, worker='', claimed_before=None):
+    """
+    Claim one ready step, run its automation and record the result.
+
+    The step row stays locked until the step has run, and ``skip_locked``
+    makes concurrent callers (threads, processes or API requests) move on to
+    other steps instead of executing the same one twice. Claiming stamps
+    the step's ``claimed_at``, so a step left ready is not claimed again by
+    a pass that began before it ran (see ``claimed_before``).
+
+    Returns the ``WorkflowStepExecution``, or None if no step was ready.
+    """
+    with transaction.atomic():
+        step = ready_steps(organization_id, claimed_before).select_for_update(
+            skip_locked=True, of=('self',)
+        ).select_related('workflow').order_by('start_date').first()
+        if step is None:
+            return None
+
+        started_at = timezone.now()
+        WorkflowStep.objects.filter(pk=step.pk).update(claimed_at=started_at)
+        step.claimed_at = started_at
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                success = bool(step.execute_automation())
+        except Exception as e:
+            logger.exception(f"Automated step {step.id} failed")
+            success = False
+            # Reload: the in-memory step may hold changes that were rolled back
+            step = WorkflowStep.objects.select_related('workflow').get(pk=step.pk)
+            step.status = 'failed'
+            step.result_notes = f"Automation failed: {str(e)}"
+            if step.execution_started_at is None:
+                step.execution_started_at = started_at
+            step.save(update_fields=['status', 'result_notes', 'execution_started_at', 'updated_at'])
+
+        return WorkflowStepExecution.objects.create(
+            organization_id=step.organization_id,
+            workflow=step.workflow,
+            step=step,
+            worker=worker,
+            success=success,
+            result_notes=step.result_notes,
+            started_at=started_at,
+            finished_at=timezone.now(),
+            duration_ms=int((time.perf_counter() - started) * 1000)
+        )
+
+
+def process_ready_steps(organization_id=None, max_workers=None, limit=None):
+    """
+    Run ready automated steps until none remain (or ``limit`` have been run).
+
+    Steps are spread over a pool of ``max_workers`` threads, each with its
+    own database connection. Steps run serially on the current connection
+    inside a transaction (other connections cannot see its rows) and on
+    databases without ``SKIP LOCKED``, where claims could not be made safely.
+
+    Returns the executions in the order they finished.
+    """
+    if max_workers is None:
+        max_workers = settings.WORKFLOW_PROCESSOR_WORKERS
+    concurrent = (
+        max_workers > 1 and
+        connection.features.has_select_for_update_skip_locked and
+        not connection.in_atomic_block
+    )
+
+    lock = threading.Lock()
+    executions = []
+    # Steps claimed since the pass began are not picked up again, even if left ready
+    pass_started = timezone.now()
+    remaining = [limit]
+
+    def take():
+        with lock:
+            if remaining[0] is None:
+                return True
+            if remaining[0] <= 0:
+                return False
+            remaining[0] -= 1
+            return True
+
+    def work(close_connection):
+        worker = _worker_name()
+        try:
+            while take():
+                execution = process_next_step(organization_id, worker, claimed_before=pass_started)
+                if execution is None:
+                    break
+                with lock:
+                    executions.append(execution)
+        finally:
+            if close_connection:
+                connections.close_all()
+
+    if concurrent:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for future in [executor.submit(work, True) for _ in range(max_workers)]:
+                future.result()
+    else:
+        work(False)
+
+    return executions
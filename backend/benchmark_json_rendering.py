@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark comparing the stdlib JSONRenderer with the orjson-backed FastJSONRenderer
+on large payloads of UUIDs and datetimes (similar to data subject and workflow lists)
+"""
+import os
+import django
+import time
+import tracemalloc
+import uuid
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gdpr_compliance_backend.settings')
+django.setup()
+
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from api.renderers import FastJSONRenderer, orjson
+
+def build_payload(rows):
+    """Build a list shaped like serialized data subjects with raw UUID/datetime values"""
+    now = timezone.now()
+    return [
+        {
+            'id': uuid.uuid4(),
+            'first_name': f"First{i}",
+            'last_name': f"Last{i}",
+            'email': f"subject{i}@example.com",
+            'marketing_consent': i % 2 == 0,
+            'marketing_consent_date': now,
+            'data_processing_consent': True,
+            'data_processing_consent_date': now,
+            'data_expiry_date': now + timezone.timedelta(days=730),
+            'created_at': now,
+            'updated_at': now,
+            'workflows': [uuid.uuid4() for _ in range(3)],
+        }
+        for i in range(rows)
+    ]
+
+def measure(renderer, payload, repeat):
+    # Time without tracing, since tracemalloc slows allocation-heavy code considerably
+    start = time.perf_counter()
+    for _ in range(repeat):
+        output = renderer.render(payload)
+    elapsed = (time.perf_counter() - start) / repeat
+    
+    tracemalloc.start()
+    renderer.render(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, len(output)
+
+def run_benchmark():
+    if orjson is None:
+        print("orjson is not installed - FastJSONRenderer will fall back to stdlib json")
+    
+    for rows in (1000, 10000, 100000):
+        payload = build_payload(rows)
+        repeat = 5 if rows < 100000 else 2
+        
+        print(f"\n{rows} rows:")
+        for name, renderer in (('stdlib', JSONRenderer()), ('fast', FastJSONRenderer())):
+            elapsed, peak, size = measure(renderer, payload, repeat)
+            print(f"  {name:<7} {elapsed * 1000:9.1f} ms   peak {peak / 1024 / 1024:7.1f} MiB   output {size / 1024 / 1024:6.1f} MiB")
+
+if __name__ == "__main__":
+    run_benchmark()
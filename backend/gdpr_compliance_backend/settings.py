@@ -91,14 +91,55 @@ CORS_ALLOW_ALL_ORIGINS = True if DEBUG else False
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ]
 }
 
+# Use orjson for API rendering/parsing when installed (falls back to stdlib json)
+USE_ORJSON = os.getenv('USE_ORJSON', 'True').lower() == 'true'
+
+# Shared by every worker process, so cache invalidations (revoked tokens, data
+# maps, risk analytics, template lists) reach all of them: Redis when REDIS_URL
+# is set, otherwise a table in the database (created by the api migrations).
+# A per-process cache is refused at startup (see api/checks.py).
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'api_cache',
+        }
+    }
+
+# Token authentication cache (see api/authentication.py)
+# SHARED_CACHE names the entry in CACHES through which revocations reach every process
+TOKEN_AUTH_CACHE = {
+    'TTL': 300,
+    'MAX_SIZE': 10000,
+    'SHARED_CACHE': os.getenv('TOKEN_AUTH_SHARED_CACHE', 'default'),
+    'REVOCATION_CHECK_INTERVAL': 2,
+}
+
 # Fix token model settings
 REST_AUTH = {
     'TOKEN_MODEL': 'rest_framework.authtoken.models.Token',
@@ -189,6 +230,35 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Data retention settings
 DATA_RETENTION_PERIOD_DAYS = 730  # 2 years default retention period
 
+# Background export jobs: artifacts are stored under MEDIA_ROOT/exports and removed after this many hours
+EXPORT_JOB_EXPIRY_HOURS = 24
+# A running job with no progress heartbeat for this long is taken to have lost
+# its worker and is requeued (or failed once it has been tried this many times)
+EXPORT_JOB_STALE_MINUTES = 10
+EXPORT_JOB_MAX_ATTEMPTS = 3
+
+# Subject-access search: number of sources queried in parallel, each on its own database connection
+SUBJECT_SEARCH_MAX_WORKERS = 5
+
+# Automated workflow steps: threads per processor run (several processes may also run side by side)
+WORKFLOW_PROCESSOR_WORKERS = 4
+
+# Maximum automated steps run back to back by one workflow transition; the rest are left to the processor
+WORKFLOW_ENGINE_STEP_BUDGET = 25
+
+# Automation scripts: sandbox worker processes, and per-script limits (seconds of CPU and wall-clock time, MB of memory)
+AUTOMATION_SANDBOX_WORKERS = 4
+AUTOMATION_SCRIPT_CPU_LIMIT = 2
+AUTOMATION_SCRIPT_TIME_LIMIT = 5
+AUTOMATION_SCRIPT_MEMORY_LIMIT_MB = 512
+# Unprivileged user the sandbox workers switch to when the server runs as root
+AUTOMATION_SANDBOX_USER = 'nobody'
+
+# Batch document generation: threads rendering chunks of subjects while earlier chunks are inserted
+DOCUMENT_BATCH_WORKERS = 4
+# Batches for more subjects than this are queued as background jobs instead of generated in the request
+DOCUMENT_BATCH_SYNC_LIMIT = 1000
+
 # Crontab settings (django-crontab)
 CRONJOBS = [
     ('0 3 * * *', 'api.management.commands.data_retention.Command.handle', ['--no-color'], {}, '>> /tmp/data_retention.log')